@@ -0,0 +1,11 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+Performance benchmarks for pyvo, to be run with asv
+(https://asv.readthedocs.io)::
+
+    asv run
+
+The benchmarks of service queries run against
+`~benchmarks.simulator.VOServiceSimulator`, a local HTTP server serving
+the unit test data with configurable latency, bandwidth and result sizes.
+"""
@@ -0,0 +1,22 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+Benchmarks for the time needed to import pyvo and its service modules.
+
+Each import is timed in a fresh interpreter (asv ``timeraw`` benchmarks).
+"""
+
+
+def timeraw_import_pyvo():
+    return "import pyvo"
+
+
+def timeraw_import_scs():
+    return "import pyvo.dal.scs"
+
+
+def timeraw_import_tap():
+    return "from pyvo.dal import TAPService"
+
+
+def timeraw_import_registry():
+    return "from pyvo import registry; registry.search"
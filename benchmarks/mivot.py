@@ -0,0 +1,87 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+Benchmarks for the mapping of table rows to MIVOT instances.
+"""
+import warnings
+from xml.etree import ElementTree
+
+from astropy.table import vstack
+from astropy.utils.data import get_pkg_data_filename
+
+from pyvo.utils import activate_features
+
+activate_features('MIVOT')
+
+from pyvo.mivot import MivotViewer  # noqa: E402
+from pyvo.mivot.features.static_reference_resolver import StaticReferenceResolver  # noqa: E402
+from pyvo.mivot.seekers.annotation_seeker import AnnotationSeeker  # noqa: E402
+
+
+def get_viewer():
+    return MivotViewer(
+        get_pkg_data_filename("data/test.mivot_viewer.xml", package="pyvo.mivot.tests"),
+        tableref="Results")
+
+
+class TimeRowMapping:
+    """
+    mapping the rows of a copy of the Results table of the MIVOT test
+    data, repeated to the number of rows given.
+    """
+    params = [1000, 100000]
+    param_names = ["rows"]
+
+    def setup(self, rows):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            self.viewer = get_viewer()
+        table = self.viewer._table_iterator.data_table
+        self.table = vstack([table] * (rows // len(table) + 1))[:rows]
+        self.viewer._table_iterator.data_table = self.table
+        # iterating masked arrays is slow in itself; do it here
+        self.numpy_rows = list(self.table.as_array())
+
+    def time_update(self, rows):
+        instance = self.viewer.dm_instance
+        for row in self.table:
+            instance.update(row)
+
+    def time_update_numpy_rows(self, rows):
+        instance = self.viewer.dm_instance
+        for row in self.numpy_rows:
+            instance.update(row)
+
+    def time_next(self, rows):
+        self.viewer.rewind()
+        while self.viewer.next():
+            pass
+
+    def time_filtered_next(self, rows):
+        # a filter selecting one row out of three
+        self.viewer.set_row_filter(
+            lambda columns: columns["transit_id"] == 17096015648964756)
+        while self.viewer.next():
+            pass
+        self.viewer.set_row_filter(None)
+
+
+class TimeReferenceResolution:
+    """
+    resolving many static references to the same GLOBALS instance.
+    """
+    params = [100, 2000]
+    param_names = ["references"]
+
+    def setup(self, references):
+        point = ('<INSTANCE dmtype="test:Point">'
+                 '<REFERENCE dmrole="test:Point.coordSys" dmref="_sys"/></INSTANCE>')
+        self.mapping = (
+            '<VODML><GLOBALS><INSTANCE dmid="_sys" dmtype="coords:SpaceSys">'
+            '<ATTRIBUTE dmrole="coords:SpaceFrame.spaceRefFrame" dmtype="ivoa:string" value="ICRS"/>'
+            '</INSTANCE></GLOBALS><TEMPLATES><INSTANCE dmtype="test:Points">'
+            '<COLLECTION dmrole="test:Points.points">' + point * references
+            + '</COLLECTION></INSTANCE></TEMPLATES></VODML>')
+
+    def time_resolve(self, references):
+        seeker = AnnotationSeeker(ElementTree.fromstring(self.mapping))
+        StaticReferenceResolver.resolve(seeker, None, seeker.get_templates_block(None))
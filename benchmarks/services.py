@@ -0,0 +1,206 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+Benchmarks for querying VO services and handling their results, run
+against a local `~benchmarks.simulator.VOServiceSimulator`.
+"""
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from astropy.io.votable import parse
+from astropy.utils.data import get_pkg_data_filename
+
+from pyvo import registry
+from pyvo.dal import SCSService, SIA2Service, SSAService, TAPService, TAPResults
+from pyvo.registry import InterfaceProber, regtap
+from pyvo.utils import vocabularies
+
+from .simulator import VOServiceSimulator
+
+QUERY = "SELECT * FROM ivoa.obscore"
+
+
+class _SimulatorBenchmark:
+    """
+    a base for benchmarks needing a simulator, configured by
+    ``get_simulator_config(*params)``.
+    """
+    def get_simulator_config(self, *params):
+        return {}
+
+    def setup(self, *params):
+        warnings.simplefilter("ignore")
+        self.simulator = VOServiceSimulator(
+            **self.get_simulator_config(*params)).start()
+        self.base_url = self.simulator.base_url
+
+    def teardown(self, *params):
+        self.simulator.stop()
+        warnings.resetwarnings()
+
+
+class TimeQueries(_SimulatorBenchmark):
+    """
+    running queries (request, transfer, parsing and wrapping the result).
+    """
+    params = [100, 5000]
+    param_names = ["rows"]
+
+    def get_simulator_config(self, rows):
+        return {"rows": rows}
+
+    def setup(self, rows):
+        super().setup(rows)
+        self.tap = TAPService(self.base_url + "/tap")
+        self.sia2 = SIA2Service(self.base_url + "/sia2")
+
+    def time_tap_sync(self, rows):
+        self.tap.run_sync(QUERY)
+
+    def time_scs(self, rows):
+        SCSService(self.base_url + "/scs").search((10, 20), 0.1)
+
+    def time_ssa(self, rows):
+        SSAService(self.base_url + "/ssa").search((10, 20), diameter=0.1)
+
+    def time_sia2(self, rows):
+        self.sia2.search((10, 20, 0.1))
+
+
+class TimeTransfer(_SimulatorBenchmark):
+    """
+    running a TAP query over a network of limited bandwidth, with and
+    without compression.
+    """
+    params = [[False, True]]
+    param_names = ["gzip"]
+    number = 1
+    repeat = 5
+
+    def get_simulator_config(self, gzip):
+        return {"rows": 2000, "latency": 0.02, "bandwidth": 50e6, "gzip": gzip}
+
+    def time_tap_sync(self, gzip):
+        TAPService(self.base_url + "/tap").run_sync(QUERY)
+
+
+class TimeResults(_SimulatorBenchmark):
+    """
+    parsing VOTables and going through their rows.
+    """
+    params = [100, 5000]
+    param_names = ["rows"]
+
+    def get_simulator_config(self, rows):
+        return {"rows": rows}
+
+    def setup(self, rows):
+        super().setup(rows)
+        self.content = self.simulator.responses["/tap/sync"]
+        self.results = TAPResults(parse(BytesIO(self.content)))
+
+    def time_parse(self, rows):
+        TAPResults(parse(BytesIO(self.content)))
+
+    def time_iterate_rows(self, rows):
+        for record in self.results:
+            record["s_ra"]
+
+    def time_getbyucd(self, rows):
+        for record in self.results:
+            record.getbyucd("pos.eq.ra")
+
+    def time_to_table(self, rows):
+        self.results.to_table()
+
+
+class TimeDatalink(_SimulatorBenchmark):
+    """
+    resolving the datalinks of query results and retrieving datasets
+    through datalink.
+    """
+    params = [10, 300]
+    param_names = ["rows"]
+    timeout = 120
+
+    def get_simulator_config(self, rows):
+        return {"rows": rows, "datalink_batch_size": 100}
+
+    def setup(self, rows):
+        super().setup(rows)
+        self.results = TAPService(self.base_url + "/tap").run_sync(QUERY)
+
+        # use the datalink vocabulary of the unit tests rather than
+        # downloading it
+        def download_file(src_url, *args, **kwargs):
+            return get_pkg_data_filename(
+                "data/datalink/datalink.desise", package="pyvo.dal.tests")
+
+        self.download_file = vocabularies.download_file
+        vocabularies.download_file = download_file
+
+    def teardown(self, rows):
+        vocabularies.download_file = self.download_file
+        super().teardown(rows)
+
+    def time_iter_datalinks(self, rows):
+        for datalinks in self.results.iter_datalinks():
+            pass
+
+    def time_getdataset(self, rows):
+        self.results[0].getdataset().read()
+
+
+class TimeAsyncJob(_SimulatorBenchmark):
+    """
+    running an async TAP query taking half a second on UWS services with
+    and without blocking job requests.
+    """
+    params = [["1.0", "1.1"]]
+    param_names = ["uws_version"]
+    number = 1
+    repeat = 3
+    timeout = 120
+
+    def get_simulator_config(self, uws_version):
+        return {"rows": 100, "execution_duration": 0.5, "uws_version": uws_version}
+
+    def time_run_async(self, uws_version):
+        TAPService(self.base_url + "/tap").run_async(QUERY)
+
+
+class TimeDiscovery(_SimulatorBenchmark):
+    """
+    finding services in the registry, probing them and querying all of
+    them, with a network latency of 50 ms.
+    """
+    params = [10, 100]
+    param_names = ["services"]
+    number = 1
+    repeat = 5
+
+    def get_simulator_config(self, services):
+        return {"rows": 10, "services": services, "latency": 0.05}
+
+    def setup(self, services):
+        super().setup(services)
+        self.previous_registry = regtap.REGISTRY_BASEURL
+        registry.choose_RegTAP_service(self.base_url + "/regtap")
+        self.resources = registry.search(servicetype="conesearch")
+
+    def teardown(self, services):
+        registry.choose_RegTAP_service(self.previous_registry)
+        super().teardown(services)
+
+    def time_registry_search(self, services):
+        registry.search(servicetype="conesearch")
+
+    def time_probe(self, services):
+        InterfaceProber().probe(self.resources)
+
+    def time_fan_out(self, services):
+        def query(resource):
+            return resource.get_service("conesearch").search((10, 20), 0.1)
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            list(pool.map(query, self.resources))
@@ -0,0 +1,444 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+An in-process simulator of VO services for the benchmarks.
+
+`VOServiceSimulator` runs an HTTP server in a background thread offering
+(relative to its ``base_url``):
+
+``/tap``
+    a TAP service (sync and UWS async queries, capabilities, tables)
+    returning obscore rows.
+``/scs``, ``/ssa``, ``/sia2/query``
+    simple cone, spectrum and SIA2 searches; anything after the path
+    (e.g. ``/scs/3``) addresses another service of the same kind.
+``/datalink``
+    a datalink service returning links for every ID posted, at most
+    ``datalink_batch_size`` IDs per request.
+``/regtap``
+    a RegTAP service whose results are ``services`` cone search services
+    on the simulator.
+``/products``
+    the datasets the datalinks point to.
+
+The responses are built from the files the unit tests use, with their
+rows repeated to the number of rows configured.  Latency and bandwidth
+of the simulated network are configurable, too.
+"""
+import itertools
+import re
+import threading
+import time
+import warnings
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qsl, urlparse
+from xml.sax.saxutils import escape
+
+import numpy
+from astropy.io.votable import parse
+from astropy.utils.data import get_pkg_data_contents
+
+__all__ = ["VOServiceSimulator", "resize_votable"]
+
+UWS_JOB = """<?xml version="1.0" encoding="UTF-8"?>
+<uws:job xmlns:uws="http://www.ivoa.net/xml/UWS/v1.0"
+    xmlns:xlink="http://www.w3.org/1999/xlink" version="{version}">
+  <uws:jobId>{jobid}</uws:jobId>
+  <uws:ownerId>anonymous</uws:ownerId>
+  <uws:phase>{phase}</uws:phase>
+  <uws:executionDuration>3600</uws:executionDuration>
+  <uws:parameters>
+    <uws:parameter id="query">{query}</uws:parameter>
+  </uws:parameters>
+  <uws:results>{results}</uws:results>
+</uws:job>"""
+
+UWS_RESULT = """
+    <uws:result id="result" xlink:href="{url}"/>"""
+
+# the ID placeholder in the datalink row template
+_ID_PLACEHOLDER = "@@ID@@"
+
+
+def get_data(path, package="pyvo.dal.tests"):
+    """
+    returns the content of a unit test data file.
+    """
+    return get_pkg_data_contents(path, package=package, encoding="binary")
+
+
+def _parse(content):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return parse(BytesIO(content))
+
+
+def _replace(content, replacements):
+    """
+    returns content with the strings in the keys of replacements replaced
+    by their values.
+    """
+    for old, new in (replacements or {}).items():
+        content = content.replace(old.encode(), new.encode())
+    return content
+
+
+def resize_votable(content, rows, *, unique=(), replacements=None, columns=None):
+    """
+    returns a VOTable whose first table has the rows of the first table in
+    content repeated to the number of rows given.
+
+    Parameters
+    ----------
+    content : bytes
+        the VOTable to resize.
+    rows : int
+        the number of rows of the result.
+    unique : sequence of str
+        the names of string columns whose values get a row-specific
+        suffix, so that they are unique.
+    replacements : dict
+        strings to replace in content before it is parsed.
+    columns : dict
+        functions returning the values of columns from the row index.
+    """
+    votable = _parse(_replace(content, replacements))
+    table = votable.get_first_table()
+    array = table.array[numpy.arange(rows) % len(table.array)]
+    for name in unique:
+        array[name] = numpy.array(
+            [f"{value}-{index}" for index, value in enumerate(array[name])],
+            dtype=object)
+    for name, func in (columns or {}).items():
+        array[name] = numpy.array([func(index) for index in range(rows)], dtype=object)
+    table.array = array
+    output = BytesIO()
+    votable.to_xml(output)
+    return output.getvalue()
+
+
+class _Job:
+    """
+    a UWS job of the simulated TAP service.
+    """
+    def __init__(self, jobid, query):
+        self.jobid = jobid
+        self.query = query
+        self.phase = "PENDING"
+        self.finish_time = None
+
+    def get_phase(self):
+        if self.phase == "EXECUTING" and time.monotonic() >= self.finish_time:
+            self.phase = "COMPLETED"
+        return self.phase
+
+
+class VOServiceSimulator:
+    """
+    a local HTTP server simulating VO services.
+
+    Use it as a context manager, or call `start` and `stop`.
+    """
+    def __init__(self, *, rows=100, services=10, latency=0., bandwidth=None,
+                 gzip=False, execution_duration=0., uws_version="1.1",
+                 datalink_batch_size=100):
+        """
+        configure a simulator.
+
+        Parameters
+        ----------
+        rows : int
+            the number of rows in query results.
+        services : int
+            the number of services returned by registry queries.
+        latency : float
+            the time (in seconds) before each response is sent.
+        bandwidth : float
+            the transfer rate (in bytes per second) of responses, or None
+            for no limit.
+        gzip : bool
+            if True, responses are sent gzip-compressed.
+        execution_duration : float
+            the time (in seconds) async jobs take to complete.
+        uws_version : str
+            "1.1" for a UWS service supporting blocking job requests
+            (WAIT), "1.0" for one clients have to poll.
+        datalink_batch_size : int
+            the maximal number of IDs the datalink service handles per
+            request.
+        """
+        self.rows = rows
+        self.services = services
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.gzip = gzip
+        self.execution_duration = execution_duration
+        self.uws_version = uws_version
+        self.datalink_batch_size = datalink_batch_size
+
+        self._server = None
+        self._thread = None
+        self._jobs = {}
+        self._job_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        # the number of requests received
+        self.requests = 0
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """
+        starts the server and builds the responses.
+        """
+        simulator = self
+
+        class Handler(_Handler):
+            pass
+        Handler.simulator = simulator
+
+        self._server = _Server(("127.0.0.1", 0), Handler)
+        self._build_responses()
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        stops the server.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _build_responses(self):
+        """
+        builds the static responses from the unit test data.
+        """
+        base_url = self.base_url
+        datalink_url = {
+            "https://example.com/obscore-datalink": base_url + "/datalink",
+            "https://example.com/caom2ops/datalink": base_url + "/datalink"}
+        self.responses = {
+            "/tap/capabilities": _replace(get_data("data/tap/capabilities.xml"), {
+                "http://dc.zah.uni-heidelberg.de/__system__/tap/run/tableMetadata":
+                    base_url + "/tap/tables",
+                "http://dc.zah.uni-heidelberg.de/__system__/tap/run/":
+                    base_url + "/tap/",
+                "http://dc.zah.uni-heidelberg.de/tap": base_url + "/tap"}),
+            "/tap/tables": get_data("data/tap/tables.xml"),
+            "/tap/sync": resize_votable(
+                get_data("data/datalink/datalink-obscore.xml"), self.rows,
+                unique=["obs_publisher_did"], replacements=datalink_url),
+            "/scs": resize_votable(get_data("data/scs/result.xml"), self.rows),
+            "/ssa": resize_votable(get_data("data/ssa/result.xml"), self.rows),
+            "/sia2/capabilities": _replace(get_data("data/sia2/capabilities.xml"), {
+                "https://example.com/sia/v2query": base_url + "/sia2/query",
+                "https://example.com/sia/auth-v2query": base_url + "/sia2/query",
+                "https://example.com/sia/": base_url + "/sia2/"}),
+            "/sia2/query": resize_votable(
+                get_data("data/sia2/dataset.xml"), self.rows,
+                unique=["obs_publisher_did"], replacements=datalink_url),
+            "/regtap/capabilities": get_data(
+                "data/capabilities.xml", package="pyvo.registry.tests"),
+            "/regtap/sync": resize_votable(
+                get_data("data/regtap.xml", package="pyvo.registry.tests"),
+                self.services,
+                columns={
+                    "ivoid": lambda index: f"ivo://simulator/scs/{index}",
+                    "access_urls": lambda index: f"{base_url}/scs/{index}",
+                    "standard_ids": lambda index: "ivo://ivoa.net/std/conesearch",
+                    "intf_types": lambda index: "vs:paramhttp",
+                    "intf_roles": lambda index: "std",
+                    "cap_descriptions": lambda index: "",
+                    "alt_identifier": lambda index: ""}),
+        }
+        self.responses["/tap/async/result"] = self.responses["/tap/sync"]
+        self.responses["/products"] = get_data("data/querydata/image.fits")
+
+        # datalink responses are built from the rows for a single ID
+        votable = _parse(_replace(get_data("data/datalink/datalink.xml"), {
+            "http://dc.zah.uni-heidelberg.de/getproduct/": base_url + "/products/"}))
+        table = votable.get_first_table()
+        array = table.array[table.array["ID"] == table.array["ID"][0]]
+        array["ID"] = _ID_PLACEHOLDER
+        table.array = array
+        output = BytesIO()
+        votable.to_xml(output)
+        head, rest = output.getvalue().decode().split("<TABLEDATA>")
+        rows, tail = rest.split("</TABLEDATA>")
+        self._datalink_template = (head + "<TABLEDATA>", rows, "</TABLEDATA>" + tail)
+
+    def get_datalink(self, ids):
+        """
+        returns the datalink response for (at most datalink_batch_size of)
+        ids.
+        """
+        head, rows, tail = self._datalink_template
+        return (head + "".join(
+            rows.replace(_ID_PLACEHOLDER, escape(id_))
+            for id_ in ids[:self.datalink_batch_size]) + tail).encode()
+
+    def create_job(self, query):
+        with self._lock:
+            job = _Job(next(self._job_ids), query)
+            self._jobs[job.jobid] = job
+        return job
+
+    def get_job(self, jobid):
+        with self._lock:
+            return self._jobs.get(jobid)
+
+    def delete_job(self, jobid):
+        with self._lock:
+            self._jobs.pop(jobid, None)
+
+    def get_job_document(self, job):
+        results = ""
+        if job.get_phase() == "COMPLETED":
+            results = UWS_RESULT.format(
+                url=f"{self.base_url}/tap/async/{job.jobid}/results/result")
+        return UWS_JOB.format(
+            version=self.uws_version, jobid=job.jobid, phase=job.phase,
+            query=escape(job.query), results=results).encode()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # clients closing connections early are not an error here
+        pass
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    the request handler of a `VOServiceSimulator` (set as ``simulator``).
+    """
+    protocol_version = "HTTP/1.1"
+    simulator = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def do_DELETE(self):
+        self._handle()
+
+    def _get_params(self):
+        url = urlparse(self.path)
+        params = parse_qsl(url.query, keep_blank_values=True)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            params += parse_qsl(
+                self.rfile.read(length).decode(), keep_blank_values=True)
+        return url.path, params
+
+    def _handle(self):
+        simulator = self.simulator
+        with simulator._lock:
+            simulator.requests += 1
+        path, params = self._get_params()
+        time.sleep(simulator.latency)
+
+        match = re.match(r"/tap/async(?:/(\d+)(/.*)?)?$", path)
+        if match:
+            return self._handle_async(match, params)
+        if path == "/datalink":
+            return self._send(simulator.get_datalink(
+                [value for key, value in params if key == "ID"]))
+
+        if path.startswith("/products/"):
+            return self._send(
+                simulator.responses["/products"], content_type="application/fits")
+        for prefix in ["/scs", "/ssa", "/sia2/query"]:
+            if path == prefix or path.startswith(prefix + "/"):
+                return self._send(simulator.responses[prefix])
+        if path in simulator.responses:
+            return self._send(simulator.responses[path])
+        self._send(b"Not found", status=404, content_type="text/plain")
+
+    def _handle_async(self, match, params):
+        simulator = self.simulator
+        params = {key.upper(): value for key, value in params}
+        jobid, subpath = match.groups()
+        if jobid is None:
+            job = simulator.create_job(params.get("QUERY", ""))
+            return self._redirect(f"{simulator.base_url}/tap/async/{job.jobid}")
+
+        job = simulator.get_job(int(jobid))
+        if job is None:
+            return self._send(b"No such job", status=404, content_type="text/plain")
+
+        if subpath is None:
+            if self.command == "DELETE" or params.get("ACTION") == "DELETE":
+                simulator.delete_job(job.jobid)
+                return self._redirect(f"{simulator.base_url}/tap/async")
+            if "WAIT" in params and simulator.uws_version != "1.0":
+                self._wait(job, float(params["WAIT"]))
+            return self._send(
+                simulator.get_job_document(job), content_type="text/xml")
+
+        if subpath == "/phase":
+            if self.command == "POST":
+                if params.get("PHASE") == "RUN":
+                    job.phase = "EXECUTING"
+                    job.finish_time = time.monotonic() + simulator.execution_duration
+                return self._redirect(f"{simulator.base_url}/tap/async/{job.jobid}")
+            return self._send(job.get_phase().encode(), content_type="text/plain")
+
+        if subpath == "/results/result":
+            return self._send(simulator.responses["/tap/async/result"])
+        self._send(b"Not found", status=404, content_type="text/plain")
+
+    def _wait(self, job, timeout):
+        """
+        blocks until job is no longer executing or timeout (for negative
+        values, 60 seconds) has passed.
+        """
+        if timeout < 0:
+            timeout = 60
+        if job.get_phase() == "EXECUTING":
+            time.sleep(max(0, min(timeout, job.finish_time - time.monotonic())))
+
+    def _redirect(self, location):
+        self.send_response(303)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _send(self, content, *, status=200,
+              content_type="application/x-votable+xml"):
+        simulator = self.simulator
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if simulator.gzip:
+            compressor = zlib.compressobj(wbits=31)
+            content = compressor.compress(content) + compressor.flush()
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+
+        if simulator.bandwidth is None:
+            self.wfile.write(content)
+            return
+        chunk_size = 65536
+        for offset in range(0, len(content), chunk_size):
+            chunk = content[offset:offset + chunk_size]
+            self.wfile.write(chunk)
+            time.sleep(len(chunk) / simulator.bandwidth)
@@ -81,6 +81,13 @@ copyright = '{}, {}'.format(
 __import__(project)
 package = sys.modules[project]
 
+# the names of the pyvo namespaces are imported on first use; load them so
+# that automodapi finds them in the module dictionaries
+for namespace in ["auth", "dal", "mivot", "registry"]:
+    module = getattr(package, namespace)
+    for name in module.__all__:
+        getattr(module, name)
+
 # The short X.Y version.
 version = package.__version__.split('-', 1)[0]
 # The full version, including alpha/beta/rc tags.
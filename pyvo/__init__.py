@@ -32,11 +32,18 @@ of which DALAccessError is the root parent exception.
 from ._astropy_init import *
 # ----------------------------------------------------------------------------
 
-from . import registry
-from .dal import ssa, sia, sla, scs, tap
-from . import auth
-from .registry import search as regsearch
-from .dal import (
-    imagesearch, spectrumsearch, conesearch, linesearch, tablesearch,
-    DALAccessError, DALProtocolError, DALFormatError, DALServiceError,
-    DALQueryError)
+from .utils.lazy import lazy_namespace
+
+# the subpackages and search functions are only imported when first used
+__getattr__, __dir__ = lazy_namespace(__name__, globals(), {
+    "ssa": (".dal.ssa", None),
+    "sia": (".dal.sia", None),
+    "sla": (".dal.sla", None),
+    "scs": (".dal.scs", None),
+    "tap": (".dal.tap", None),
+    "regsearch": (".registry", "search"),
+    **{name: (".dal", name) for name in [
+        "imagesearch", "spectrumsearch", "conesearch", "linesearch", "tablesearch",
+        "DALAccessError", "DALProtocolError", "DALFormatError", "DALServiceError",
+        "DALQueryError"]},
+}, submodules=["auth", "dal", "dam", "discover", "io", "mivot", "registry", "samp", "utils"])
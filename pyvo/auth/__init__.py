@@ -1,7 +1,10 @@
 # Licensed under a 3-clause BSD style license - see LICENSE.rst
+from ..utils.lazy import lazy_namespace
 
 __all__ = ["AuthSession", "AuthURLs", "CredentialStore"]
 
-from .authsession import AuthSession
-from .authurls import AuthURLs
-from .credentialstore import CredentialStore
+__getattr__, __dir__ = lazy_namespace(__name__, globals(), {
+    "AuthSession": (".authsession", "AuthSession"),
+    "AuthURLs": (".authurls", "AuthURLs"),
+    "CredentialStore": (".credentialstore", "CredentialStore"),
+}, submodules=["authsession", "authurls", "credentialstore", "securitymethods"])
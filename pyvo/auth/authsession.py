@@ -1,3 +1,4 @@
+import functools
 import logging
 
 from .authurls import AuthURLs
@@ -19,12 +20,28 @@ class AuthSession:
     of the service.  Based on what credentials have been
     provided and the capabilities of the service, appropriate
     credentials are added to the request before it is sent.
+
+    An AuthSession can be shared between threads.  The negotiated
+    security method is cached per URL until credentials or security
+    methods change, and each kind of credential has its own connection
+    pool; when running many concurrent requests (e.g., downloads of
+    proprietary data), pass a ``pool_maxsize`` at least as large as the
+    number of threads.
     """
 
-    def __init__(self):
+    def __init__(self, *, pool_maxsize=None):
+        """
+        Parameters
+        ----------
+        pool_maxsize : int
+            the number of connections per host to keep open for each
+            kind of credential; this defaults to requests' default of 10.
+        """
         super(AuthSession, self).__init__()
-        self.credentials = CredentialStore()
+        self.credentials = CredentialStore(pool_maxsize=pool_maxsize)
         self._auth_urls = AuthURLs()
+        self._negotiated_methods = functools.lru_cache(
+            maxsize=AuthURLs.cache_size)(self._negotiate_method)
 
     def add_security_method_for_url(self, url, security_method, exact=False):
         """
@@ -44,6 +61,7 @@ class AuthSession:
             match this as a base URL.
         """
         self._auth_urls.add_security_method_for_url(url, security_method, exact=exact)
+        self._negotiated_methods.cache_clear()
 
     def update_from_capabilities(self, capabilities):
         """
@@ -56,6 +74,7 @@ class AuthSession:
             List of `~pyvo.io.vosi.voresource.Capability`
         """
         self._auth_urls.update_from_capabilities(capabilities)
+        self._negotiated_methods.cache_clear()
 
     def get(self, url, **kwargs):
         """
@@ -98,14 +117,24 @@ class AuthSession:
         url : str
             the URL to request
         """
+        negotiated_method = self._negotiated_methods(
+            url, self.credentials.version)
+        session = self.credentials.get(negotiated_method)
+        return session.request(http_method, url, **kwargs)
+
+    def _negotiate_method(self, url, credentials_version):
+        """
+        returns the security method to use for url.
+
+        This is called through a cache; credentials_version is only
+        there to make the cache miss when the credentials have changed.
+        """
         auth_methods = self._auth_urls.allowed_auth_methods(url)
         logging.debug('Possible auth methods: %s', auth_methods)
 
         negotiated_method = self.credentials.negotiate_method(auth_methods)
         logging.debug('Using auth method: %s', negotiated_method)
-
-        session = self.credentials.get(negotiated_method)
-        return session.request(http_method, url, **kwargs)
+        return negotiated_method
 
     def __repr__(self):
         return '\n'.join([repr(self.credentials), repr(self._auth_urls)])
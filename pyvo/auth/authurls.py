@@ -1,4 +1,5 @@
 import collections
+import functools
 import logging
 
 from . import securitymethods
@@ -13,9 +14,15 @@ class AuthURLs():
     VOSI capabilities, which are passed in via update_from_capabilities.
     """
 
+    # the number of recent URL to method decisions remembered
+    cache_size = 1024
+
     def __init__(self):
         self.full_urls = collections.defaultdict(set)
         self.base_urls = collections.defaultdict(set)
+        self._base_url_lengths = None
+        self._cached_methods = functools.lru_cache(
+            maxsize=self.cache_size)(self._find_auth_methods)
 
     def update_from_capabilities(self, capabilities):
         """
@@ -61,17 +68,33 @@ class AuthURLs():
             self.full_urls[url].add(security_method)
         else:
             self.base_urls[url].add(security_method)
+            self._base_url_lengths = None
+        self._cached_methods.cache_clear()
 
     def allowed_auth_methods(self, url):
         """
         Return the authentication methods allowed for a particular URL.
         The methods are returned as URIs that represent security methods.
 
+        Decisions for recently requested URLs are cached until security
+        methods are added.
+
         Parameters
         ----------
         url : str
             the URL to determine authentication methods
         """
+        return self._cached_methods(url)
+
+    def _find_auth_methods(self, url):
+        """
+        returns the authentication methods for url without using the
+        decision cache.
+
+        Base URLs are looked up by the prefixes of url having the lengths
+        of the base URLs, longest first, so the most specific base URL
+        wins.
+        """
         logging.debug('Determining auth method for %s', url)
 
         if url in self.full_urls:
@@ -79,9 +102,17 @@ class AuthURLs():
             logging.debug('Matching full url %s, methods %s', url, methods)
             return methods
 
-        for base_url, methods in self._iterate_base_urls():
-            if url.startswith(base_url):
-                logging.debug('Matching base url %s, methods %s', base_url, methods)
+        base_url_lengths = self._base_url_lengths
+        if base_url_lengths is None:
+            base_url_lengths = self._base_url_lengths = sorted(
+                set(len(base_url) for base_url in self.base_urls),
+                reverse=True)
+
+        for length in base_url_lengths:
+            methods = self.base_urls.get(url[:length])
+            if methods is not None:
+                logging.debug('Matching base url %s, methods %s',
+                              url[:length], methods)
                 return methods
 
         logging.debug('No match, using anonymous auth')
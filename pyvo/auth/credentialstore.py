@@ -1,4 +1,5 @@
 import logging
+import threading
 
 from pyvo.utils.http import create_session
 
@@ -22,11 +23,37 @@ class CredentialStore(object):
     Before a request is to be dispatched, the AuthSession
     calls the get method to retrieve the appropriate
     requests.Session for making that HTTP request.
+
+    The store may be used from several threads.  Each change to the
+    credentials increments ``version``, which lets users cache
+    negotiation results.
     """
 
-    def __init__(self):
+    def __init__(self, *, pool_maxsize=None):
+        """
+        Parameters
+        ----------
+        pool_maxsize : int
+            the number of connections per host to keep open for each
+            kind of credential; see `pyvo.utils.http.create_session`.
+        """
         self.credentials = {}
-        self.set(securitymethods.ANONYMOUS, create_session())
+        self.pool_maxsize = pool_maxsize
+        self.version = 0
+        self._lock = threading.RLock()
+        self.set(securitymethods.ANONYMOUS, self._create_session())
+
+    def _create_session(self):
+        return create_session(pool_maxsize=self.pool_maxsize)
+
+    def _get_or_create(self, method_uri):
+        """
+        returns the session for method_uri, creating it if necessary.
+        """
+        with self._lock:
+            if method_uri not in self.credentials:
+                self.set(method_uri, self._create_session())
+            return self.credentials[method_uri]
 
     def negotiate_method(self, allowed_methods):
         """
@@ -43,7 +70,8 @@ class CredentialStore(object):
         ------
         Raises an exception if a common method could not be negotiated.
         """
-        available_methods = set(self.credentials.keys())
+        with self._lock:
+            available_methods = set(self.credentials.keys())
         methods = available_methods.intersection(allowed_methods)
         logging.debug('Available methods: %s', methods)
 
@@ -73,7 +101,9 @@ class CredentialStore(object):
             the requests.Session like object that will dispatch requests
             for the authentication method provided by method_uri
         """
-        self.credentials[method_uri] = session
+        with self._lock:
+            self.credentials[method_uri] = session
+            self.version += 1
 
     def get(self, method_uri):
         """
@@ -105,7 +135,7 @@ class CredentialStore(object):
         path : str
             restrict usage of this cookie to this path
         """
-        cookie_session = self.credentials.setdefault(securitymethods.COOKIE, create_session())
+        cookie_session = self._get_or_create(securitymethods.COOKIE)
         cookie_session.cookies.set(cookie_name, cookie_value, domain=domain, path=path)
 
     def set_cookie_jar(self, cookie_jar):
@@ -119,7 +149,7 @@ class CredentialStore(object):
         cookie_jar : obj
             the cookie jar to use.
         """
-        cookie_session = self.credentials.setdefault(securitymethods.COOKIE, create_session())
+        cookie_session = self._get_or_create(securitymethods.COOKIE)
         cookie_session.cookies = cookie_jar
 
     def set_client_certificate(self, certificate_path):
@@ -131,7 +161,7 @@ class CredentialStore(object):
         certificate_path : str
             path to the file of the client certificate
         """
-        cert_session = create_session()
+        cert_session = self._create_session()
         cert_session.cert = certificate_path
         self.set(securitymethods.CLIENT_CERTIFICATE, cert_session)
 
@@ -146,7 +176,7 @@ class CredentialStore(object):
         password : str
             password to use
         """
-        basic_session = create_session()
+        basic_session = self._create_session()
         basic_session.auth = (username, password)
         self.set(securitymethods.BASIC, basic_session)
 
@@ -4,15 +4,19 @@
 Tests for pyvo.auth
 """
 import base64
+from concurrent.futures import ThreadPoolExecutor
 from requests.cookies import RequestsCookieJar
 from string import Template
 
 import pytest
+import requests_mock
 
 from astropy.utils.data import get_pkg_data_contents
 
 import pyvo.dal
+from pyvo.auth import securitymethods
 from pyvo.auth.authsession import AuthSession
+from pyvo.auth.authurls import AuthURLs
 
 from pyvo.dal.tests.test_tap import MockAsyncTAPServer
 
@@ -172,3 +176,103 @@ def test_no_common_auth_negotiation():
     session.credentials.set_cookie('TEST_COOKIE', 'BADCOOKIE')
     service = pyvo.dal.TAPService('http://example.com/tap', session=session)
     service.run_async("SELECT * FROM ivoa.obscore")
+
+
+class TestAuthURLs:
+    def test_most_specific_base_url(self):
+        auth_urls = AuthURLs()
+        auth_urls.add_security_method_for_url(
+            "http://example.com/", securitymethods.BASIC)
+        auth_urls.add_security_method_for_url(
+            "http://example.com/tap", securitymethods.COOKIE)
+        auth_urls.add_security_method_for_url(
+            "http://example.com/tap/sync", securitymethods.ANONYMOUS,
+            exact=True)
+
+        assert auth_urls.allowed_auth_methods(
+            "http://example.com/tap/async") == {securitymethods.COOKIE}
+        assert auth_urls.allowed_auth_methods(
+            "http://example.com/ssa") == {securitymethods.BASIC}
+        assert auth_urls.allowed_auth_methods(
+            "http://example.com/tap/sync") == {securitymethods.ANONYMOUS}
+        assert auth_urls.allowed_auth_methods(
+            "http://example.org/tap") == {securitymethods.ANONYMOUS}
+        assert auth_urls.allowed_auth_methods(
+            "http://example.com") == {securitymethods.ANONYMOUS}
+
+    def test_cache_invalidation(self):
+        auth_urls = AuthURLs()
+        auth_urls.add_security_method_for_url(
+            "http://example.com/", securitymethods.BASIC)
+        assert auth_urls.allowed_auth_methods(
+            "http://example.com/tap/async") == {securitymethods.BASIC}
+
+        auth_urls.add_security_method_for_url(
+            "http://example.com/tap", securitymethods.COOKIE)
+        assert auth_urls.allowed_auth_methods(
+            "http://example.com/tap/async") == {securitymethods.COOKIE}
+
+        auth_urls.add_security_method_for_url(
+            "http://example.com/tap/async", securitymethods.BASIC, exact=True)
+        assert auth_urls.allowed_auth_methods(
+            "http://example.com/tap/async") == {securitymethods.BASIC}
+
+
+class TestConcurrentAuthSession:
+    def test_pool_size(self):
+        session = AuthSession(pool_maxsize=32)
+        session.credentials.set_password("user", "password")
+        for method in [securitymethods.ANONYMOUS, securitymethods.BASIC]:
+            adapter = session.credentials.get(method).get_adapter(
+                "https://example.com/")
+            assert adapter._pool_maxsize == 32
+
+    def test_negotiation_cached(self, mocker):
+        session = AuthSession()
+        session.credentials.set_password("user", "password")
+        session.add_security_method_for_url(
+            "http://example.com/", securitymethods.BASIC)
+        calls = []
+        negotiate = session.credentials.negotiate_method
+
+        def counting_negotiate(allowed_methods):
+            calls.append(allowed_methods)
+            return negotiate(allowed_methods)
+
+        session.credentials.negotiate_method = counting_negotiate
+
+        with mocker.register_uri(
+                'GET', "http://example.com/data", text="data"):
+            for _ in range(3):
+                session.get("http://example.com/data")
+            assert len(calls) == 1
+
+            session.credentials.set_cookie("token", "value")
+            session.get("http://example.com/data")
+            assert len(calls) == 2
+
+            session.add_security_method_for_url(
+                "http://example.com/data", securitymethods.COOKIE)
+            response = session.get("http://example.com/data")
+            assert len(calls) == 3
+            assert response.request.headers["Cookie"] == "token=value"
+
+    def test_threads(self, mocker):
+        session = AuthSession(pool_maxsize=8)
+        session.credentials.set_password("user", "password")
+        session.add_security_method_for_url(
+            "http://example.com/private", securitymethods.BASIC)
+        expected = "Basic " + base64.b64encode(b"user:password").decode()
+
+        def fetch(url):
+            return session.get(url).request.headers.get("Authorization")
+
+        urls = ["http://example.com/private/{}".format(i) for i in range(20)]
+        urls += ["http://example.com/public/{}".format(i) for i in range(20)]
+        with mocker.register_uri(
+                'GET', requests_mock.ANY, text="data"):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(fetch, urls))
+
+        assert results[:20] == [expected] * 20
+        assert results[20:] == [None] * 20
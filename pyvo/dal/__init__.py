@@ -1,24 +1,5 @@
 # Licensed under a 3-clause BSD style license - see LICENSE.rst
-from .sia import search as imagesearch
-from .sia2 import search as imagesearch2
-from .ssa import search as spectrumsearch
-from .sla import search as linesearch
-from .scs import search as conesearch
-from .tap import search as tablesearch
-
-from .query import DALService, DALQuery, DALResults, Record
-
-from .sia import SIAService, SIAQuery, SIAResults, SIARecord
-from .sia2 import SIA2Service, SIA2Query, SIA2Results, ObsCoreRecord
-from .ssa import SSAService, SSAQuery, SSAResults, SSARecord
-from .sla import SLAService, SLAQuery, SLAResults, SLARecord
-from .scs import SCSService, SCSQuery, SCSResults, SCSRecord
-from .tap import TAPService, TAPQuery, TAPResults, AsyncTAPJob
-
-
-from .exceptions import (
-    DALAccessError, DALProtocolError, DALFormatError, DALServiceError,
-    DALQueryError, DALOverflowWarning)
+from ..utils.lazy import lazy_namespace
 
 __all__ = [
     "imagesearch", "spectrumsearch", "linesearch", "conesearch", "tablesearch",
@@ -29,6 +10,37 @@ __all__ = [
     "SIAResults", "SIA2Results", "SSAResults", "SLAResults", "SCSResults", "TAPResults",
     "Record", "ObsCoreRecord",
     "SIARecord", "SSARecord", "SLARecord", "SCSRecord",
-    "AsyncTAPJob",
+    "AsyncTAPJob", "JobJournal", "JobTable",
     "DALAccessError", "DALProtocolError", "DALFormatError", "DALServiceError",
     "DALQueryError", "DALOverflowWarning"]
+
+# the service modules (and the parts of astropy they use) are only
+# imported when one of their names is first used
+__getattr__, __dir__ = lazy_namespace(__name__, globals(), {
+    "imagesearch": (".sia", "search"),
+    "imagesearch2": (".sia2", "search"),
+    "spectrumsearch": (".ssa", "search"),
+    "linesearch": (".sla", "search"),
+    "conesearch": (".scs", "search"),
+    "tablesearch": (".tap", "search"),
+    **{name: (".query", name) for name in [
+        "DALService", "DALQuery", "DALResults", "Record"]},
+    **{name: (".sia", name) for name in [
+        "SIAService", "SIAQuery", "SIAResults", "SIARecord"]},
+    **{name: (".sia2", name) for name in [
+        "SIA2Service", "SIA2Query", "SIA2Results", "ObsCoreRecord"]},
+    **{name: (".ssa", name) for name in [
+        "SSAService", "SSAQuery", "SSAResults", "SSARecord"]},
+    **{name: (".sla", name) for name in [
+        "SLAService", "SLAQuery", "SLAResults", "SLARecord"]},
+    **{name: (".scs", name) for name in [
+        "SCSService", "SCSQuery", "SCSResults", "SCSRecord"]},
+    **{name: (".tap", name) for name in [
+        "TAPService", "TAPQuery", "TAPResults", "AsyncTAPJob"]},
+    "JobJournal": (".journal", "JobJournal"),
+    "JobTable": (".jobtable", "JobTable"),
+    **{name: (".exceptions", name) for name in [
+        "DALAccessError", "DALProtocolError", "DALFormatError", "DALServiceError",
+        "DALQueryError", "DALOverflowWarning"]},
+}, submodules=["adhoc", "dbapi2", "exceptions", "jobtable", "journal", "mimetype",
+               "params", "query", "scs", "sia", "sia2", "sla", "ssa", "tap", "vosi"])
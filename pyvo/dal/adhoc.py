@@ -23,6 +23,7 @@ from astropy.utils.collections import HomogeneousList
 
 from ..utils.decorators import stream_decode_content
 from ..utils import vocabularies
+from ..utils.instrumentation import measure
 from .params import PosQueryParam, IntervalQueryParam, TimeQueryParam, EnumQueryParam
 from ..dam.obscore import POLARIZATION_STATES
 
@@ -195,9 +196,12 @@ class DatalinkResultsMixin(AdhocServiceResultsMixin):
                 if batch_size:
                     # subsequent calls are limitted to batch size
                     self.query['ID'] = remaining_ids[:batch_size]
-                current_batch = self.query.execute(post=True)
-                current_ids = list(OrderedDict.fromkeys(
-                    [_ for _ in current_batch.to_table()['ID']]))
+                with measure("datalink.resolve", self.query.queryurl,
+                             service=self.query.baseurl,
+                             ids=len(self.query['ID'])):
+                    current_batch = self.query.execute(post=True)
+                    current_ids = list(OrderedDict.fromkeys(
+                        [_ for _ in current_batch.to_table()['ID']]))
                 if not current_ids:
                     raise DALServiceError(
                         'Could not retrieve datalinks for: {}'.format(
@@ -348,11 +352,13 @@ class DatalinkRecordMixin:
     def getdataset(self, timeout=None):
         try:
             url = next(self.getdatalink().bysemantics('#this')).access_url
-            response = self._session.get(url, stream=True, timeout=timeout)
-            try:
-                response.raise_for_status()
-            except requests.RequestException as ex:
-                raise DALServiceError.from_except(ex, url)
+            with measure("dal.getdataset", url) as event:
+                response = self._session.get(url, stream=True, timeout=timeout)
+                event.set_response(response)
+                try:
+                    response.raise_for_status()
+                except requests.RequestException as ex:
+                    raise DALServiceError.from_except(ex, url)
             return response.raw
         except (DALServiceError, ValueError, StopIteration):
             # this should go to Record.getdataset()
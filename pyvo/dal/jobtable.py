@@ -0,0 +1,243 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+A local, incrementally synchronized copy of a UWS job list.
+"""
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from functools import partial
+import time
+
+import requests
+
+from astropy.time import Time
+
+from .exceptions import DALServiceError
+from ..io import uws
+from ..utils.http import use_session
+
+__all__ = ["JobTable"]
+
+
+def _to_unix(value):
+    """
+    returns a unix timestamp for a datetime, astropy Time or ISO string.
+    """
+    if isinstance(value, str):
+        value = value.rstrip("Z")
+    return Time(value).unix
+
+
+class JobTable:
+    """
+    a local copy of the job list of a UWS service, kept up to date by
+    fetching only what changed since the last synchronization.
+
+    Each `sync` requests the jobs created after the newest creation time
+    seen so far (``AFTER``) and the jobs that are currently in one of the
+    `active_phases` (``PHASE``).  Jobs the table knows as active that are
+    no longer reported as such are fetched individually to learn their
+    new phase, and dropped if they have disappeared from the server.
+
+    Inactive jobs are not asked for again, so the table would keep jobs
+    the server has since destroyed or that were deleted.  Therefore, a
+    sync at least ``full_sync_interval`` seconds after the last full listing
+    fetches the full job list again and drops the jobs missing from it.
+
+    Jobs are indexed by their id, phase, owner, and creation time.
+    """
+
+    # phases in which a job may still change its phase
+    active_phases = (
+        "PENDING", "QUEUED", "EXECUTING", "HELD", "SUSPENDED", "UNKNOWN")
+
+    def __init__(self, jobs_url, *, session=None, full_sync_interval=3600):
+        """
+        create an (empty) job table for a UWS job list
+
+        Parameters
+        ----------
+        jobs_url : str
+            the URL of the UWS job list (for TAP, ``<baseurl>/async``)
+        session : object
+           optional session to use for network requests
+        full_sync_interval : float
+           the minimal time in seconds between two syncs fetching the full
+           job list, so that jobs removed from the server are dropped;
+           None to only fetch it on the first sync.
+        """
+        self._jobs_url = jobs_url
+        self._session = use_session(session)
+        self.full_sync_interval = full_sync_interval
+        # time.monotonic() of the last full listing
+        self._last_full_sync = None
+        self._jobs = {}
+        self._by_phase = defaultdict(set)
+        self._by_owner = defaultdict(set)
+        # sorted pairs of (creation time as unix timestamp, job id)
+        self._by_creation = []
+        self._last_creation = None
+
+    def _fetch_list(self, params):
+        """
+        yields the jobs in the job list filtered by params.
+        """
+        try:
+            response = self._session.get(
+                self._jobs_url, params=params, stream=True)
+            response.raise_for_status()
+        except requests.RequestException as ex:
+            raise DALServiceError.from_except(ex, self._jobs_url)
+
+        response.raw.read = partial(response.raw.read, decode_content=True)
+        yield from uws.iter_job_list(response.raw.read)
+
+    def _fetch_job(self, jobid):
+        """
+        returns the full job description for jobid, or None if the job
+        no longer exists.
+        """
+        job_url = "{}/{}".format(self._jobs_url, jobid)
+        try:
+            response = self._session.get(job_url, stream=True)
+            if response.status_code in (404, 410):
+                return None
+            response.raise_for_status()
+        except requests.RequestException as ex:
+            raise DALServiceError.from_except(ex, job_url)
+
+        response.raw.read = partial(response.raw.read, decode_content=True)
+        return uws.parse_job(response.raw.read)
+
+    def _remove(self, jobid):
+        job = self._jobs.pop(jobid, None)
+        if job is None:
+            return
+
+        self._by_phase[job.phase].discard(jobid)
+        self._by_owner[job.ownerid].discard(jobid)
+        if job.creationtime is not None:
+            entry = (job.creationtime.unix, jobid)
+            index = bisect_left(self._by_creation, entry)
+            if self._by_creation[index:index + 1] == [entry]:
+                del self._by_creation[index]
+
+    def _store(self, job):
+        """
+        adds or replaces job, returning True if anything changed.
+        """
+        old = self._jobs.get(job.jobid)
+        if (old is not None
+                and old.phase == job.phase
+                and old.ownerid == job.ownerid):
+            return False
+
+        self._remove(job.jobid)
+        self._jobs[job.jobid] = job
+        self._by_phase[job.phase].add(job.jobid)
+        self._by_owner[job.ownerid].add(job.jobid)
+        if job.creationtime is not None:
+            creation = job.creationtime.unix
+            insort(self._by_creation, (creation, job.jobid))
+            if self._last_creation is None or creation > self._last_creation:
+                self._last_creation = creation
+        return True
+
+    def sync(self):
+        """
+        updates the table from the server.
+
+        Returns
+        -------
+        list of `~pyvo.io.uws.tree.JobSummary`
+            the jobs that are new or have changed since the last sync.
+        """
+        changed, seen = [], set()
+        incremental = self._last_creation is not None and not (
+            self.full_sync_interval is not None
+            and time.monotonic() - self._last_full_sync >= self.full_sync_interval)
+
+        params = {}
+        if incremental:
+            # back off a second so jobs created in the same instant as the
+            # newest one we know are not missed; duplicates are dropped
+            # by id.
+            params['AFTER'] = Time(
+                self._last_creation - 1, format='unix').isot + "Z"
+
+        for job in self._fetch_list(params):
+            seen.add(job.jobid)
+            if self._store(job):
+                changed.append(job)
+
+        if incremental:
+            for job in self._fetch_list({'PHASE': list(self.active_phases)}):
+                seen.add(job.jobid)
+                if self._store(job):
+                    changed.append(job)
+        else:
+            # the full list tells us which jobs are gone
+            for jobid in set(self._jobs) - seen:
+                self._remove(jobid)
+            self._last_full_sync = time.monotonic()
+
+        # jobs that went inactive since the last sync
+        for phase in self.active_phases:
+            for jobid in list(self._by_phase[phase] - seen):
+                job = self._fetch_job(jobid)
+                if job is None:
+                    self._remove(jobid)
+                elif self._store(job):
+                    changed.append(job)
+
+        return changed
+
+    def clear(self):
+        """
+        forgets all jobs, so that the next sync fetches the full job list.
+        """
+        self.__init__(self._jobs_url, session=self._session,
+                      full_sync_interval=self.full_sync_interval)
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def __iter__(self):
+        return iter(self._jobs.values())
+
+    def __contains__(self, jobid):
+        return jobid in self._jobs
+
+    def __getitem__(self, jobid):
+        return self._jobs[jobid]
+
+    def with_phase(self, *phases):
+        """
+        returns the jobs in any of phases.
+        """
+        return [self._jobs[jobid]
+                for phase in phases for jobid in self._by_phase[phase]]
+
+    def owned_by(self, ownerid):
+        """
+        returns the jobs of ownerid.
+        """
+        return [self._jobs[jobid] for jobid in self._by_owner[ownerid]]
+
+    def created_between(self, start=None, end=None):
+        """
+        returns the jobs created between start and end (both inclusive),
+        oldest first.  Jobs without a creation time are never returned.
+
+        Parameters
+        ----------
+        start, end : datetime, `~astropy.time.Time`, or str
+            the limits of the creation time; None for no limit.
+        """
+        low = 0
+        if start is not None:
+            low = bisect_left(self._by_creation, (_to_unix(start), ""))
+        high = len(self._by_creation)
+        if end is not None:
+            high = bisect_right(
+                self._by_creation, (_to_unix(end), "\U0010ffff"))
+        return [self._jobs[jobid] for _, jobid in self._by_creation[low:high]]
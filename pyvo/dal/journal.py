@@ -0,0 +1,188 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+A persistent record of submitted async TAP jobs.
+
+A `JobJournal` remembers the URLs of the async jobs `TAPService.run_async`
+submits, so that a later ``run_async`` with the same query (for instance,
+after the process waiting for the job was killed) can re-attach to the
+running or completed job rather than submitting the query again.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+
+from .exceptions import DALServiceError
+
+__all__ = ["JobJournal"]
+
+
+def _normalize_query(query):
+    """
+    returns query with runs of whitespace collapsed into single blanks.
+    """
+    if not isinstance(query, str):
+        return query
+    return " ".join(query.split())
+
+
+class JobJournal:
+    """
+    an on-disk journal of async TAP jobs.
+
+    Jobs are keyed by the service URL, the query parameters (with
+    whitespace in the query normalized) and a digest of the uploaded
+    tables.  Entries are removed when their job is finished with, when
+    the job has disappeared from the server, and when the job's
+    destruction time has passed.
+
+    The journal is an SQLite database and can be shared between
+    processes.
+    """
+
+    def __init__(self, path):
+        """
+        open (and, if necessary, create) a job journal.
+
+        Parameters
+        ----------
+        path : str
+            the file the journal is kept in.
+        """
+        self._path = os.path.expanduser(path)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " key TEXT PRIMARY KEY,"
+                " job_url TEXT,"
+                " phase TEXT,"
+                " destruction REAL,"
+                " updated REAL)")
+
+    @property
+    def path(self):
+        """
+        the file the journal is kept in
+        """
+        return self._path
+
+    @contextmanager
+    def _connect(self):
+        """
+        yields a database connection, committing and closing it on exit.
+        """
+        with closing(sqlite3.connect(self._path, timeout=30)) as conn:
+            with conn:
+                yield conn
+
+    def make_key(self, tapquery):
+        """
+        returns the journal key for an (async) `~pyvo.dal.TAPQuery`, or
+        None if the query has uploads that cannot be identified without
+        consuming them.
+        """
+        digests = []
+        for upload in tapquery._uploads:
+            digest = upload.digest()
+            if digest is None:
+                return None
+            digests.append((upload.name, digest))
+
+        params = sorted(
+            (key, str(_normalize_query(value) if key == "QUERY" else value))
+            for key, value in tapquery.items())
+
+        return hashlib.sha256(json.dumps(
+            [tapquery.baseurl, params, sorted(digests)]).encode("utf-8")
+        ).hexdigest()
+
+    def record(self, key, job):
+        """
+        stores or updates the journal entry for job under key.
+
+        Parameters
+        ----------
+        key : str
+            a key as returned by `make_key`
+        job : `~pyvo.dal.AsyncTAPJob`
+            the job to record
+        """
+        snapshot = job.job
+        destruction = snapshot.destruction
+        if destruction is not None:
+            destruction = destruction.unix
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs"
+                " (key, job_url, phase, destruction, updated)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, job.url, snapshot.phase, destruction, time.time()))
+
+    def discard(self, key):
+        """
+        removes the entry for key from the journal.
+        """
+        with self._connect() as conn:
+            conn.execute("DELETE FROM jobs WHERE key=?", (key,))
+
+    def collect_garbage(self):
+        """
+        removes all entries for jobs past their destruction time.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM jobs WHERE destruction IS NOT NULL"
+                " AND destruction<?", (time.time(),))
+
+    def get(self, key):
+        """
+        returns a tuple of job URL and the phase last recorded for key,
+        or None if there is no (live) entry for key.
+        """
+        self.collect_garbage()
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT job_url, phase FROM jobs WHERE key=?", (key,)
+            ).fetchone()
+
+    def reattach(self, key, *, session=None):
+        """
+        returns an `~pyvo.dal.AsyncTAPJob` for the job recorded under key,
+        or None if there is none that could still produce a result.
+
+        Entries for jobs that have vanished from the server or that ended
+        in an ERROR or ABORTED phase are discarded.
+        """
+        from .tap import AsyncTAPJob
+
+        entry = self.get(key)
+        if entry is None:
+            return None
+
+        try:
+            job = AsyncTAPJob(entry[0], session=session)
+        except DALServiceError:
+            self.discard(key)
+            return None
+
+        if job.phase in {"ERROR", "ABORTED", "ARCHIVED"}:
+            self.discard(key)
+            return None
+        return job
+
+    def __iter__(self):
+        """
+        iterates over (key, job URL, phase) of all live entries.
+        """
+        self.collect_garbage()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT key, job_url, phase FROM jobs ORDER BY updated"
+            ).fetchall()
+        return iter(rows)
+
+    def __len__(self):
+        return len(list(iter(self)))
@@ -6,8 +6,6 @@ A module for parsing and working with mimetypes
 import mimetypes
 from email.message import Message
 
-from astropy.io.fits import HDUList
-
 from ..utils.http import use_session
 
 
@@ -94,6 +92,7 @@ def mime_object_maker(url, mimetype, *, session=None):
         return session.get(url).text
 
     if mtype[1] == 'fits' or mtype[1] == 'x-fits':
+        from astropy.io.fits import HDUList
         response = session.get(url)
         return HDUList.fromstring(response.content)
 
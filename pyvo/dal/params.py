@@ -7,9 +7,7 @@ from collections.abc import MutableSet
 import abc
 
 from astropy import units as u
-from astropy.coordinates import SkyCoord
 from astropy.units import Quantity, Unit
-from astropy.time import Time
 from astropy.io.votable.converters import (
     get_converter as get_votable_converter)
 
@@ -125,6 +123,8 @@ class Timestamp(Converter):
         """
         Serialize time values for use in DAL Queries
         """
+        from astropy.time import Time
+
         value = Time(value)
 
         if value.size == 1:
@@ -301,6 +301,8 @@ class PosQueryParam(AbstractDalQueryParam):
         formats the tuple values into a string to be sent to the service
         entries in values are either quantities or assumed to be degrees
         """
+        from astropy.coordinates import SkyCoord
+
         self._validate_pos(val)
         if len(val) == 2 or len(val) == 3:
             shape = 'CIRCLE'
@@ -323,6 +325,7 @@ class PosQueryParam(AbstractDalQueryParam):
 
         This has probably done already somewhere else
         """
+        from astropy.coordinates import SkyCoord
 
         if len(pos) == 2:
             if not isinstance(pos[0], SkyCoord):
@@ -434,6 +437,8 @@ class TimeQueryParam(AbstractDalQueryParam):
     """
 
     def get_dal_format(self, val):
+        from astropy.time import Time
+
         if isinstance(val, tuple):
             if len(val) == 1:
                 max_time = min_time = val[0]
@@ -22,6 +22,7 @@ identify table columns.
 """
 __all__ = ["DALService", "DALQuery", "DALResults", "Record"]
 
+import hashlib
 import os
 import shutil
 import re
@@ -43,8 +44,13 @@ from .exceptions import (DALFormatError, DALServiceError, DALQueryError,
 
 from .. import samp
 
+from ..utils.concurrency import SingleFlight
 from ..utils.decorators import stream_decode_content
 from ..utils.http import use_session
+from ..utils.instrumentation import measure
+
+# shared by all DALQuery instances with coalesce_requests set
+_votable_flights = SingleFlight()
 
 
 class DALService:
@@ -141,10 +147,18 @@ class DALQuery(dict):
 
     A session can also optionally be passed in that will be used for
     network transactions made by this object to remote services.
+
+    If ``coalesce_requests`` is set (on the class or an instance),
+    concurrent ``execute_votable`` calls (and hence ``execute``) for
+    identical queries through the same session share a single request;
+    all callers get the same parsed VOTable, which therefore must not be
+    modified.
     """
 
     _ex = None
 
+    coalesce_requests = False
+
     def __init__(self, baseurl, *, session=None, **keywords):
         """
         initialize the query object with a baseurl
@@ -221,12 +235,15 @@ class DALQuery(dict):
         url = self.queryurl
         params = {k: v for k, v in self.items()}
 
-        if post:
-            response = self._session.post(url, data=params, stream=True,
-                                          allow_redirects=True)
-        else:
-            response = self._session.get(url, params=params, stream=True,
-                                         allow_redirects=True)
+        with measure("dal.submit", url, service=self.baseurl,
+                     method="POST" if post else "GET") as event:
+            if post:
+                response = self._session.post(url, data=params, stream=True,
+                                              allow_redirects=True)
+            else:
+                response = self._session.get(url, params=params, stream=True,
+                                             allow_redirects=True)
+            event.set_response(response)
         return response
 
     def execute_votable(self, *, post=False):
@@ -254,11 +271,42 @@ class DALQuery(dict):
         DALFormatError
         DALQueryError
         """
-        try:
-            return votableparse(self.execute_stream(post=post).read)
-        except Exception as e:
-            self.raise_if_error()
-            raise DALFormatError(e, self.queryurl)
+        return self._coalesced(post, self._execute_votable)
+
+    def _execute_votable(self, post):
+        with measure("dal.execute_votable", self.queryurl,
+                     service=self.baseurl) as event:
+            try:
+                stream = self.execute_stream(post=post)
+                event.mark("ttfb")
+                votable = votableparse(event.track_reads(stream))
+            except Exception as e:
+                self.raise_if_error()
+                raise DALFormatError(e, self.queryurl)
+            event.set_rows(votable)
+        return votable
+
+    def _coalescing_key(self, post):
+        """
+        returns a key identifying the request this query would make, or
+        None if it cannot be identified.
+        """
+        return (
+            id(self._session), self.queryurl, post,
+            tuple(sorted((key, repr(value)) for key, value in self.items())))
+
+    def _coalesced(self, post, execute):
+        """
+        returns execute(post), sharing the call with concurrent identical
+        queries if coalesce_requests is set.
+        """
+        if not self.coalesce_requests:
+            return execute(post)
+
+        key = self._coalescing_key(post)
+        if key is None:
+            return execute(post)
+        return _votable_flights.do(key, lambda: execute(post))
 
     def raise_if_error(self):
         """
@@ -296,10 +344,12 @@ class DALResults:
         Uses the optional session to make the request.
         """
         session = use_session(session)
-        return cls(
-            votableparse(cls._from_result_url(result_url, session).read),
-            url=result_url,
-            session=session)
+        with measure("dal.fetch_result", result_url) as event:
+            stream = cls._from_result_url(result_url, session)
+            event.mark("ttfb")
+            votable = votableparse(event.track_reads(stream))
+            event.set_rows(votable)
+        return cls(votable, url=result_url, session=session)
 
     def __init__(self, votable, *, url=None, session=None):
         """
@@ -794,14 +844,16 @@ class Record(Mapping):
         if not url:
             raise KeyError("no dataset access URL recognized in record")
 
-        if timeout:
-            response = self._session.get(url, stream=True, timeout=timeout)
-        else:
-            response = self._session.get(url, stream=True)
-        try:
-            response.raise_for_status()
-        except requests.RequestException as ex:
-            raise DALServiceError.from_except(ex, url)
+        with measure("dal.getdataset", url) as event:
+            if timeout:
+                response = self._session.get(url, stream=True, timeout=timeout)
+            else:
+                response = self._session.get(url, stream=True)
+            event.set_response(response)
+            try:
+                response.raise_for_status()
+            except requests.RequestException as ex:
+                raise DALServiceError.from_except(ex, url)
 
         return response.raw
 
@@ -1054,6 +1106,33 @@ class Upload:
 
         return fileobj
 
+    def digest(self):
+        """
+        A SHA-256 hex digest identifying the upload.
+
+        For inline uploads, it is computed from the content, otherwise from
+        the URI.  None is returned for file-like objects that cannot be read
+        without consuming them.
+        """
+        sha = hashlib.sha256()
+        if not self.is_inline:
+            sha.update(self.uri().encode("utf-8"))
+        elif self._is_table or self._is_resultset:
+            sha.update(self.fileobj().read())
+        elif self._is_fileobj:
+            if not (hasattr(self._content, "seekable")
+                    and self._content.seekable()):
+                return None
+            pos = self._content.tell()
+            content = self._content.read()
+            self._content.seek(pos)
+            sha.update(content.encode("utf-8")
+                if isinstance(content, str) else content)
+        else:
+            with open(self._content, "rb") as f:
+                sha.update(f.read())
+        return sha.hexdigest()
+
     def uri(self):
         """
         The URI pointing to the result
@@ -22,7 +22,6 @@ class can represent a specific service available at a URL endpoint.
 """
 from pyvo.io.vosi.vodataservice import TableParam
 
-from astropy.coordinates import SkyCoord
 from astropy.units import Unit, Quantity
 from astropy.io.votable.tree import Field
 from astropy.table import Table
@@ -320,6 +319,8 @@ class SCSQuery(DALQuery):
 
     @pos.setter
     def pos(self, pos):
+        from astropy.coordinates import SkyCoord
+
         setattr(self, "_pos", pos)
 
         if not isinstance(pos, SkyCoord):
@@ -542,6 +543,8 @@ class SCSRecord(DatalinkRecordMixin, Record):
         """
         the position of the object or observation described by this record.
         """
+        from astropy.coordinates import SkyCoord
+
         return SkyCoord(
             ra=self.getbyucd("POS_EQ_RA_MAIN"),
             dec=self.getbyucd("POS_EQ_DEC_MAIN"),
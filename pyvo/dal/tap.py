@@ -4,24 +4,28 @@ A module for accessing remote source and observation catalogs
 """
 from functools import partial
 from datetime import datetime
-from time import sleep
+from importlib.util import find_spec
+from time import sleep, monotonic
 
 import requests
 from urllib.parse import urlparse, urljoin
 
-from astropy.io.votable import parse as votableparse
+from astropy.io.votable import parse as votableparse, from_table
+from astropy.table import Table
 
 from .query import (
     DALResults, DALQuery, DALService, Record, UploadList,
-    DALServiceError, DALQueryError)
+    DALServiceError, DALQueryError, DALFormatError)
 from .vosi import AvailabilityMixin, CapabilityMixin, VOSITables
 from .adhoc import DatalinkResultsMixin, DatalinkRecordMixin, SodaRecordMixin
+from .jobtable import JobTable
 
 from ..io import vosi, uws
 from ..io.vosi import tapregext as tr
 
 from ..utils.formatting import para_format_desc
 from ..utils.http import use_session
+from ..utils.instrumentation import measure
 from ..utils.prototype import prototype_feature
 import xml.etree.ElementTree
 import io
@@ -31,6 +35,11 @@ __all__ = [
 
 IVOA_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
 
+# the execution phases defined by UWS 1.1
+UWS_PHASES = {
+    "PENDING", "QUEUED", "EXECUTING", "COMPLETED", "ERROR", "ABORTED",
+    "UNKNOWN", "HELD", "SUSPENDED", "ARCHIVED"}
+
 # file formats supported by table upload and their corresponding MIME types
 TABLE_UPLOAD_FORMAT = {'tsv': 'text/tab-separated-values',
                        'csv': 'text/csv',
@@ -39,6 +48,25 @@ TABLE_UPLOAD_FORMAT = {'tsv': 'text/tab-separated-values',
 TABLE_DEF_FORMAT = {'VOSITable': 'text/xml',
                     'VOTable': 'application/x-votable+xml'}
 
+# output formats that decode faster than TABLEDATA VOTables, with the
+# TAPRegExt identifier and the MIME types services declare them with.
+FAST_OUTPUT_FORMATS = {
+    'votable/b2': ('ivo://ivoa.net/std/TAPRegExt#output-votable-binary2',
+                   ('application/x-votable+xml;serialization=binary2',)),
+    'votable/b': ('ivo://ivoa.net/std/TAPRegExt#output-votable-binary',
+                  ('application/x-votable+xml;serialization=binary',)),
+    'parquet': (None, ('application/vnd.apache.parquet',
+                       'application/x-parquet',
+                       'application/parquet')),
+    'fits': (None, ('application/fits',
+                    'application/x-fits-bintable')),
+}
+
+# the order in which FAST_OUTPUT_FORMATS are tried when negotiating a
+# response format.  Binary VOTables come first because they keep all
+# VOTable metadata (UCDs, utypes, xtypes) that FITS and parquet may lose.
+OUTPUT_FORMAT_PREFERENCE = ('votable/b2', 'votable/b', 'parquet', 'fits')
+
 
 def _from_ivoa_format(datetime_str):
     """
@@ -56,6 +84,51 @@ def _from_ivoa_format(datetime_str):
         return datetime.strptime(datetime_str, "%Y-%m-%dT%H:%M:%SZ")
 
 
+def _normalize_mime(mime):
+    """
+    returns a lowercased MIME type without whitespace for comparisons.
+    """
+    return "".join((mime or "").split()).lower()
+
+
+def _table_format_for(content_type):
+    """
+    returns the astropy table format name for a FITS or parquet content
+    type and None for anything else (which is then parsed as VOTable).
+    """
+    mime = _normalize_mime(content_type).split(";")[0]
+    if mime in FAST_OUTPUT_FORMATS['fits'][1]:
+        return 'fits'
+    if mime in FAST_OUTPUT_FORMATS['parquet'][1]:
+        return 'parquet'
+    return None
+
+
+def _parse_result_stream(stream, content_type=None):
+    """
+    parses a TAP result stream into a VOTableFile.
+
+    FITS binary tables and parquet files are decoded through astropy's
+    table readers and wrapped into a VOTable, so that column metadata
+    present in the file ends up in the fields of the result table.
+    Anything else goes through the VOTable parser.
+
+    Parameters
+    ----------
+    stream : file-like
+        the (decoded) response body
+    content_type : str
+        the Content-Type of the response
+    """
+    table_format = _table_format_for(content_type)
+    if table_format is None:
+        return votableparse(stream.read)
+
+    # neither the FITS nor the parquet reader work on unseekable streams
+    table = Table.read(io.BytesIO(stream.read()), format=table_format)
+    return from_table(table)
+
+
 def escape(term):
     """
     escapes a term for use in ADQL
@@ -63,7 +136,8 @@ def escape(term):
     return str(term).replace("'", "''")
 
 
-def search(url, query, *, language="ADQL", maxrec=None, uploads=None, **keywords):
+def search(url, query, *, language="ADQL", maxrec=None, uploads=None,
+           response_format=None, **keywords):
     """
     submit a Table Access query that returns rows matching the criteria given.
 
@@ -80,6 +154,10 @@ def search(url, query, *, language="ADQL", maxrec=None, uploads=None, **keywords
         the maximum records to return. defaults to the service default
     uploads : dict
         a mapping from table names to file like objects containing a votable
+    response_format : str
+        the RESPONSEFORMAT to request; ``"auto"`` picks the fastest
+        format the service declares (see
+        `TAPService.negotiate_response_format`).
 
     Returns
     -------
@@ -96,7 +174,9 @@ def search(url, query, *, language="ADQL", maxrec=None, uploads=None, **keywords
         an error, including a query syntax error.
     """
     service = TAPService(url)
-    return service.search(query, language=language, maxrec=maxrec, uploads=uploads, **keywords)
+    return service.search(
+        query, language=language, maxrec=maxrec, uploads=uploads,
+        response_format=response_format, **keywords)
 
 
 class TAPService(DALService, AvailabilityMixin, CapabilityMixin):
@@ -106,8 +186,10 @@ class TAPService(DALService, AvailabilityMixin, CapabilityMixin):
 
     _tables = None
     _examples = None
+    _job_table = None
 
-    def __init__(self, baseurl, *, capability_description=None, session=None):
+    def __init__(self, baseurl, *, capability_description=None, session=None,
+                 response_format=None):
         """
         instantiate a Table Access Protocol service
 
@@ -117,8 +199,14 @@ class TAPService(DALService, AvailabilityMixin, CapabilityMixin):
            the base URL that should be used for forming queries to the service.
         session : object
            optional session to use for network requests
+        response_format : str
+           the default RESPONSEFORMAT for queries to this service.  Pass
+           ``"auto"`` to use the fastest format the service declares.
+           By default, no RESPONSEFORMAT is sent and the service returns
+           its default format (usually TABLEDATA VOTable).
         """
         super().__init__(baseurl, session=session, capability_description=capability_description)
+        self.response_format = response_format
 
         # Check if the session has an update_from_capabilities attribute.
         # This means that the session is aware of IVOA capabilities,
@@ -149,18 +237,20 @@ class TAPService(DALService, AvailabilityMixin, CapabilityMixin):
         if self._tables is None:
             tables_url = '{}/tables'.format(self.baseurl)
 
-            response = self._session.get(tables_url, stream=True)
+            with measure("vosi.tables", tables_url, service=self.baseurl) as event:
+                response = self._session.get(tables_url, stream=True)
+                event.set_response(response)
 
-            try:
-                response.raise_for_status()
-            except requests.RequestException as ex:
-                raise DALServiceError.from_except(ex, tables_url)
+                try:
+                    response.raise_for_status()
+                except requests.RequestException as ex:
+                    raise DALServiceError.from_except(ex, tables_url)
 
-            # requests doesn't decode the content by default
-            response.raw.read = partial(response.raw.read, decode_content=True)
+                # requests doesn't decode the content by default
+                response.raw.read = partial(response.raw.read, decode_content=True)
 
-            self._tables = VOSITables(
-                vosi.parse_tables(response.raw.read), tables_url)
+                self._tables = VOSITables(
+                    vosi.parse_tables(event.track_reads(response.raw)), tables_url)
         return self._tables
 
     def _parse_examples(self, examples_uri, *, depth=0):
@@ -246,9 +336,52 @@ class TAPService(DALService, AvailabilityMixin, CapabilityMixin):
         """
         return self.get_tap_capability().uploadmethods
 
+    def negotiate_response_format(self, *, preference=None):
+        """
+        returns a RESPONSEFORMAT value selecting the first format from
+        ``preference`` that the service declares in its capabilities,
+        or None if it declares none of them.
+
+        Parquet is only considered if pyarrow is installed.
+
+        Parameters
+        ----------
+        preference : sequence of str
+            keys of `FAST_OUTPUT_FORMATS` in order of preference;
+            defaults to `OUTPUT_FORMAT_PREFERENCE`.
+        """
+        try:
+            outputformats = self.get_tap_capability().outputformats
+        except DALServiceError:
+            return None
+
+        for key in preference or OUTPUT_FORMAT_PREFERENCE:
+            if key == 'parquet' and find_spec('pyarrow') is None:
+                continue
+
+            ivo_id, mimes = FAST_OUTPUT_FORMATS[key]
+            for outputformat in outputformats:
+                if ((ivo_id and outputformat.ivo_id == ivo_id)
+                        or _normalize_mime(outputformat.mime) in mimes):
+                    # aliases are shorter and don't need escaping
+                    if outputformat.aliases:
+                        return outputformat.aliases[0]
+                    return outputformat.mime
+        return None
+
+    def _get_response_format(self, response_format):
+        """
+        resolves the response_format argument of the query methods
+        """
+        if response_format is None:
+            response_format = self.response_format
+        if response_format == "auto":
+            return self.negotiate_response_format()
+        return response_format
+
     def run_sync(
             self, query, *, language="ADQL", maxrec=None, uploads=None,
-            **keywords):
+            response_format=None, **keywords):
         """
         runs sync query and returns its result
 
@@ -263,6 +396,9 @@ class TAPService(DALService, AvailabilityMixin, CapabilityMixin):
             the maximum records to return. defaults to the service default
         uploads : dict
             a mapping from table names to objects containing a votable
+        response_format : str
+            the RESPONSEFORMAT to request, ``"auto"`` to negotiate one.
+            defaults to the service's ``response_format``.
 
         Returns
         -------
@@ -275,14 +411,14 @@ class TAPService(DALService, AvailabilityMixin, CapabilityMixin):
         """
         return self.create_query(
             query, language=language, maxrec=maxrec, uploads=uploads,
-            **keywords).execute()
+            response_format=response_format, **keywords).execute()
 
     # alias for service discovery
     search = run_sync
 
     def run_async(
             self, query, *, language="ADQL", maxrec=None, uploads=None,
-            **keywords):
+            response_format=None, journal=None, **keywords):
         """
         runs async query and returns its result
 
@@ -297,6 +433,13 @@ class TAPService(DALService, AvailabilityMixin, CapabilityMixin):
             the maximum records to return. defaults to the service default
         uploads : dict
             a mapping from table names to objects containing a votable
+        response_format : str
+            the RESPONSEFORMAT to request, ``"auto"`` to negotiate one.
+            defaults to the service's ``response_format``.
+        journal : `~pyvo.dal.JobJournal`
+            if given, the job is recorded in this journal while it runs,
+            and if the journal already has a live job for the same query,
+            that job is re-used instead of submitting a new one.
 
         Returns
         -------
@@ -317,8 +460,15 @@ class TAPService(DALService, AvailabilityMixin, CapabilityMixin):
         --------
         AsyncTAPJob
         """
+        if journal is not None:
+            return self._run_journaled(
+                journal, self.create_query(
+                    query, mode="async", language=language, maxrec=maxrec,
+                    uploads=uploads, response_format=response_format, **keywords))
+
         job = AsyncTAPJob.create(
             self.baseurl, query, language=language, maxrec=maxrec, uploads=uploads,
+            response_format=self._get_response_format(response_format),
             session=self._session, **keywords)
         job = job.run().wait()
         job.raise_if_error()
@@ -327,9 +477,41 @@ class TAPService(DALService, AvailabilityMixin, CapabilityMixin):
 
         return result
 
+    def _run_journaled(self, journal, tapquery):
+        """
+        runs the async tapquery like run_async, keeping its job in journal.
+        """
+        key = journal.make_key(tapquery)
+        job = None
+        if key is not None:
+            job = journal.reattach(key, session=self._session)
+
+        if job is None:
+            job = AsyncTAPJob(tapquery.submit().url, session=self._session)
+            if key is not None:
+                journal.record(key, job)
+
+        try:
+            if job.phase == "PENDING":
+                job.run()
+            job.wait()
+            if key is not None:
+                journal.record(key, job)
+            job.raise_if_error()
+            result = job.fetch_result()
+        except DALQueryError:
+            if key is not None:
+                journal.discard(key)
+            raise
+
+        job.delete()
+        if key is not None:
+            journal.discard(key)
+        return result
+
     def submit_job(
             self, query, *, language="ADQL", maxrec=None, uploads=None,
-            **keywords):
+            response_format=None, **keywords):
         """
         submit a async query without starting it and returns a AsyncTAPJob
         object
@@ -345,6 +527,9 @@ class TAPService(DALService, AvailabilityMixin, CapabilityMixin):
             the maximum records to return. defaults to the service default
         uploads : dict
             a mapping from table names to objects containing a votable
+        response_format : str
+            the RESPONSEFORMAT to request, ``"auto"`` to negotiate one.
+            defaults to the service's ``response_format``.
 
         Returns
         -------
@@ -357,11 +542,12 @@ class TAPService(DALService, AvailabilityMixin, CapabilityMixin):
         """
         return AsyncTAPJob.create(
             self.baseurl, query, language=language, maxrec=maxrec, uploads=uploads,
+            response_format=self._get_response_format(response_format),
             session=self._session, **keywords)
 
     def create_query(
             self, query=None, *, mode="sync", language="ADQL", maxrec=None,
-            uploads=None, **keywords):
+            uploads=None, response_format=None, **keywords):
         """
         create a query object that constraints can be added to and then
         executed.  The input arguments will initialize the query with the
@@ -383,10 +569,14 @@ class TAPService(DALService, AvailabilityMixin, CapabilityMixin):
             defaults to the service default.
         uploads : dict
             a mapping from table names to objects containing a votable.
+        response_format : str
+            the RESPONSEFORMAT to request, ``"auto"`` to negotiate one.
+            defaults to the service's ``response_format``.
         """
         return TAPQuery(
             self.baseurl, query, mode=mode, language=language, maxrec=maxrec,
-            uploads=uploads, session=self._session, **keywords)
+            uploads=uploads, response_format=self._get_response_format(response_format),
+            session=self._session, **keywords)
 
     def get_job(self, job_id):
         """
@@ -409,8 +599,20 @@ class TAPService(DALService, AvailabilityMixin, CapabilityMixin):
                                     decode_content=True)
         return uws.parse_job(response.raw.read)
 
+    @property
+    def job_table(self):
+        """
+        a `~pyvo.dal.JobTable` with the jobs of this service visible in the
+        current security context, as of the last ``sync()`` (or
+        ``get_job_list(incremental=True)``).
+        """
+        if self._job_table is None:
+            self._job_table = JobTable(
+                '{}/async'.format(self.baseurl), session=self._session)
+        return self._job_table
+
     def get_job_list(self, *, phases=None, after=None, last=None,
-                     short_description=True):
+                     short_description=True, incremental=False):
         """
         lists jobs that the caller can see in the current security context.
         The list can be filtered on the server side by the phases of the jobs,
@@ -430,11 +632,20 @@ class TAPService(DALService, AvailabilityMixin, CapabilityMixin):
             corresponding to the TAP ShortJobDescription object (job ID, phase,
             run ID, owner ID and creation ID) whereas if False, a separate GET
             call to each job is performed for the complete job description.
+        incremental: flag - True or False
+            If True, only the changes since the last incremental call are
+            fetched into `job_table`, and the filters are applied to the
+            jobs there.
 
         Returns
         -------
         list of `~pyvo.io.uws.tree.JobSummary`
         """
+        if incremental:
+            jobs = self._get_synced_jobs(phases=phases, after=after, last=last)
+            if not short_description:
+                return [self.get_job(job.jobid) for job in jobs]
+            return jobs
 
         params = {'PHASE': phases, 'LAST': last}
 
@@ -457,6 +668,28 @@ class TAPService(DALService, AvailabilityMixin, CapabilityMixin):
         else:
             return list(jobs)
 
+    def _get_synced_jobs(self, *, phases=None, after=None, last=None):
+        """
+        syncs job_table and returns the jobs in it matching the
+        get_job_list filters, newest last.
+        """
+        self.job_table.sync()
+
+        jobs = self.job_table.created_between(start=after)
+        # creation time is optional in UWS job lists
+        jobs.extend(
+            job for job in self.job_table if job.creationtime is None)
+
+        if phases:
+            jobs = [job for job in jobs if job.phase in phases]
+        else:
+            # like the server, hide archived jobs by default
+            jobs = [job for job in jobs if job.phase != "ARCHIVED"]
+
+        if last:
+            jobs = jobs[-last:]
+        return jobs
+
     def describe(self, width=None):
         """
         Print a summary description of this service.
@@ -609,14 +842,22 @@ class TAPService(DALService, AvailabilityMixin, CapabilityMixin):
 class AsyncTAPJob:
     """
     This class represents a UWS TAP Job.
+
+    Job properties are read from a snapshot of the job document (see
+    `refresh`).  A snapshot older than ``max_age`` seconds is refreshed
+    on the next property access; when only the phase is needed, it is
+    fetched from the job's lightweight ``phase`` endpoint instead.
+    Changes to the job made through this object invalidate the snapshot.
     """
 
     _job = {}
+    _job_time = None
+    _phase = None
 
     @classmethod
     def create(
             cls, baseurl, query, *, language="ADQL", maxrec=None, uploads=None,
-            session=None, **keywords):
+            response_format=None, session=None, **keywords):
         """
         creates a async tap job on the server under ``baseurl``
 
@@ -633,17 +874,20 @@ class AsyncTAPJob:
             the maximum records to return. defaults to the service default
         uploads : dict
             a mapping from table names to objects containing a votable
+        response_format : str
+            the RESPONSEFORMAT to request
         session : object
            optional session to use for network requests
         """
         tapquery = TAPQuery(
             baseurl, query, mode="async", language=language, maxrec=maxrec,
-            uploads=uploads, session=session, **keywords)
+            uploads=uploads, response_format=response_format, session=session,
+            **keywords)
         response = tapquery.submit()
         job = cls(response.url, session=session)
         return job
 
-    def __init__(self, url, *, session=None):
+    def __init__(self, url, *, session=None, max_age=1.):
         """
         initialize the job object with the given url and fetch remote values
 
@@ -651,9 +895,16 @@ class AsyncTAPJob:
         ----------
         url : str
             the job url
+        session : object
+           optional session to use for network requests
+        max_age : float
+            the time in seconds for which property reads are served from
+            the current job snapshot.  Set to 0 to fetch the job on every
+            property access.
         """
         self._url = url
         self._session = use_session(session)
+        self.max_age = max_age
         self._update()
 
     def __enter__(self):
@@ -675,32 +926,94 @@ class AsyncTAPJob:
         """
         updates local job infos with remote values
         """
+        with measure("uws.update", self.url, service=self._service_url,
+                     wait=wait_for_statechange) as event:
+            try:
+                if wait_for_statechange:
+                    response = self._session.get(
+                        self.url, stream=True, timeout=timeout, params={
+                            "WAIT": "-1"
+                        }
+                    )
+                else:
+                    response = self._session.get(self.url, stream=True, timeout=timeout)
+                event.set_response(response)
+                response.raise_for_status()
+            except requests.RequestException as ex:
+                raise DALServiceError.from_except(ex, self.url)
+
+            # requests doesn't decode the content by default
+            response.raw.read = partial(response.raw.read, decode_content=True)
+
+            # replace rather than update the snapshot so that snapshots handed
+            # out by refresh() never change
+            self._job = uws.parse_job(response.raw.read)
+            event.set(phase=self._job.phase)
+        self._job_time = monotonic()
+        self._phase = None
+
+    def _is_fresh(self, timestamp):
+        """
+        returns True if something fetched at timestamp is younger than
+        max_age.
+        """
+        return timestamp is not None and monotonic() - timestamp < self.max_age
+
+    def _invalidate(self):
+        """
+        marks the current snapshot as outdated
+        """
+        self._job_time = None
+        self._phase = None
+
+    def _get_snapshot(self):
+        """
+        returns the current snapshot, refreshing it if it is too old
+        """
+        if not self._is_fresh(self._job_time):
+            self._update()
+        return self._job
+
+    def _fetch_phase(self):
+        """
+        returns the job phase from the phase endpoint, falling back to
+        the full job document if that endpoint does not give a phase.
+        """
         try:
-            if wait_for_statechange:
-                response = self._session.get(
-                    self.url, stream=True, timeout=timeout, params={
-                        "WAIT": "-1"
-                    }
-                )
-            else:
-                response = self._session.get(self.url, stream=True, timeout=timeout)
+            response = self._session.get('{}/phase'.format(self.url))
             response.raise_for_status()
-        except requests.RequestException as ex:
-            raise DALServiceError.from_except(ex, self.url)
+            phase = response.text.strip()
+        except requests.RequestException:
+            phase = None
 
-        # requests doesn't decode the content by default
-        response.raw.read = partial(response.raw.read, decode_content=True)
+        if phase not in UWS_PHASES:
+            self._update()
+            phase = self._job.phase
+        return phase
+
+    def refresh(self):
+        """
+        fetches the job document from the server and returns it.
 
-        self._job = uws.parse_job(response.raw.read)
+        The returned `~pyvo.io.uws.tree.JobSummary` is a snapshot of the
+        job at the time of the call; later refreshes replace it rather
+        than modify it.  Property reads within ``max_age`` seconds of a
+        refresh are served from this snapshot.
+
+        Returns
+        -------
+        `~pyvo.io.uws.tree.JobSummary`
+        """
+        self._update()
+        return self._job
 
     @property
     def job(self):
         """
-        all up-to-date uws job infos as dictionary
+        the uws job infos as a `~pyvo.io.uws.tree.JobSummary`, refreshed
+        if older than ``max_age``.
         """
-        # keep it up to date
-        self._update()
-        return self._job
+        return self._get_snapshot()
 
     @property
     def url(self):
@@ -709,6 +1022,16 @@ class AsyncTAPJob:
         """
         return self._url
 
+    @property
+    def _service_url(self):
+        """
+        the URL of the service the job belongs to, i.e., the job url
+        without the job list and job id
+        """
+        if self._url is None:
+            return None
+        return self._url.rstrip("/").rsplit("/", 2)[0]
+
     @property
     def job_id(self):
         """
@@ -721,16 +1044,19 @@ class AsyncTAPJob:
         """
         the current query phase
         """
-        self._update()
-        return self._job.phase
+        if self._is_fresh(self._job_time):
+            return self._job.phase
+
+        if self._phase is None or not self._is_fresh(self._phase[1]):
+            self._phase = (self._fetch_phase(), monotonic())
+        return self._phase[0]
 
     @property
     def execution_duration(self):
         """
         maximum execution duration as `~astropy.time.TimeDelta`.
         """
-        self._update()
-        return self._job.executionduration
+        return self._get_snapshot().executionduration
 
     @execution_duration.setter
     def execution_duration(self, value):
@@ -750,8 +1076,7 @@ class AsyncTAPJob:
         datetime after which the job results are deleted automatically.
         read-write
         """
-        self._update()
-        return self._job.destruction
+        return self._get_snapshot().destruction
 
     @destruction.setter
     def destruction(self, value):
@@ -782,24 +1107,21 @@ class AsyncTAPJob:
         """
         estimated runtime
         """
-        self._update()
-        return self._job.quote
+        return self._get_snapshot().quote
 
     @property
     def owner(self):
         """
         job owner (if applicable)
         """
-        self._update()
-        return self._job.ownerid
+        return self._get_snapshot().ownerid
 
     @property
     def query(self):
         """
         the job query
         """
-        self._update()
-        for parameter in self._job.parameters:
+        for parameter in self._get_snapshot().parameters:
             if parameter.id_.lower() == 'query':
                 return parameter.content
         return ''
@@ -891,8 +1213,7 @@ class AsyncTAPJob:
         generally will not have to look at this.
 
         """
-        self._update()
-        return self._job.version
+        return self._get_snapshot().version
 
     def run(self):
         """
@@ -905,6 +1226,7 @@ class AsyncTAPJob:
         except requests.RequestException as ex:
             raise DALServiceError.from_except(ex, self.url)
 
+        self._invalidate()
         return self
 
     def abort(self):
@@ -918,6 +1240,7 @@ class AsyncTAPJob:
         except requests.RequestException as ex:
             raise DALServiceError.from_except(ex, self.url)
 
+        self._invalidate()
         return self
 
     def wait(self, *, phases=None, timeout=600.):
@@ -943,21 +1266,25 @@ class AsyncTAPJob:
         active_phases = {
             "QUEUED", "EXECUTING", "RUN", "COMPLETED", "ERROR", "UNKNOWN"}
 
-        while True:
-            self._update(wait_for_statechange=True, timeout=timeout)
-            # use the cached value
-            cur_phase = self._job.phase
+        with measure("uws.wait", self.url, service=self._service_url) as event:
+            polls = 0
+            while True:
+                self._update(wait_for_statechange=True, timeout=timeout)
+                polls += 1
+                # use the cached value
+                cur_phase = self._job.phase
+                event.set(polls=polls, phase=cur_phase)
 
-            if cur_phase not in active_phases:
-                raise DALServiceError(
-                    "Cannot wait for job completion. Job is not active!")
+                if cur_phase not in active_phases:
+                    raise DALServiceError(
+                        "Cannot wait for job completion. Job is not active!")
 
-            if cur_phase in phases:
-                break
+                if cur_phase in phases:
+                    break
 
-            # fallback for uws 1.0 or unsupported WAIT parameter
-            sleep(interval)
-            interval = min(120, interval * increment)
+                # fallback for uws 1.0 or unsupported WAIT parameter
+                sleep(interval)
+                interval = min(120, interval * increment)
 
         return self
 
@@ -974,6 +1301,7 @@ class AsyncTAPJob:
             raise DALServiceError.from_except(ex, self.url)
 
         self._url = None
+        self._invalidate()
 
     def raise_if_error(self):
         """
@@ -985,9 +1313,10 @@ class AsyncTAPJob:
             if theres an error
         """
         if self.phase in {"ERROR", "ABORTED"}:
+            job = self._get_snapshot()
             msg = ""
-            if self._job and self._job.errorsummary:
-                msg = self._job.errorsummary.message.content
+            if job and job.errorsummary:
+                msg = job.errorsummary.message.content
             msg = msg or "<No useful error from server>"
             raise DALQueryError("Query Error: " + msg, self.url)
 
@@ -995,18 +1324,28 @@ class AsyncTAPJob:
         """
         returns the result votable if query is finished
         """
-        try:
-            response = self._session.get(self.result_uri, stream=True)
-            response.raise_for_status()
-        except requests.RequestException as ex:
-            self._update()
-            # we propably got a 404 because query error. raise with error msg
-            self.raise_if_error()
-            raise DALServiceError.from_except(ex, self.url)
-
-        response.raw.read = partial(
-            response.raw.read, decode_content=True)
-        return TAPResults(votableparse(response.raw.read), url=self.result_uri, session=self._session)
+        with measure("uws.fetch_result", self.result_uri,
+                     service=self._service_url) as event:
+            try:
+                response = self._session.get(self.result_uri, stream=True)
+                event.set_response(response)
+                response.raise_for_status()
+            except requests.RequestException as ex:
+                self._update()
+                # we propably got a 404 because query error. raise with error msg
+                self.raise_if_error()
+                raise DALServiceError.from_except(ex, self.url)
+
+            response.raw.read = partial(
+                response.raw.read, decode_content=True)
+            response.raw.read = event.track_reads(response.raw)
+            try:
+                votable = _parse_result_stream(
+                    response.raw, response.headers.get('Content-Type'))
+            except Exception as ex:
+                raise DALFormatError(ex, self.result_uri)
+            event.set_rows(votable)
+        return TAPResults(votable, url=self.result_uri, session=self._session)
 
 
 class TAPQuery(DALQuery):
@@ -1031,7 +1370,7 @@ class TAPQuery(DALQuery):
 
     def __init__(
             self, baseurl, query, *, mode="sync", language="ADQL", maxrec=None,
-            uploads=None, session=None, **keywords):
+            uploads=None, response_format=None, session=None, **keywords):
         """
         initialize the query object with the given parameters
 
@@ -1049,6 +1388,9 @@ class TAPQuery(DALQuery):
             the amount of records to fetch
         uploads : dict
             Files to upload. Uses table name as key and table content as value.
+        response_format : str
+            the RESPONSEFORMAT (MIME type or alias) to request.  FITS and
+            parquet responses are decoded into a VOTable-backed result.
         session : object
            optional session to use for network requests
         """
@@ -1065,6 +1407,9 @@ class TAPQuery(DALQuery):
         if maxrec:
             self["MAXREC"] = maxrec
 
+        if response_format:
+            self["RESPONSEFORMAT"] = response_format
+
         self["QUERY"] = query
 
         if self._uploads:
@@ -1100,6 +1445,50 @@ class TAPQuery(DALQuery):
 
         return super().execute_stream(post=post)
 
+    def execute_votable(self, *, post=False):
+        """
+        Submit the query and return the results as an AstroPy votable instance.
+
+        In contrast to `~pyvo.dal.DALQuery.execute_votable`, FITS and
+        parquet responses are decoded, too, and returned as a VOTable.
+
+        Raises
+        ------
+        DALServiceError
+           for errors connecting to or communicating with the service
+        DALFormatError
+           for errors parsing the response
+        """
+        return self._coalesced(post, self._execute_votable)
+
+    def _execute_votable(self, post):
+        with measure("dal.execute_votable", self.queryurl,
+                     service=self.baseurl) as event:
+            try:
+                stream = self.execute_stream(post=post)
+                event.mark("ttfb")
+                stream.read = event.track_reads(stream)
+                headers = getattr(stream, "headers", None) or {}
+                votable = _parse_result_stream(stream, headers.get("Content-Type"))
+            except Exception as e:
+                self.raise_if_error()
+                raise DALFormatError(e, self.queryurl)
+            event.set_rows(votable)
+        return votable
+
+    def _coalescing_key(self, post):
+        key = super()._coalescing_key(post)
+        if self._mode != "sync":
+            return None
+
+        digests = []
+        for upload in self._uploads:
+            digest = upload.digest()
+            if digest is None:
+                return None
+            digests.append((upload.name, digest))
+        return key + (tuple(digests),)
+
     def execute(self):
         """
         submit the query and return the results as a TAPResults instance
@@ -1131,8 +1520,10 @@ class TAPQuery(DALQuery):
             if upload.is_inline
         }
 
-        response = self._session.post(
-            url, data=self, stream=True, files=files)
+        with measure("dal.submit", url, service=self.baseurl, method="POST") as event:
+            response = self._session.post(
+                url, data=self, stream=True, files=files)
+            event.set_response(response)
         # requests doesn't decode the content by default
         response.raw.read = partial(response.raw.read, decode_content=True)
         return response
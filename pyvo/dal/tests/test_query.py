@@ -14,10 +14,15 @@ import pytest
 import numpy as np
 
 import platform
+import threading
 
+from pyvo.dal import query as dalquery
 from pyvo.dal.query import DALService, DALQuery, DALResults, Record
 from pyvo.dal.exceptions import DALServiceError, DALQueryError, DALFormatError, DALOverflowWarning
 from pyvo.version import version
+from pyvo.utils.concurrency import SingleFlight
+from pyvo.utils.http import create_session
+from pyvo.utils.testing import FollowerGate
 
 from astropy.table import Table, QTable
 from astropy.io.votable.tree import VOTableFile
@@ -287,6 +292,74 @@ class TestDALQuery:
         assert raw.strip().endswith(b'</VOTABLE>')
 
 
+@pytest.mark.filterwarnings('ignore::astropy.io.votable.exceptions.W03')
+@pytest.mark.filterwarnings('ignore::astropy.io.votable.exceptions.W06')
+class TestCoalescedQueries:
+    @pytest.fixture()
+    def gate(self, monkeypatch):
+        gate = FollowerGate()
+        monkeypatch.setattr(
+            dalquery, '_votable_flights', SingleFlight(on_join=gate.joined))
+        return gate
+
+    @pytest.fixture()
+    def slow_service(self, mocker, gate):
+        def callback(request, context):
+            # hold the request until the other queries have joined it
+            gate.wait()
+            return get_pkg_data_contents('data/query/basic.xml')
+
+        with mocker.register_uri(
+                'GET', 'http://example.com/query/slow', content=callback
+        ) as matcher:
+            yield matcher
+
+    def _run_concurrently(self, queries):
+        results = []
+        threads = [
+            threading.Thread(target=lambda q=q: results.append(q.execute()))
+            for q in queries]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_coalesced(self, slow_service, gate):
+        gate.followers = 3
+        session = create_session()
+        queries = [
+            DALQuery('http://example.com/query/slow', session=session, foo=1)
+            for _ in range(4)]
+        for query in queries:
+            query.coalesce_requests = True
+
+        results = self._run_concurrently(queries)
+        assert slow_service.call_count == 1
+        assert len(results) == 4
+        for dalresults in results:
+            _test_results(dalresults)
+        assert len(set(id(r.votable) for r in results)) == 1
+
+    def test_not_coalesced_by_default(self, slow_service):
+        session = create_session()
+        self._run_concurrently([
+            DALQuery('http://example.com/query/slow', session=session)
+            for _ in range(3)])
+        assert slow_service.call_count == 3
+
+    def test_different_parameters(self, slow_service):
+        session = create_session()
+        queries = [
+            DALQuery('http://example.com/query/slow', session=session, foo=i)
+            for i in range(3)]
+        for query in queries:
+            query.coalesce_requests = True
+
+        self._run_concurrently(queries)
+        assert slow_service.call_count == 3
+
+
 @pytest.mark.filterwarnings('ignore::astropy.io.votable.exceptions.W03')
 @pytest.mark.filterwarnings('ignore::astropy.io.votable.exceptions.W06')
 @pytest.mark.usefixtures('register_mocks')
@@ -13,14 +13,16 @@ import tempfile
 import pytest
 import requests_mock
 
-from pyvo.dal.tap import escape, search, AsyncTAPJob, TAPService
-from pyvo.dal import DALQueryError, DALServiceError
+from pyvo.dal.tap import escape, search, AsyncTAPJob, TAPService, TAPQuery
+from pyvo.dal import (
+    DALQueryError, DALServiceError, DALFormatError, JobJournal, JobTable)
 
 from pyvo.io.uws import JobFile
 from pyvo.io.uws.tree import Parameter, Result, ErrorSummary, Message
 from pyvo.io.vosi.exceptions import VOSIError
 from pyvo.utils import prototype
 
+from astropy.table import Table
 from astropy.time import Time, TimeDelta
 
 from astropy.utils.data import get_pkg_data_contents
@@ -188,7 +190,8 @@ class MockAsyncTAPServer:
         job.quote = Time.now() + TimeDelta(1, format='sec')
         job.creationtime = Time.now()
         job.executionduration = TimeDelta(3600, format='sec')
-        job.destruction = Time.now() + TimeDelta(3600, format='sec')
+        # destruction is serialized as a date; keep it clear of today
+        job.destruction = Time.now() + TimeDelta(3, format='jd')
 
         for key, value in data.items():
             param = Parameter(id=key)
@@ -224,7 +227,7 @@ class MockAsyncTAPServer:
 
         if request.method == 'GET':
             phase = self._jobs[jobid].phase
-            return phase
+            return phase.encode('utf-8')
         elif request.method == 'POST':
             newphase = request.body.split('=')[-1]
             job = self._jobs[jobid]
@@ -553,6 +556,49 @@ class TestTAPService:
         job.wait()
         job.delete()
 
+    def test_job_snapshot(self, async_fixture):
+        service = TAPService('http://example.com/tap')
+        job = service.submit_job("SELECT * FROM ivoa.obscore")
+        job_fetches = async_fixture['job'].call_count
+
+        snapshot = job.refresh()
+        assert snapshot.phase == 'PENDING'
+        assert job.phase == 'PENDING'
+        assert job.execution_duration == TimeDelta(3600, format='sec')
+        assert isinstance(job.quote, Time)
+        assert job.owner is None
+        # one refresh, all properties from the snapshot
+        assert async_fixture['job'].call_count == job_fetches + 1
+
+        job.run()
+        assert job.phase == 'COMPLETED'
+        # the snapshot taken before is not changed by later updates
+        assert snapshot.phase == 'PENDING'
+        assert job.refresh().phase == 'COMPLETED'
+
+    def test_job_phase_endpoint(self, async_fixture):
+        service = TAPService('http://example.com/tap')
+        job = service.submit_job("SELECT * FROM ivoa.obscore")
+        job.max_age = 0
+        job_fetches = async_fixture['job'].call_count
+
+        assert job.phase == 'PENDING'
+        assert async_fixture['phase'].call_count == 1
+        assert async_fixture['job'].call_count == job_fetches
+
+        assert job.query == "SELECT * FROM ivoa.obscore"
+        assert async_fixture['job'].call_count == job_fetches + 1
+
+    def test_job_phase_endpoint_fallback(self, mocker):
+        with mocker.register_uri(
+                'GET', 'http://example.com/tap/async/1',
+                content=get_index_job("EXECUTING")), \
+            mocker.register_uri(
+                'GET', 'http://example.com/tap/async/1/phase',
+                status_code=404):
+            job = AsyncTAPJob('http://example.com/tap/async/1', max_age=0)
+            assert job.phase == 'EXECUTING'
+
     @pytest.mark.usefixtures('async_fixture')
     def test_erroneus_submit_job(self):
         service = TAPService('http://example.com/tap')
@@ -792,6 +838,340 @@ class TestTAPCapabilities:
         assert func.form == "ivo_hasword(haystack TEXT, needle TEXT) -> INTEGER"
 
 
+class TestJobJournal:
+    @pytest.fixture()
+    def journal(self, tmp_path):
+        return JobJournal(tmp_path / "jobs.sqlite")
+
+    @pytest.mark.filterwarnings("ignore::astropy.io.votable.exceptions.W27")
+    @pytest.mark.filterwarnings("ignore::astropy.io.votable.exceptions.W48")
+    @pytest.mark.filterwarnings("ignore::astropy.io.votable.exceptions.W06")
+    def test_run_async(self, async_fixture, journal):
+        service = TAPService('http://example.com/tap')
+        results = service.run_async(
+            "SELECT * FROM ivoa.obscore", journal=journal)
+        _test_image_results(results)
+        assert len(journal) == 0
+
+    @pytest.mark.filterwarnings("ignore::astropy.io.votable.exceptions.W27")
+    @pytest.mark.filterwarnings("ignore::astropy.io.votable.exceptions.W48")
+    @pytest.mark.filterwarnings("ignore::astropy.io.votable.exceptions.W06")
+    def test_reattach(self, async_fixture, journal):
+        service = TAPService('http://example.com/tap')
+        # simulate a process that died after submitting and starting the job
+        query = service.create_query(
+            "SELECT * FROM ivoa.obscore", mode="async")
+        job = AsyncTAPJob(query.submit().url)
+        job.run()
+        key = journal.make_key(query)
+        journal.record(key, job)
+        assert list(journal) == [(key, job.url, 'COMPLETED')]
+        assert async_fixture['create'].call_count == 1
+
+        # whitespace differences in the query do not matter
+        results = service.run_async(
+            "SELECT *\n  FROM ivoa.obscore", journal=journal)
+        _test_image_results(results)
+        assert async_fixture['create'].call_count == 1
+        assert len(journal) == 0
+
+    def test_vanished_job(self, mocker, async_fixture, journal):
+        service = TAPService('http://example.com/tap')
+        query = service.create_query("SELECT 1", mode="async")
+        job = AsyncTAPJob(query.submit().url)
+        key = journal.make_key(query)
+        journal.record(key, job)
+
+        with mocker.register_uri('GET', job.url, status_code=404):
+            assert journal.reattach(key) is None
+        assert len(journal) == 0
+
+    def test_error_job(self, async_fixture, journal):
+        service = TAPService('http://example.com/tap')
+        query = service.create_query(
+            "SELECT * FROM test_erroneus_submit.non_existent", mode="async")
+        job = AsyncTAPJob(query.submit().url)
+        key = journal.make_key(query)
+        journal.record(key, job)
+
+        assert journal.reattach(key) is None
+        assert len(journal) == 0
+
+    def test_garbage_collection(self, mocker, journal):
+        with mocker.register_uri(
+                'GET', 'http://example.com/tap/async/1',
+                content=get_index_job("EXECUTING")):
+            job = AsyncTAPJob('http://example.com/tap/async/1')
+        # the job's destruction time is in 2021
+        journal.record("key", job)
+        assert journal.get("key") is None
+        assert len(journal) == 0
+
+    def test_upload_keys(self, journal):
+        def make_key(uploads):
+            return journal.make_key(TAPQuery(
+                'http://example.com/tap', "SELECT * FROM TAP_UPLOAD.t",
+                mode="async", uploads=uploads))
+
+        table = Table({"a": [1, 2]})
+        assert make_key({"t": table}) == make_key({"t": Table({"a": [1, 2]})})
+        assert make_key({"t": table}) != make_key({"t": Table({"a": [1, 3]})})
+        assert make_key({"t": "http://example.com/t.xml"}) != make_key(
+            {"t": "http://example.com/u.xml"})
+
+        stream = BytesIO(b"<VOTABLE/>")
+        assert make_key({"t": stream}) is not None
+        assert stream.tell() == 0
+
+
+def _get_fast_table(table_format, tmp_path):
+    table = Table({"ra": [10., 20.], "name": ["a", "b"]})
+    table["ra"].unit = "deg"
+    table["ra"].description = "Right ascension"
+    table["ra"].meta["ucd"] = "pos.eq.ra;meta.main"
+    # the parquet writer only accepts file names
+    path = tmp_path / "result"
+    table.write(path, format=table_format)
+    return path.read_bytes()
+
+
+class MockJobListServer:
+    """
+    a UWS job list that actually filters by PHASE and AFTER and counts
+    the requests made to it.
+    """
+    jobref = ('  <uws:jobref id="{}">\n'
+              '    <uws:phase>{}</uws:phase>\n'
+              '    <uws:ownerId>{}</uws:ownerId>\n'
+              '    <uws:creationTime>{}</uws:creationTime>\n'
+              '  </uws:jobref>\n')
+
+    def __init__(self):
+        # jobid -> (phase, owner, creation time)
+        self.jobs = {}
+        self.list_requests = []
+        self.job_requests = []
+
+    def add(self, jobid, phase, owner, creation):
+        self.jobs[jobid] = (phase, owner, Time(creation))
+
+    def use(self, mocker):
+        with ExitStack() as stack:
+            stack.enter_context(mocker.register_uri(
+                'GET', 'http://example.com/tap/async',
+                content=self.get_job_list))
+            stack.enter_context(mocker.register_uri(
+                'GET', re.compile('http://example.com/tap/async/[^/]+$'),
+                content=self.get_job))
+            yield self
+
+    def get_job_list(self, request, context):
+        params = parse_qsl(request.query)
+        self.list_requests.append(params)
+        phases = {val.upper() for arg, val in params if arg.upper() == 'PHASE'}
+        after = [Time(val.upper().rstrip('Z'))
+                 for arg, val in params if arg.upper() == 'AFTER']
+
+        doc = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+               '<uws:jobs xmlns:uws="http://www.ivoa.net/xml/UWS/v1.0" '
+               'version="1.1">\n')
+        for jobid, (phase, owner, creation) in self.jobs.items():
+            if phases and phase not in phases:
+                continue
+            if not phases and phase == 'ARCHIVED':
+                continue
+            if after and creation <= after[0]:
+                continue
+            doc += self.jobref.format(jobid, phase, owner, creation.isot)
+        doc += '</uws:jobs>'
+        return doc.encode('UTF-8')
+
+    def get_job(self, request, context):
+        jobid = request.path.rsplit('/', 1)[-1]
+        self.job_requests.append(jobid)
+        if jobid not in self.jobs:
+            context.status_code = 404
+            return b''
+
+        phase, owner, creation = self.jobs[jobid]
+        job = JobFile()
+        job.version = "1.1"
+        job.jobid = jobid
+        job.phase = phase
+        job.ownerid = owner
+        job.creationtime = creation
+        io = BytesIO()
+        job.to_xml(io)
+        return io.getvalue()
+
+
+class TestJobTable:
+    @pytest.fixture()
+    def joblist(self, mocker):
+        server = MockJobListServer()
+        server.add('old', 'COMPLETED', 'alice', '2024-01-01T10:00:00')
+        server.add('running', 'EXECUTING', 'alice', '2024-01-02T10:00:00')
+        server.add('queued', 'QUEUED', 'bob', '2024-01-03T10:00:00')
+        yield from server.use(mocker)
+
+    def test_initial_sync(self, joblist):
+        table = JobTable('http://example.com/tap/async')
+        changed = table.sync()
+
+        assert len(changed) == len(table) == 3
+        assert joblist.list_requests == [[]]
+        assert 'running' in table
+        assert table['queued'].phase == 'QUEUED'
+        assert {job.jobid for job in table.owned_by('alice')} == {
+            'old', 'running'}
+        assert [job.jobid for job in table.with_phase('COMPLETED')] == ['old']
+        assert [job.jobid for job in table.created_between(
+            start='2024-01-02T00:00:00Z')] == ['running', 'queued']
+        assert [job.jobid for job in table.created_between(
+            end=Time('2024-01-02T10:00:00'))] == ['old', 'running']
+
+    def test_incremental_sync(self, joblist):
+        table = JobTable('http://example.com/tap/async')
+        table.sync()
+
+        joblist.add('new', 'PENDING', 'bob', '2024-01-04T10:00:00')
+        joblist.add('queued', 'EXECUTING', 'bob', '2024-01-03T10:00:00')
+        joblist.add('running', 'COMPLETED', 'alice', '2024-01-02T10:00:00')
+        changed = table.sync()
+
+        assert {job.jobid for job in changed} == {'new', 'queued', 'running'}
+        list_params = [dict(params) for params in joblist.list_requests[1:]]
+        assert 'AFTER' in list_params[0]
+        assert 'PHASE' in list_params[1]
+        # only the job that went inactive is fetched on its own
+        assert joblist.job_requests == ['running']
+        assert table['running'].phase == 'COMPLETED'
+        assert table['queued'].phase == 'EXECUTING'
+
+        assert table.sync() == []
+
+    def test_vanished_job(self, joblist):
+        table = JobTable('http://example.com/tap/async')
+        table.sync()
+
+        del joblist.jobs['running']
+        table.sync()
+        assert 'running' not in table
+        assert table.with_phase('EXECUTING') == []
+
+        table.clear()
+        assert len(table) == 0
+
+    def test_full_sync(self, joblist):
+        table = JobTable('http://example.com/tap/async')
+        table.sync()
+
+        # inactive jobs are not asked for in incremental syncs...
+        del joblist.jobs['old']
+        table.sync()
+        assert 'old' in table
+
+        # ...but dropped by the periodic full listing
+        table.full_sync_interval = 0
+        table.sync()
+        assert joblist.list_requests[-1] == []
+        assert 'old' not in table
+        assert table.with_phase('COMPLETED') == []
+
+    def test_get_job_list_incremental(self, joblist):
+        service = TAPService('http://example.com/tap')
+        assert len(service.get_job_list(incremental=True)) == 3
+
+        joblist.add('archived', 'ARCHIVED', 'bob', '2024-01-05T10:00:00')
+        joblist.add('new', 'PENDING', 'bob', '2024-01-04T10:00:00')
+        jobs = service.get_job_list(incremental=True)
+        assert [job.jobid for job in jobs] == [
+            'old', 'running', 'queued', 'new']
+        assert len(service.job_table) == 4
+
+        jobs = service.get_job_list(
+            incremental=True, phases=['EXECUTING', 'QUEUED'], last=1)
+        assert [job.jobid for job in jobs] == ['queued']
+        jobs = service.get_job_list(
+            incremental=True, after=datetime.datetime(2024, 1, 2, 12))
+        assert [job.jobid for job in jobs] == ['queued', 'new']
+
+
+@pytest.mark.usefixtures("tapservice")
+class TestResponseFormat:
+    def test_negotiate_default(self, tapservice):
+        assert tapservice.negotiate_response_format() == "votable/b2"
+
+    def test_negotiate_preference(self, tapservice):
+        assert tapservice.negotiate_response_format(
+            preference=["fits", "votable/b2"]) == "fits"
+
+    def test_negotiate_not_declared(self, tapservice):
+        assert tapservice.negotiate_response_format(
+            preference=["votable/b"]) == "text/xml"
+        tapservice.get_tap_capability()._outputformats = []
+        assert tapservice.negotiate_response_format() is None
+
+    @pytest.mark.filterwarnings("ignore::astropy.io.votable.exceptions.W27")
+    @pytest.mark.filterwarnings("ignore::astropy.io.votable.exceptions.W48")
+    @pytest.mark.filterwarnings("ignore::astropy.io.votable.exceptions.W06")
+    def test_auto_sends_responseformat(self, mocker):
+        def callback(request, context):
+            assert dict(parse_qsl(request.body))["RESPONSEFORMAT"] == "votable/b2"
+            return get_pkg_data_contents('data/tap/obscore-image.xml')
+
+        with mocker.register_uri(
+                'POST', 'http://example.com/tap/sync', content=callback):
+            service = TAPService('http://example.com/tap', response_format="auto")
+            _test_image_results(service.run_sync("SELECT * FROM ivoa.obscore"))
+
+    def test_no_responseformat_by_default(self, mocker):
+        def callback(request, context):
+            assert "RESPONSEFORMAT" not in dict(parse_qsl(request.body))
+            return get_pkg_data_contents('data/query/basic.xml')
+
+        with mocker.register_uri(
+                'POST', 'http://example.com/tap/sync', content=callback):
+            TAPService('http://example.com/tap').run_sync("SELECT 1")
+
+    def _test_fast_results(self, results):
+        assert len(results) == 2
+        assert results.fieldnames == ("ra", "name")
+        assert results["ra"][1] == 20.
+        field = results.getdesc("ra")
+        assert field.unit == "deg"
+        assert field.ucd == "pos.eq.ra;meta.main"
+        assert results.fieldname_with_ucd("pos.eq.ra") == "ra"
+
+    def test_fits_result(self, mocker, tmp_path):
+        with mocker.register_uri(
+                'POST', 'http://example.com/tap/sync',
+                content=_get_fast_table("fits", tmp_path),
+                headers={"Content-Type": "application/fits"}):
+            results = TAPService('http://example.com/tap').run_sync(
+                "SELECT ra, name FROM t", response_format="fits")
+        self._test_fast_results(results)
+
+    def test_parquet_result(self, mocker, tmp_path):
+        pytest.importorskip("pyarrow")
+        with mocker.register_uri(
+                'POST', 'http://example.com/tap/sync',
+                content=_get_fast_table("parquet", tmp_path),
+                headers={"Content-Type": "application/vnd.apache.parquet"}):
+            results = TAPService('http://example.com/tap').run_sync(
+                "SELECT ra, name FROM t", response_format="parquet")
+        self._test_fast_results(results)
+
+    def test_broken_fits_result(self, mocker):
+        with mocker.register_uri(
+                'POST', 'http://example.com/tap/sync',
+                content=b"not a FITS file",
+                headers={"Content-Type": "application/fits"}):
+            with pytest.raises(DALFormatError):
+                TAPService('http://example.com/tap').run_sync(
+                    "SELECT ra, name FROM t", response_format="fits")
+
+
 def test_get_endpoint_candidates():
     # Directly instantiate the TAPService with a known base URL
     svc = TAPService("http://astroweb.projects.phys.ucl.ac.uk:8000/tap")
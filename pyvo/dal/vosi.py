@@ -13,6 +13,7 @@ from ..io import vosi
 from ..utils.url import url_sibling
 from ..utils.decorators import stream_decode_content, response_decode_content
 from ..utils.http import use_session
+from ..utils.instrumentation import measure
 
 __all__ = ['CapabilityMixin', 'VOSITables']
 
@@ -62,7 +63,8 @@ class AvailabilityMixin(EndpointMixin):
     @lazyproperty
     @deprecated(since="1.5")
     def availability(self):
-        return vosi.parse_availability(self._availability().read)
+        with measure("vosi.availability", self.baseurl) as event:
+            return vosi.parse_availability(event.track_reads(self._availability()))
 
     @property
     @deprecated(since="1.5")
@@ -95,7 +97,8 @@ class CapabilityMixin(EndpointMixin):
 
     @lazyproperty
     def capabilities(self):
-        return vosi.parse_capabilities(self._capabilities().read)
+        with measure("vosi.capabilities", self.baseurl) as event:
+            return vosi.parse_capabilities(event.track_reads(self._capabilities()))
 
 
 class TablesMixin(CapabilityMixin):
@@ -131,7 +134,8 @@ class TablesMixin(CapabilityMixin):
 
     @lazyproperty
     def tables(self):
-        return VOSITables(vosi.parse_tables(self._tables().read))
+        with measure("vosi.tables", self.baseurl) as event:
+            return VOSITables(vosi.parse_tables(event.track_reads(self._tables())))
 
 
 class VOSITables:
@@ -168,14 +172,17 @@ class VOSITables:
 
         if not table.columns and not table.foreignkeys:
             tables_url = '{}/{}'.format(self._endpoint_url, name)
-            response = self._get_table_file(tables_url)
+            with measure("vosi.table", tables_url, service=self._endpoint_url) as event:
+                response = self._get_table_file(tables_url)
+                event.set_response(response)
 
-            try:
-                response.raise_for_status()
-            except requests.RequestException as ex:
-                raise DALServiceError.from_except(ex, tables_url)
+                try:
+                    response.raise_for_status()
+                except requests.RequestException as ex:
+                    raise DALServiceError.from_except(ex, tables_url)
 
-            table = vosi.parse_tables(response.raw.read).get_first_table()
+                table = vosi.parse_tables(
+                    event.track_reads(response.raw)).get_first_table()
             self._cache[name] = table
 
         return table
@@ -192,8 +192,10 @@ class ImageDiscoverer:
             space=None, spectrum=None, time=None,
             inclusive=False,
             watcher=None,
-            timeout=20):
+            timeout=20,
+            prober=None):
         self.session = SessionWithTimeout(default_timeout=timeout)
+        self.prober = prober
 
         if space:
             self.center = (space[0], space[1])
@@ -437,7 +439,8 @@ class ImageDiscoverer:
             return True
 
         self._info("Querying SIA1 {}...".format(rec.title))
-        svc = rec.res_rec.get_service("sia", session=self.session, lax=True)
+        svc = rec.res_rec.get_service(
+            "sia", session=self.session, lax=True, prober=self.prober)
         n_found = self._add_records(
             ImageFound.from_sia1_recs(
                 rec.ivoid,
@@ -473,7 +476,8 @@ class ImageDiscoverer:
         """
         self._info("Querying SIA2 {}...".format(rec.title))
 
-        svc = rec.res_rec.get_service("sia2", session=self.session, lax=True)
+        svc = rec.res_rec.get_service(
+            "sia2", session=self.session, lax=True, prober=self.prober)
         constraints = {}
         if self.center is not None:
             constraints["pos"] = self.center+(self.radius,)
@@ -506,7 +510,8 @@ class ImageDiscoverer:
         """runs our query against a Obscore capability of rec.
         """
         self._info("Querying Obscore {}...".format(rec.title))
-        svc = rec.res_rec.get_service("tap", session=self.session, lax=True)
+        svc = rec.res_rec.get_service(
+            "tap", session=self.session, lax=True, prober=self.prober)
 
         n_found = self._add_records(
             ImageFound.from_obscore_recs(
@@ -568,6 +573,18 @@ class ImageDiscoverer:
             raise dal.DALQueryError("No services to query.  Unless"
                 " you overrode service selection, you will have to"
                 " loosen your constraints.")
+
+        if self.prober is not None:
+            # probe all candidate interfaces in parallel up front so
+            # get_service can pick the fastest ones without waiting.
+            with self._service_list_lock:
+                recs = [rec.res_rec for rec in
+                        self.obscore_recs + self.sia2_recs + self.sia1_recs]
+            results = self.prober.probe(recs)
+            self._info("Probed {} interface(s), {} healthy".format(
+                len(results),
+                sum(result.healthy for result in results.values())))
+
         self._query_obscore()
         self._query_sia2()
         self._query_sia1()
@@ -581,7 +598,8 @@ def images_globally(
         inclusive: bool = False,
         watcher: Optional[Callable[['ImageDiscoverer', str], None]] = None,
         timeout: float = 20,
-        services: Optional[registry.RegistryResults] = None)\
+        services: Optional[registry.RegistryResults] = None,
+        prober: Optional[registry.InterfaceProber] = None)\
         -> Tuple[List[obscore.ObsCoreMetadata], List[str]]:
     """returns a collection of ObsCoreMetadata-s matching certain constraints
     and a list of log lines.
@@ -609,6 +627,11 @@ def images_globally(
     services :
         An optional `~pyvo.registry.RegistryResults` instance to
         override automatic services detection.
+    prober :
+        An optional `~pyvo.registry.InterfaceProber`; if given, the
+        interfaces of all services are probed in parallel before querying,
+        and of several equivalent interfaces, the fastest healthy one
+        is used.
 
     When an image has insufficient metadata to evaluate a constraint, it
     is excluded; this mimics the behaviour of SQL engines that consider
@@ -627,7 +650,8 @@ def images_globally(
         space=space, spectrum=spectrum, time=time,
         inclusive=inclusive,
         watcher=watcher,
-        timeout=timeout)
+        timeout=timeout,
+        prober=prober)
 
     if services is None:
         discoverer.discover_services()
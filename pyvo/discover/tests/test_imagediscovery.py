@@ -39,6 +39,7 @@ class FakeQueriable:
         self.res_rec = weakref.proxy(self)
 
     def get_service(self, service_type, **kwargs):
+        self.service_kwargs = kwargs
         return self
 
     def search(self, *args, **kwargs):
@@ -179,6 +180,20 @@ class TestSpaceCondition:
             " or 1=intersects(circle(30, 21, 1), s_region))",)
 
 
+def test_prober_used():
+    class FakeProber:
+        def probe(self, items):
+            self.probed = items
+            return {}
+
+    prober, queriable = FakeProber(), FakeQueriable()
+    di = discover.ImageDiscoverer(space=(30, 21, 1), prober=prober)
+    di.sia2_recs = [queriable]
+    di.query_services()
+    assert prober.probed == [queriable.res_rec]
+    assert queriable.service_kwargs["prober"] is prober
+
+
 def test_no_services_selected():
     with pytest.raises(dal.DALQueryError) as excinfo:
         image.ImageDiscoverer().query_services()
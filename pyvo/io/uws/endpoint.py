@@ -4,13 +4,14 @@ This file contains a contains the high-level functions to read the various
 VOSI Endpoints.
 """
 
+from astropy.utils.xml import iterparser
 from astropy.utils.xml.writer import XMLWriter
 from astropy.io.votable.util import convert_to_writable_filelike
 
 from ...utils.xml.elements import xmlattribute, parse_for_object
 from .tree import JobSummary, Jobs
 
-__all__ = ["parse_job", "parse_job_list", "JobFile"]
+__all__ = ["parse_job", "parse_job_list", "iter_job_list", "JobFile"]
 
 
 def parse_job_list(
@@ -49,6 +50,49 @@ def parse_job_list(
                             _debug_python_based_parser).joblist
 
 
+def iter_job_list(
+    source, pedantic=None, filename=None, _debug_python_based_parser=False
+):
+    """
+    Parses a job list xml file (or file-like object) incrementally, yielding
+    a `~pyvo.io.uws.tree.JobSummary` for each job as soon as it is parsed.
+
+    In contrast to `parse_job_list`, this never holds more than one job
+    in memory.
+
+    Parameters
+    ----------
+    source : str or readable file-like object
+        Path or file object containing a job list xml file.
+    pedantic : bool, optional
+        When `True`, raise an error when the file violates the spec,
+        otherwise issue a warning.  Defaults to False.
+    filename : str, optional
+        A filename, URL or other identifier to use in error messages.
+
+    Yields
+    ------
+    `~pyvo.io.uws.tree.JobSummary` objects
+    """
+    config = {
+        'pedantic': pedantic,
+        'filename': filename
+    }
+
+    if filename is None and isinstance(source, str):
+        config['filename'] = source
+
+    with iterparser.get_xml_iterator(
+            source,
+            _debug_python_based_parser=_debug_python_based_parser
+    ) as iterator:
+        for start, tag, data, pos in iterator:
+            if start and tag == 'jobref':
+                job = JobSummary(config, pos, 'jobref', **data)
+                job.parse(iterator, config)
+                yield job
+
+
 def parse_job(
     source, pedantic=None, filename=None, _debug_python_based_parser=False
 ):
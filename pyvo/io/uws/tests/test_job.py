@@ -4,6 +4,8 @@
 Tests for pyvo.io.vosi
 """
 
+from io import BytesIO
+
 import pyvo.io.uws as uws
 
 from astropy.utils.data import get_pkg_data_filename
@@ -32,3 +34,24 @@ class TestJob:
         assert not job.errorsummary.has_detail
         assert job.errorsummary.type_ == 'fatal'
         assert job.errorsummary.message.content == 'We have problem'
+
+
+class TestJobList:
+    def test_iter_job_list(self):
+        doc = BytesIO(
+            b'<uws:jobs xmlns:uws="http://www.ivoa.net/xml/UWS/v1.0"'
+            b' version="1.1">'
+            b'<uws:jobref id="a1"><uws:phase>COMPLETED</uws:phase>'
+            b'<uws:ownerId>alice</uws:ownerId>'
+            b'<uws:creationTime>2024-01-01T10:00:00Z</uws:creationTime>'
+            b'</uws:jobref>'
+            b'<uws:jobref id="a2"><uws:phase>QUEUED</uws:phase>'
+            b'</uws:jobref>'
+            b'</uws:jobs>')
+        jobs = list(uws.iter_job_list(doc))
+
+        assert [job.jobid for job in jobs] == ['a1', 'a2']
+        assert [job.phase for job in jobs] == ['COMPLETED', 'QUEUED']
+        assert jobs[0].ownerid == 'alice'
+        assert jobs[0].creationtime.isot.startswith('2024-01-01T10:00:00')
+        assert jobs[1].creationtime is None
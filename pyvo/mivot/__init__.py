@@ -1,2 +1,8 @@
 # package entry point
-from .viewer.mivot_viewer import MivotViewer
\ No newline at end of file
+from ..utils.lazy import lazy_namespace
+
+__all__ = ["MivotViewer"]
+
+__getattr__, __dir__ = lazy_namespace(__name__, globals(), {
+    "MivotViewer": (".viewer.mivot_viewer", "MivotViewer"),
+}, submodules=["features", "seekers", "utils", "version_checker", "viewer"])
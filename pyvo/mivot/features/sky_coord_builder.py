@@ -3,8 +3,10 @@
 Utility transforming MIVOT annotation into SkyCoord instances
 """
 
+import numpy
 from astropy.coordinates import SkyCoord
 from astropy import units as u
+from astropy.time import Time
 from astropy.coordinates import ICRS, Galactic, FK4, FK5
 from pyvo.mivot.utils.exceptions import NoMatchingDMTypeError
 
@@ -54,7 +56,9 @@ class SkyCoordBuilder(object):
         parameters
         -----------
         mivot_instance_dict: viewer.MivotInstance.to_dict()
-            Internal dictionary of the dynamic Python object generated from the MIVOT block
+            Internal dictionary of the dynamic Python object generated from the MIVOT block.
+            The attribute values can also be numpy arrays (one value per table row),
+            in which case a single SkyCoord holding all positions is built.
         '''
         self._mivot_instance_dict = mivot_instance_dict
         self._map_coord_names = None
@@ -94,12 +98,16 @@ class SkyCoordBuilder(object):
 
         returns
         -------
-        string
-            attribute value formatted as [scale]year
+        string or Time
+            attribute value formatted as [scale]year,
+            or a Time instance if the value is an array
         """
+        if hk_field["unit"] not in ("yr", "year"):
+            return hk_field["value"]
+        if isinstance(hk_field["value"], numpy.ndarray):
+            return Time(hk_field["value"], format="byear" if besselian else "jyear")
         scale = "J" if not besselian else "B"
-        return (f"{scale}{hk_field['value']}" if hk_field["unit"] in ("yr", "year")
-                else hk_field["value"])
+        return f"{scale}{hk_field['value']}"
 
     def _get_space_frame(self, obstime=None):
         """
@@ -184,4 +192,12 @@ class SkyCoordBuilder(object):
                 kwargs[value] = hk_field["value"] * u.Unit(hk_field["unit"])
             else:
                 kwargs[value] = hk_field["value"]
+
+        # with values taken from columns, constant components must be expanded
+        # to the shape of the columns to make SkyCoord happy
+        data_keys = [key for key in kwargs if key not in ("frame", "obstime")]
+        shape = numpy.broadcast_shapes(*(numpy.shape(kwargs[key]) for key in data_keys))
+        if shape:
+            for key in data_keys:
+                kwargs[key] = numpy.broadcast_to(kwargs[key], shape, subok=True)
         return SkyCoord(**kwargs)
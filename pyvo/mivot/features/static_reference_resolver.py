@@ -3,7 +3,6 @@ Class used to resolve each static REFERENCE found in mivot_block.
 """
 from copy import deepcopy
 from pyvo.mivot.utils.exceptions import MivotError
-from pyvo.mivot.utils.xpath_utils import XPath
 from pyvo.utils.prototype import prototype_feature
 
 
@@ -18,7 +17,10 @@ class StaticReferenceResolver:
         Resolve all static REFERENCEs found in the mivot_block.
         The referenced objects are first searched in GLOBALS and then in the templates_ref table.
         REFERENCE elements are replaced with the referenced objects set with the roles of the REFERENCEs.
-        Works even if REFERENCE tags are numbered by the former processing.
+        The static REFERENCEs of the referenced objects are resolved as well;
+        each referenced object is resolved once and then copied for all REFERENCEs pointing to it.
+        Works even if REFERENCE tags are numbered by the former processing,
+        whatever the numbers of the REFERENCEs nested in the referenced objects.
         Parameters
         ----------
         annotation_seeker : AnnotationSeeker
@@ -30,7 +32,7 @@ class StaticReferenceResolver:
         Returns
         -------
         int
-            The number of references resolved.
+            The number of references resolved in mivot_block.
         Raises
         ------
         MappingError
@@ -38,30 +40,38 @@ class StaticReferenceResolver:
         NotImplementedError
             If the reference is dynamic.
         """
+        return StaticReferenceResolver._resolve(annotation_seeker, templates_ref, mivot_block, {}, set())
+
+    @staticmethod
+    def _resolve(annotation_seeker, templates_ref, mivot_block, resolved_targets, pending_targets):
+        """
+        Resolve the static REFERENCEs of mivot_block as described in ``resolve``.
+        resolved_targets maps (tableref, dmref) to the already resolved referenced objects,
+        pending_targets holds the keys of the objects being resolved, to detect cycles.
+        """
+        # all REFERENCE_<n> descendants: the numbering of the copied objects
+        # does not start from 1 and has gaps, unlike what x_path_startwith expects.
+        # The dynamic REFERENCEs (with @sourceref) are left to the viewer.
+        references = [ele for ele in mivot_block.iter()
+                      if ele is not mivot_block and isinstance(ele.tag, str)
+                      and ele.tag.startswith("REFERENCE_") and ele.get("sourceref") is None]
+        if not references:
+            return 0
+        # built once: resolving a reference does not move the other ones
+        parent_map = {c: p for p in mivot_block.iter() for c in p}
         resolved_refs = 0
-        for ele in XPath.x_path_startwith(mivot_block, './/REFERENCE_'):
+        for ele in references:
             dmref = ele.get("dmref")
             # If we have no @dmref in REFERENCE, we consider this is a ref based on a keys
             if dmref is None:
                 raise NotImplementedError("Dynamic reference not implemented")
-            target = annotation_seeker.get_globals_instance_by_dmid(dmref)
-            found_in_global = True
-            if target is None and templates_ref is not None:
-                target = annotation_seeker.get_templates_instance_by_dmid(templates_ref, dmref)
-                found_in_global = False
-            if target is None:
-                raise MivotError(f"Cannot resolve reference={dmref}")
-            # Resolve static references recursively
-            if not found_in_global:
-                StaticReferenceResolver.resolve(annotation_seeker, templates_ref, ele)
-            else:
-                StaticReferenceResolver.resolve(annotation_seeker, None, ele)
+            target = StaticReferenceResolver._get_resolved_target(
+                annotation_seeker, templates_ref, dmref, resolved_targets, pending_targets)
             # Set the reference role to the copied instance
             target_copy = deepcopy(target)
             # If the reference is within a collection: no role
             if ele.get('dmrole'):
                 target_copy.attrib["dmrole"] = ele.get('dmrole')
-            parent_map = {c: p for p in mivot_block.iter() for c in p}
             parent = parent_map[ele]
             # Insert the referenced object
             parent.append(target_copy)
@@ -69,3 +79,30 @@ class StaticReferenceResolver:
             parent.remove(ele)
             resolved_refs += 1
         return resolved_refs
+
+    @staticmethod
+    def _get_resolved_target(annotation_seeker, templates_ref, dmref, resolved_targets, pending_targets):
+        """
+        Return a copy of the object referenced by dmref where the static REFERENCEs
+        have been resolved. The copy is made once and kept in resolved_targets.
+        Objects found in GLOBALS can only refer to other objects in GLOBALS.
+        """
+        target = annotation_seeker.get_globals_instance_by_dmid(dmref)
+        target_tableref = None
+        if target is None and templates_ref is not None:
+            target = annotation_seeker.get_templates_instance_by_dmid(templates_ref, dmref)
+            target_tableref = templates_ref
+        if target is None:
+            raise MivotError(f"Cannot resolve reference={dmref}")
+
+        key = (target_tableref, dmref)
+        if key not in resolved_targets:
+            if key in pending_targets:
+                raise MivotError(f"Circular reference={dmref}")
+            pending_targets.add(key)
+            resolved_target = deepcopy(target)
+            StaticReferenceResolver._resolve(annotation_seeker, target_tableref, resolved_target,
+                                             resolved_targets, pending_targets)
+            pending_targets.discard(key)
+            resolved_targets[key] = resolved_target
+        return resolved_targets[key]
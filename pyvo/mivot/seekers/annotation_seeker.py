@@ -21,6 +21,13 @@ class AnnotationSeeker:
     _xml_block (~`xml.etree.ElementTree.Element`): Full mapping block.
     _globals_block (~`xml.etree.ElementTree.Element` or None): GLOBALS block.
     _templates_blocks (dict): Templates dictionary where keys are tableref and values are XML-TEMPLATES.
+    _dmid_index (dict): INSTANCEs by @dmid for each of the GLOBALS and TEMPLATES blocks.
+    _dmtype_index (dict): INSTANCEs by @dmtype.
+    _dmrole_index (dict): INSTANCEs by @dmrole.
+    _globals_parents (dict): parents of the GLOBALS elements.
+
+    The indexes are built once when the seeker is created: INSTANCEs added to the mapping
+    block later on are not found by the lookups using them.
     """
     def __init__(self, xml_block):
         """
@@ -35,9 +42,14 @@ class AnnotationSeeker:
         self._xml_block = xml_block
         self._globals_block = None
         self._templates_blocks = {}
+        self._dmid_index = {}
+        self._dmtype_index = {}
+        self._dmrole_index = {}
+        self._globals_parents = {}
         self._find_globals_block()
         self._find_templates_blocks()
         self._rename_ref_and_join()
+        self._index_instances()
 
     def _find_globals_block(self):
         """
@@ -91,6 +103,27 @@ class AnnotationSeeker:
                 ele.tag = tag + '_' + str(cpt)
                 cpt += 1
 
+    def _index_instances(self):
+        """
+        Build the indexes of the INSTANCEs of the GLOBALS and TEMPLATES blocks
+        by @dmid (the first one for each dmid, as the XPath searches did),
+        @dmtype and @dmrole (all of them in document order),
+        and the map of the parents of the GLOBALS elements.
+        """
+        if self._globals_block is not None:
+            self._globals_parents = {c: p for p in self._globals_block.iter() for c in p}
+        blocks = [self._globals_block] + list(self._templates_blocks.values())
+        for block in blocks:
+            if block is None:
+                continue
+            dmids = self._dmid_index[block] = {}
+            for ele in block.iter(Ele.INSTANCE):
+                dmid = ele.get(Att.dmid)
+                if dmid is not None:
+                    dmids.setdefault(dmid, ele)
+                self._dmtype_index.setdefault(ele.get(Att.dmtype), []).append(ele)
+                self._dmrole_index.setdefault(ele.get(Att.dmrole), []).append(ele)
+
     @staticmethod
     def _name_match(name, expected):
         """
@@ -228,6 +261,31 @@ class AnnotationSeeker:
                      + Ele.INSTANCE, Att.dmtype, dmtype_pattern)
         return instance_found
 
+    def get_instances_by_dmtype(self, dmtype):
+        """
+        Get all the mapped INSTANCEs (GLOBALS first, then TEMPLATES) with @dmtype=dmtype.
+        Unlike get_instance_by_dmtype, this is an exact match using an index.
+        Parameters
+        ----------
+        dmtype (str): @dmtype looked for
+        Returns
+        -------
+        list: ~`xml.etree.ElementTree.Element` in document order
+        """
+        return list(self._dmtype_index.get(dmtype, []))
+
+    def get_instances_by_dmrole(self, dmrole):
+        """
+        Get all the mapped INSTANCEs (GLOBALS first, then TEMPLATES) with @dmrole=dmrole.
+        Parameters
+        ----------
+        dmrole (str): @dmrole looked for
+        Returns
+        -------
+        list: ~`xml.etree.ElementTree.Element` in document order
+        """
+        return list(self._dmrole_index.get(dmrole, []))
+
     """
     GLOBALS INSTANCES
     """
@@ -268,12 +326,7 @@ class AnnotationSeeker:
         -------
         dict: `~xml.etree.ElementTree.Element`
         """
-        eset = XPath.x_path(self._globals_block,
-                            (".//" + Ele.INSTANCE + "[@" + Att.dmid + "='" + dmid + "']")
-                            )
-        for ele in eset:
-            return ele
-        return None
+        return self._dmid_index.get(self._globals_block, {}).get(dmid)
 
     def get_globals_instance_dmtypes(self):
         """
@@ -301,11 +354,7 @@ class AnnotationSeeker:
         templates_block = self.get_templates_block(tableref)
         if templates_block is None:
             return None
-        eset = XPath.x_path(templates_block,
-                            ".//" + Ele.INSTANCE + "[@" + Att.dmid + "='" + dmid + "']")
-        for ele in eset:
-            return ele
-        return None
+        return self._dmid_index.get(templates_block, {}).get(dmid)
 
     def get_globals_instance_from_collection(self, sourceref, pk_value):
         """
@@ -322,9 +371,8 @@ class AnnotationSeeker:
             self._globals_block, ".//" + Ele.COLLECTION + "[@" + Att.dmid + "='"
                                  + sourceref + "']/" + Ele.INSTANCE + "/" + Att.primarykey
                                  + "[@" + Att.value + "='" + pk_value + "']")
-        parent_map = {c: p for p in self._globals_block.iter() for c in p}
         for inst in einst:
-            return parent_map[inst]
+            return self._globals_parents[inst]
         return None
 
     """
@@ -411,5 +459,4 @@ class AnnotationSeeker:
         logging.debug(Ele.INSTANCE + " with " + Att.primarykey + "=%s found in "
                      + Ele.COLLECTION + " "
                      + Att.dmid + "=%s", key_value, coll_dmid)
-        parent_map = {c: p for p in self._globals_block.iter() for c in p}
-        return parent_map[eset[0]]
+        return self._globals_parents[eset[0]]
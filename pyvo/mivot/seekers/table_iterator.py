@@ -2,9 +2,34 @@
 """
 Iterator for table rows.
 """
+import numpy
+from pyvo.mivot.utils.exceptions import MivotError
 from pyvo.utils.prototype import prototype_feature
 
 
+def _select_rows(row_filter, data_table):
+    """
+    Return the indices of the rows of data_table selected by row_filter,
+    or None if there is no filter.
+    """
+    if row_filter is None:
+        return None
+    mask = numpy.ma.filled(row_filter(data_table), False)
+    if mask.shape != (len(data_table),):
+        raise MivotError("The row filter must return one boolean per row, "
+                         f"not an array of shape {mask.shape}")
+    return numpy.flatnonzero(mask)
+
+
+def _iter_rows(data_table, selection):
+    """
+    Return an iterator over the rows of data_table or over the selected ones only.
+    """
+    if selection is None:
+        return iter(data_table)
+    return (data_table[index] for index in selection.tolist())
+
+
 @prototype_feature('MIVOT')
 class TableIterator:
     """
@@ -24,8 +49,21 @@ class TableIterator:
         self.data_table = data_table
         self.last_row = None
         self.iter = None
-        # not used yet
         self.row_filter = None
+        self._selection = None
+
+    def set_row_filter(self, row_filter):
+        """
+        Restrict the iteration to the rows selected by row_filter and rewind.
+        Parameters
+        ----------
+        row_filter (callable or None): Function taking the data table and returning
+            a boolean array (masked values are taken as False) selecting the rows to visit;
+            it is evaluated once for the whole table. None removes the filter.
+        """
+        self.row_filter = row_filter
+        self._selection = _select_rows(row_filter, self.data_table)
+        self.rewind()
 
     def get_next_row(self):
         """
@@ -34,21 +72,78 @@ class TableIterator:
         """
         # The iterator is set at the first iteration
         if self.iter is None:
-            self.iter = iter(self.data_table)
-        try:
-            while True:
-                row = next(self.iter)
-                if row is not None:
-                    if self.row_filter is None or self.row_filter.row_match(row):
-                        self.last_row = row
-                        return row
-                else:
-                    return None
-        except StopIteration:
-            return None
+            self.iter = _iter_rows(self.data_table, self._selection)
+        row = next(self.iter, None)
+        if row is not None:
+            self.last_row = row
+        return row
 
     def rewind(self):
         """
         Set the pointer on the table-top, destroys the iterator actually.
         """
         self.iter = None
+
+
+@prototype_feature('MIVOT')
+class StreamingTableIterator:
+    """
+    Wrapper iterating over the rows of a table read chunk by chunk
+    by a `~pyvo.mivot.seekers.table_streamer.TableStreamer`.
+    It offers the interface of `TableIterator`; ``data_table`` is the current chunk.
+    """
+    def __init__(self, name, table_streamer):
+        """
+        Constructor of the StreamingTableIterator class.
+        Parameters
+        ----------
+        name (str): Table name (not really used).
+        table_streamer (TableStreamer): Reader of the table chunks.
+        """
+        self.name = name
+        self._chunks = table_streamer.iter_chunks()
+        self._chunk_number = 0
+        self.data_table = next(self._chunks, None)
+        if self.data_table is None:
+            self.data_table = table_streamer.table.to_table()
+        self.last_row = None
+        self.iter = None
+        self.row_filter = None
+        self._selection = None
+
+    def set_row_filter(self, row_filter):
+        """
+        Restrict the iteration to the rows selected by row_filter and rewind.
+        The filter is evaluated once per chunk (see `TableIterator.set_row_filter`).
+        """
+        self.rewind()
+        self.row_filter = row_filter
+        self._selection = _select_rows(row_filter, self.data_table)
+
+    def get_next_row(self):
+        """
+        Return the next row or None, reading the next chunk if needed.
+        """
+        while True:
+            if self.iter is None:
+                self.iter = _iter_rows(self.data_table, self._selection)
+            row = next(self.iter, None)
+            if row is not None:
+                self.last_row = row
+                return row
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return None
+            self.data_table = chunk
+            self._chunk_number += 1
+            self._selection = _select_rows(self.row_filter, chunk)
+            self.iter = None
+
+    def rewind(self):
+        """
+        Set the pointer on the table-top.
+        This is only possible as long as the first chunk is read.
+        """
+        if self._chunk_number > 0:
+            raise MivotError("A streamed table cannot be rewound once its first chunk has been read")
+        self.iter = None
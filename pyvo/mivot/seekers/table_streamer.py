@@ -0,0 +1,156 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+Streaming reader of annotated VOTables.
+
+The VOTable is read from a file or a stream (e.g. the raw stream of an HTTP response)
+up to the TABLEDATA of the first table with data. This header, which contains the MIVOT
+annotations, is parsed with Astropy; the rows of the table are then parsed in chunks
+as they are read, so that the memory needed does not depend on the table size.
+Only TABLEDATA serialization is supported.
+"""
+import io
+import os
+import re
+from xml.etree.ElementTree import XMLPullParser
+from astropy.io.votable import parse
+from pyvo.mivot.utils.exceptions import MivotError
+from pyvo.utils.prototype import prototype_feature
+
+# the start tag of TABLEDATA, possibly namespace-prefixed
+TABLEDATA_START = re.compile(rb"<(?:[\w.-]+:)?TABLEDATA[\s>/]")
+
+
+def _local_name(tag):
+    """
+    Return the tag without its namespace
+    """
+    return tag.rsplit("}", 1)[-1]
+
+
+@prototype_feature('MIVOT')
+class TableStreamer:
+    """
+    Reader of the header and of the rows, chunk by chunk, of a VOTable.
+    """
+    def __init__(self, source, chunk_size=10000, read_size=65536):
+        """
+        Read and parse the VOTable header.
+
+        Parameters
+        ----------
+        source : str, path-like or file-like
+            Path of the VOTable or binary stream to read it from.
+        chunk_size : int, optional
+            Number of rows in the tables returned by ``iter_chunks``.
+        read_size : int, optional
+            Number of bytes read from the source at once.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            self._file = open(source, "rb")
+            self._owns_file = True
+        else:
+            self._file = source
+            self._owns_file = False
+        self.chunk_size = chunk_size
+        self.read_size = read_size
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._tabledata = None
+        self._exhausted = False
+        try:
+            self.votable = self._parse_header()
+        except Exception:
+            self.close()
+            raise
+        # the streamed table is the last one of the header
+        self.table = list(self.votable.iter_tables())[-1]
+
+    def close(self):
+        """
+        Close the source if it has been opened by the streamer.
+        """
+        if self._owns_file:
+            self._file.close()
+
+    def _parse_header(self):
+        """
+        Read the source up to the first TABLEDATA start tag and parse what has been read
+        (closed with empty data) as a VOTable.
+        The events following the TABLEDATA start tag are left in the pull parser.
+        """
+        header = bytearray()
+        open_tags = []
+        while self._tabledata is None:
+            data = self._file.read(self.read_size)
+            if not data:
+                raise MivotError("No TABLEDATA found in the VOTable stream")
+            header += data
+            self._parser.feed(data)
+            for event, elem in self._parser.read_events():
+                if event == "end":
+                    open_tags.pop()
+                elif _local_name(elem.tag) == "TABLEDATA":
+                    self._tabledata = elem
+                    break
+                else:
+                    open_tags.append(_local_name(elem.tag))
+
+        cut = TABLEDATA_START.search(header).start()
+        closing_tags = "".join(f"</{tag}>" for tag in reversed(open_tags))
+        return parse(io.BytesIO(bytes(header[:cut])
+                                + f"<TABLEDATA></TABLEDATA>{closing_tags}".encode()))
+
+    def _iter_rows(self):
+        """
+        Yield the lists of the TD contents of the streamed rows.
+        Rows are dropped from the parsed tree once read.
+        """
+        while not self._exhausted:
+            for event, elem in self._parser.read_events():
+                if event != "end":
+                    continue
+                tag = _local_name(elem.tag)
+                if tag == "TR":
+                    yield [td.text or "" for td in elem]
+                    self._tabledata.remove(elem)
+                elif tag == "TABLEDATA":
+                    self._exhausted = True
+                    return
+            data = self._file.read(self.read_size)
+            if not data:
+                self._exhausted = True
+                return
+            self._parser.feed(data)
+
+    def iter_chunks(self):
+        """
+        Yield astropy tables of at most chunk_size rows, read from the source.
+        The columns are the same as those of ``table.to_table()``.
+        """
+        rows = []
+        for row in self._iter_rows():
+            rows.append(row)
+            if len(rows) == self.chunk_size:
+                yield self._make_chunk(rows)
+                rows = []
+        if rows:
+            yield self._make_chunk(rows)
+
+    def _make_chunk(self, rows):
+        """
+        Return an astropy table built from the TD contents of rows.
+        """
+        fields = self.table.fields
+        if any(len(row) > len(fields) for row in rows):
+            raise MivotError("Streamed row with more cells than FIELDs")
+        config = {}
+        parsers = [field.converter.parse for field in fields]
+        defaults = [field.converter.default for field in fields]
+        self.table.create_arrays(nrows=len(rows))
+        array = self.table.array
+        for index, row in enumerate(rows):
+            values, masks = list(defaults), [True] * len(fields)
+            for column, text in enumerate(row):
+                values[column], masks[column] = parsers[column](text, config)
+            array.data[index] = tuple(values)
+            array.mask[index] = tuple(masks)
+        return self.table.to_table()
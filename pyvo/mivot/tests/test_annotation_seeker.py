@@ -87,3 +87,17 @@ def test_all_reverts(a_seeker):
     assert a_seeker.get_globals_instance_from_collection(
         "_CoordinateSystems", "ICRS").get("dmtype") == "coords:SpaceSys"
     assert a_seeker.get_globals_instance_from_collection("wrong_dmid", "ICRS") is None
+
+
+@pytest.mark.skipif(not check_astropy_version(), reason="need astropy 6+")
+def test_indexed_lookups(a_seeker):
+    assert a_seeker.get_globals_instance_by_dmid("_spacesys1").get("dmtype") == "coords:SpaceSys"
+    assert a_seeker.get_globals_instance_by_dmid("_ts_data") is None
+    assert [ele.get("dmid") for ele in
+            a_seeker.get_instances_by_dmtype("mango:coordinates.PhotometryCoordSys")] == [
+                "_photsys_G", "_photsys_RP", "_photsys_BP"]
+    assert a_seeker.get_instances_by_dmtype("mango:coordinates") == []
+    frames = a_seeker.get_instances_by_dmrole("coords:PhysicalCoordSys.frame")
+    assert [ele.get("dmtype") for ele in frames] == [
+        "coords:TimeFrame", "coords:SpaceFrame", "mango:coordinates.PhotFilter",
+        "mango:coordinates.PhotFilter", "mango:coordinates.PhotFilter"]
@@ -58,6 +58,21 @@ test_dict = {
                         "dmrole": "meas:Time.coord",
                         "dmtype": "coords:MJD",
                         "date": {"value": 1705.9437360200984},
+                        "coordSys": {
+                            "dmid": "_timesys",
+                            "dmrole": "coords:Coordinate.coordSys",
+                            "dmtype": "coords:TimeSys",
+                            "frame": {
+                                "dmrole": "coords:PhysicalCoordSys.frame",
+                                "dmtype": "coords:TimeFrame",
+                                "timescale": {"value": "TCB"},
+                                "refPosition": {
+                                    "dmrole": "coords:TimeFrame.refPosition",
+                                    "dmtype": "coords:StdRefLocation",
+                                    "position": {"value": "BARYCENTER"},
+                                },
+                            },
+                        },
                     },
                 },
             },
@@ -156,3 +171,28 @@ def test_mivot_instance_display_dict():
     mivot_object = MivotInstance(**fake_hk_dict)
     assert mivot_object.to_hk_dict() == fake_hk_dict
     assert mivot_object.to_dict() == fake_dict
+
+
+def test_mivot_instance_update_plan():
+    """Test that updates with rows of different kinds and tables give the row values."""
+    mivot_object = MivotInstance(**fake_hk_dict)
+
+    t = Table(masked=True)
+    t["RAICRS"] = [67.87, 12.5, 1.0]
+    t["DEICRS"] = [-89.87, 45.25, 2.0]
+    t["DEICRS"].mask = [False, False, True]
+    for row, expected in zip(t, [(67.87, -89.87), (12.5, 45.25), (1.0, None)]):
+        mivot_object.update(row)
+        assert (mivot_object.longitude.value, mivot_object.latitude.value) == expected
+        assert isinstance(mivot_object.longitude.value, float)
+    mivot_object.update(t.as_array()[2])
+    assert (mivot_object.longitude.value, mivot_object.latitude.value) == (1.0, None)
+
+    # rows of another table with the columns in another order
+    other = Table()
+    other["DEICRS"] = [10.]
+    other["RAICRS"] = [20.]
+    mivot_object.update(other[0])
+    assert (mivot_object.longitude.value, mivot_object.latitude.value) == (20., 10.)
+    mivot_object.update({"RAICRS": 30., "DEICRS": 40.})
+    assert (mivot_object.longitude.value, mivot_object.latitude.value) == (30., 40.)
@@ -2,13 +2,14 @@
 """
 Test for mivot.viewer.mivot_viewer.py
 """
+import io
 import os
 import pytest
 import re
 from astropy.utils.data import get_pkg_data_filename
 from pyvo.mivot.utils.vocabulary import Constant
 from pyvo.mivot.utils.dict_utils import DictUtils
-from pyvo.mivot.utils.exceptions import MappingError
+from pyvo.mivot.utils.exceptions import MappingError, MivotError
 from pyvo.mivot.version_checker import check_astropy_version
 from pyvo.mivot import MivotViewer
 from astropy import version as astropy_version
@@ -135,3 +136,169 @@ def path_to_first_instance():
 def path_no_mivot():
     votable_name = "test.mivot_viewer.no_mivot.xml"
     return get_pkg_data_filename(os.path.join("data", votable_name))
+
+
+@pytest.mark.skipif(not check_astropy_version(), reason="need astropy 6+")
+def test_get_sky_coords(path_to_epoch_position):
+    """
+    Test that the SkyCoord built for the whole table matches those built row by row.
+    """
+    m_viewer = MivotViewer(votable_path=path_to_epoch_position)
+    sky_coords = m_viewer.get_sky_coords()
+    assert sky_coords.shape == (4,)
+    assert sky_coords.frame.name == "icrs"
+
+    row_index = 0
+    while m_viewer.next():
+        row_coord = m_viewer.dm_instance.get_SkyCoord()
+        assert sky_coords[row_index].ra == row_coord.ra
+        assert sky_coords[row_index].dec == row_coord.dec
+        assert sky_coords[row_index].pm_ra_cosdec == row_coord.pm_ra_cosdec
+        assert sky_coords[row_index].distance == row_coord.distance
+        row_index += 1
+    assert row_index == 4
+
+
+def test_get_sky_coords_no_mivot(path_no_mivot):
+    with pytest.raises(MivotError):
+        MivotViewer(path_no_mivot).get_sky_coords()
+
+
+@pytest.fixture
+def path_to_epoch_position():
+    votable_name = "test.mivot_viewer.epoch_position.xml"
+    return get_pkg_data_filename(os.path.join("data", votable_name))
+
+
+@pytest.mark.skipif(not check_astropy_version(), reason="need astropy 6+")
+def test_to_columns(path_to_epoch_position):
+    """
+    Test the columnar export of the mapped instance against the row by row values.
+    """
+    m_viewer = MivotViewer(votable_path=path_to_epoch_position)
+    columns = m_viewer.to_columns()
+    assert list(columns) == ["longitude", "latitude", "pmLongitude", "pmLatitude",
+                             "parallax", "epoch", "coordSys.spaceRefFrame"]
+    row_index = 0
+    while m_viewer.next():
+        instance = m_viewer.dm_instance
+        assert columns["longitude"][row_index] == instance.longitude.value
+        assert columns["parallax"][row_index] == instance.parallax.value
+        assert columns["epoch"][row_index] == instance.epoch.value
+        assert columns["coordSys.spaceRefFrame"][row_index] == "ICRS"
+        row_index += 1
+
+    table = m_viewer.to_table()
+    assert len(table) == 4
+    assert table.meta["dmtype"] == "mango:EpochPosition"
+    assert str(table["pmLongitude"].unit) == "mas / yr"
+    assert table["pmLongitude"].meta == {"dmtype": "ivoa:RealQuantity", "ref": "pmRA"}
+    assert table["epoch"].meta == {"dmtype": "ivoa:RealQuantity"}
+
+
+@pytest.mark.skipif(not check_astropy_version(), reason="need astropy 6+")
+def test_to_table_collection(path_to_viewer):
+    """
+    Test that collection items are exported with their index in the column names.
+    """
+    table = MivotViewer(votable_path=path_to_viewer, tableref="Results").to_table()
+    assert table.meta["dmtype"] == "cube:NDPoint"
+    assert table.colnames == ["observable[0].dependent",
+                              "observable[0].measure.coord.date",
+                              "observable[0].measure.coord.coordSys.frame.timescale",
+                              "observable[0].measure.coord.coordSys.frame.refPosition.position",
+                              "observable[1].dependent",
+                              "observable[1].measure.coord.cval",
+                              "observable[2].dependent",
+                              "observable[2].measure.coord.cval",
+                              "observable[2].measure.error.statError.radius"]
+    assert table["observable[0].dependent"].tolist() == [True] * 3
+    assert table["observable[2].measure.coord.cval"][1] == pytest.approx(23356.707)
+    # the static reference to the time frame in GLOBALS is resolved
+    assert table["observable[0].measure.coord.coordSys.frame.timescale"].tolist() == ["TCB"] * 3
+
+
+@pytest.mark.skipif(not check_astropy_version(), reason="need astropy 6+")
+@pytest.mark.parametrize("from_stream", [False, True])
+def test_streaming(path_to_epoch_position, from_stream):
+    """
+    Test that a streamed VOTable is mapped as the fully parsed one.
+    """
+    with MivotViewer(votable_path=path_to_epoch_position) as m_viewer:
+        expected = []
+        while m_viewer.next():
+            expected.append((m_viewer.dm_instance.longitude.value,
+                             m_viewer.dm_instance.parallax.value))
+
+    if from_stream:
+        with open(path_to_epoch_position, "rb") as f:
+            source = io.BytesIO(f.read())
+    else:
+        source = path_to_epoch_position
+    with MivotViewer(votable_path=source, chunk_size=3) as m_viewer:
+        assert m_viewer.dm_instance.dmtype == "mango:EpochPosition"
+        assert len(m_viewer.connected_table.array) == 3
+        read = []
+        while m_viewer.next():
+            read.append((m_viewer.dm_instance.longitude.value,
+                         m_viewer.dm_instance.parallax.value))
+        assert len(m_viewer.connected_table.array) == 1
+        with pytest.raises(MivotError, match="cannot be rewound"):
+            m_viewer.rewind()
+    assert read == expected
+
+
+@pytest.mark.skipif(not check_astropy_version(), reason="need astropy 6+")
+def test_streaming_not_first_table(path_to_viewer):
+    """
+    Test that only the first table of a streamed VOTable can be connected.
+    """
+    with pytest.raises(MivotError, match="Only the first table with data can be streamed"):
+        MivotViewer(votable_path=path_to_viewer, tableref="Results", chunk_size=10)
+    m_viewer = MivotViewer(votable_path=path_to_viewer, tableref="_PKTable", chunk_size=2)
+    assert m_viewer.next_table_row()[1] == "G"
+    m_viewer.close()
+
+
+@pytest.mark.skipif(not check_astropy_version(), reason="need astropy 6+")
+def test_row_filter(path_to_epoch_position):
+    """
+    Test that only the rows matching the filter, given by role or by column name, are visited.
+    """
+    m_viewer = MivotViewer(votable_path=path_to_epoch_position)
+    m_viewer.set_row_filter(lambda columns: columns["parallax"] > 3)
+    parallaxes = []
+    while m_viewer.next():
+        parallaxes.append(m_viewer.dm_instance.parallax.value)
+    assert parallaxes == [5.17, 10.76, 3.92]
+
+    m_viewer.rewind()
+    assert m_viewer.next_table_row()["Plx"] == 5.17
+
+    m_viewer.set_row_filter(lambda columns: columns["pmRA"] < 0)
+    assert m_viewer.next_table_row()["Plx"] == 3.92
+    assert m_viewer.next_table_row() is None
+
+    m_viewer.set_row_filter(None)
+    rows = 0
+    while m_viewer.next_table_row() is not None:
+        rows += 1
+    assert rows == 4
+
+    with pytest.raises(MivotError, match="one boolean per row"):
+        m_viewer.set_row_filter(lambda columns: True)
+
+
+@pytest.mark.skipif(not check_astropy_version(), reason="need astropy 6+")
+def test_row_filter_streaming(path_to_epoch_position):
+    """
+    Test that the row filter is applied to each chunk of a streamed VOTable.
+    """
+    with MivotViewer(votable_path=path_to_epoch_position, chunk_size=3) as m_viewer:
+        m_viewer.set_row_filter(lambda columns: columns["parallax"] < 4)
+        parallaxes = []
+        while m_viewer.next():
+            parallaxes.append(m_viewer.dm_instance.parallax.value)
+        assert parallaxes == [1.78, 3.92]
+        with pytest.raises(MivotError, match="cannot be rewound"):
+            m_viewer.set_row_filter(None)
@@ -6,6 +6,7 @@ This test case is based on 2 VOTables:
 Both tests check the generation of SkyCoord instances from the MivotInstances built
 for the output of this service.
 '''
+import numpy as np
 import pytest
 from pyvo.mivot.version_checker import check_astropy_version
 from pyvo.mivot.viewer.mivot_instance import MivotInstance
@@ -232,3 +233,18 @@ def test_vizier_output_with_equinox_and_parallax():
             == "<SkyCoord (FK4: equinox=B2012.000, obstime=J1991.250): (ra, dec, distance) in "
                "(deg, deg, pc)(52.26722684, 59.94033461, 600.) "
                "(pm_ra_cosdec, pm_dec) in mas / yr(-0.82, -1.85)>")
+
+
+@pytest.mark.skipif(not check_astropy_version(), reason="need astropy 6+")
+def test_array_values():
+    """Test that a SkyCoord holding all positions is built when values are arrays
+    """
+    array_dict = MivotInstance(**vizier_equin_dict).to_dict()
+    array_dict["longitude"]["value"] = np.array([52.26722684, 10.])
+    array_dict["latitude"]["value"] = np.array([59.94033461, 20.])
+    array_dict["epoch"]["value"] = np.array([1991.25, 2000.])
+    scoo = SkyCoordBuilder(array_dict).build_sky_coord()
+    assert scoo.shape == (2,)
+    assert scoo[1].ra.deg == 10.
+    assert scoo[1].pm_dec.value == -1.85
+    assert scoo.frame.obstime.jyear.tolist() == [1991.25, 2000.]
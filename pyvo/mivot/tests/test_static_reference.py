@@ -3,9 +3,14 @@
 Test for mivot.features.static_reference_resolver.py
 """
 import pytest
+try:
+    from defusedxml import ElementTree as etree
+except ImportError:
+    from xml.etree import ElementTree as etree
 from astropy.utils.data import get_pkg_data_filename
 from pyvo.mivot.seekers.annotation_seeker import AnnotationSeeker
 from pyvo.mivot.features.static_reference_resolver import StaticReferenceResolver
+from pyvo.mivot.utils.exceptions import MivotError
 from pyvo.mivot.version_checker import check_astropy_version
 from pyvo.mivot import MivotViewer
 from . import XMLOutputChecker
@@ -32,3 +37,88 @@ def a_seeker():
         get_pkg_data_filename("data/test.mivot_viewer.xml"),
         tableref="Results")
     return AnnotationSeeker(m_viewer._mapping_block)
+
+
+MANY_REFERENCES = """
+<VODML>
+  <GLOBALS>
+    <INSTANCE dmid="_frame" dmtype="coords:SpaceFrame">
+      <ATTRIBUTE dmrole="coords:SpaceFrame.spaceRefFrame" dmtype="ivoa:string" value="ICRS"/>
+    </INSTANCE>
+    <INSTANCE dmid="_sys" dmtype="coords:SpaceSys">
+      <REFERENCE dmrole="coords:PhysicalCoordSys.frame" dmref="_frame"/>
+    </INSTANCE>
+  </GLOBALS>
+  <TEMPLATES>
+    <INSTANCE dmtype="test:Points">
+      <COLLECTION dmrole="test:Points.points">
+{}
+      </COLLECTION>
+    </INSTANCE>
+  </TEMPLATES>
+</VODML>"""
+
+POINT = """
+        <INSTANCE dmtype="test:Point">
+          <REFERENCE dmrole="test:Point.coordSys" dmref="_sys"/>
+        </INSTANCE>"""
+
+
+@pytest.mark.skipif(not check_astropy_version(), reason="need astropy 6+")
+def test_many_references():
+    mapping_block = etree.fromstring(MANY_REFERENCES.format(POINT * 200))
+    seeker = AnnotationSeeker(mapping_block)
+    # REFERENCEs are numbered over the whole block: resolve them all
+    assert StaticReferenceResolver.resolve(seeker, None, mapping_block) == 201
+    templates = seeker.get_templates_block(None)
+    points = templates.findall(".//INSTANCE[@dmtype='test:Point']")
+    assert len(points) == 200
+    for point in points:
+        coord_sys = point.find("INSTANCE")
+        assert coord_sys.get("dmrole") == "test:Point.coordSys"
+        # the reference of the referenced instance is resolved as well
+        assert coord_sys.find("INSTANCE").get("dmrole") == "coords:PhysicalCoordSys.frame"
+    # each resolved reference is a copy of its own
+    assert points[0].find("INSTANCE") is not points[1].find("INSTANCE")
+    assert StaticReferenceResolver.resolve(seeker, None, mapping_block) == 0
+
+
+@pytest.mark.skipif(not check_astropy_version(), reason="need astropy 6+")
+def test_circular_reference():
+    mapping = MANY_REFERENCES.format(POINT).replace(
+        '<ATTRIBUTE dmrole="coords:SpaceFrame.spaceRefFrame" dmtype="ivoa:string" value="ICRS"/>',
+        '<REFERENCE dmrole="coords:SpaceFrame.parent" dmref="_frame"/>')
+    mapping_block = etree.fromstring(mapping)
+    seeker = AnnotationSeeker(mapping_block)
+    with pytest.raises(MivotError, match="Circular reference"):
+        StaticReferenceResolver.resolve(seeker, None, mapping_block)
+
+
+NESTED_REFERENCES = """
+<VODML>
+  <TEMPLATES>
+    <INSTANCE dmtype="test:P">
+      <REFERENCE dmrole="test:P.q" dmref="_q"/>
+    </INSTANCE>
+    <INSTANCE dmid="_q" dmtype="test:Q">
+      <REFERENCE dmrole="test:Q.r" dmref="_r"/>
+    </INSTANCE>
+    <INSTANCE dmid="_r" dmtype="test:R">
+      <ATTRIBUTE dmrole="test:R.x" dmtype="ivoa:string" value="x"/>
+    </INSTANCE>
+  </TEMPLATES>
+</VODML>"""
+
+
+@pytest.mark.skipif(not check_astropy_version(), reason="need astropy 6+")
+def test_nested_reference():
+    mapping_block = etree.fromstring(NESTED_REFERENCES)
+    seeker = AnnotationSeeker(mapping_block)
+    templates = seeker.get_templates_block(None)
+    # the REFERENCE of _q is REFERENCE_2: the copy of _q has no REFERENCE_1
+    assert StaticReferenceResolver.resolve(seeker, "DEFAULT", templates) == 2
+    q = templates.find("INSTANCE[@dmtype='test:P']/INSTANCE")
+    assert q.get("dmrole") == "test:P.q"
+    assert q.find("INSTANCE").get("dmrole") == "test:Q.r"
+    assert not [ele for ele in templates.iter() if ele.tag.startswith("REFERENCE")]
+    assert StaticReferenceResolver.resolve(seeker, "DEFAULT", templates) == 0
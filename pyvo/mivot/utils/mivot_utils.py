@@ -4,6 +4,9 @@ These dictionaries are used to generate ``MivotInstance`` objects
 '''
 import numpy
 
+# numpy float types, which cast_type_value turns into Python floats whatever the dmtype
+_NUMPY_FLOATS = (numpy.float32, numpy.float64)
+
 
 class MivotUtils(object):
     @staticmethod
@@ -82,6 +85,53 @@ class MivotUtils(object):
             collection_items.append(MivotUtils.xml_to_dict(child_coll))
         return collection_items
 
+    @staticmethod
+    def get_caster(dmtype):
+        """
+        Return a function casting ATTRIBUTE values of the given dmtype
+        the same way as ``cast_type_value``.
+        The function is meant to be applied to many values read in table rows:
+        numpy floats, the most common case, are cast without analysing the dmtype.
+        Parameters
+        ----------
+        dmtype (str): dmtype of the ATTRIBUTE.
+        Returns
+        -------
+        function: a function taking a value and returning the cast value.
+        """
+        def cast(value):
+            if type(value) in _NUMPY_FLOATS:
+                return float(value)
+            return MivotUtils.cast_type_value(value, dmtype)
+        return cast
+
+    @staticmethod
+    def cast_type_array(column, dmtype):
+        """
+        Cast a whole table column mapped on an ATTRIBUTE based on its dmtype.
+        This is the counterpart of ``cast_type_value`` for columns:
+        masked values of real ATTRIBUTEs become NaN, masked values of boolean ATTRIBUTEs become False.
+        Parameters
+        ----------
+        column (~astropy.table.Column): column mapped on the ATTRIBUTE.
+        dmtype (str): dmtype of the ATTRIBUTE.
+        Returns
+        -------
+        ~numpy.ndarray or ~numpy.ma.MaskedArray
+            The cast values, masked for other dmtypes if the column has masked values.
+        """
+        lower_dmtype = dmtype.lower()
+        # plain arrays: astropy columns would carry their units along
+        values = numpy.ma.MaskedArray(numpy.ma.getdata(column).view(numpy.ndarray),
+                                      mask=numpy.ma.getmaskarray(column))
+        if "bool" in lower_dmtype:
+            return values.astype(bool).filled(False)
+        elif "real" in lower_dmtype or "double" in lower_dmtype or "float" in lower_dmtype:
+            return values.astype(float).filled(numpy.nan)
+        elif values.mask.any():
+            return values
+        return values.data
+
     @staticmethod
     def cast_type_value(value, dmtype):
         """
@@ -59,8 +59,9 @@ class XPath:
         Return all the elements of the XML tree that match the given
         XPath query with a given Tag starting with a given value.
         Example of a path: ".//*[starts-with(name(), 'REFERENCE_')]"
-        This function is only used in the static reference resolver to find all the REFERENCEs and JOINs.
-        It adds a counter to the path to find all the REFERENCEs and JOINs.
+        This function is only used to find the REFERENCEs and JOINs numbered by the AnnotationSeeker.
+        As with the XPath query ``path + str(cnt)`` for cnt=1, 2... the elements are
+        returned by number until a number is missing.
         Parameters
         ----------
         etree : `xml.etree.ElementTree.Element`
@@ -72,15 +73,18 @@ class XPath:
         list
             The list of all the elements of the XML tree that match the given XPath query.
         """
-        cnt = 1
+        # index the numbered elements in one pass (rather than searching
+        # the tree for each number), keeping the first one for each number
+        prefix = path.split("/")[-1]
+        numbered = {}
+        for ele in etree.iter():
+            if ele is not etree and isinstance(ele.tag, str) and ele.tag.startswith(prefix):
+                numbered.setdefault(ele.tag[len(prefix):], ele)
         result = []
-        run = True
-        while run:
-            if etree.find(path + str(cnt)) is not None:
-                result.append(etree.find(path + str(cnt)))
-                cnt += 1
-            else:
-                run = False
+        cnt = 1
+        while str(cnt) in numbered:
+            result.append(numbered[str(cnt)])
+            cnt += 1
         return result
 
     @staticmethod
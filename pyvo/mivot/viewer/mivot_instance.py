@@ -10,6 +10,8 @@ Instances of this class are built by `pyvo.mivot.viewer.mivot_viewer`.
 Although attribute values can be changed by users, this class is first
 meant to provide a convenient access the mapped VOTable data
 """
+import numpy
+from astropy.table import Row
 from pyvo.mivot.utils.vocabulary import Constant
 from pyvo.utils.prototype import prototype_feature
 from pyvo.mivot.utils.mivot_utils import MivotUtils
@@ -40,6 +42,11 @@ class MivotInstance:
         ----------
         kwargs (dict): Dictionary of the XML object.
         """
+        # the update plan, compiled on the first update
+        self._plan = None
+        # the table the plan columns have been taken from
+        self._bound_table = None
+        self._bound_columns = None
         self._create_class(**instance_dict)
 
     def __repr__(self):
@@ -105,25 +112,82 @@ class MivotInstance:
         Update the MIVOT class with the new data row.
         For each leaf of the MIVOT class, we update the value with the new data row.
 
+        The leaves bound to columns and the casts of their values are collected
+        on the first update (see ``_compile_plan``), so that further updates
+        only loop over the mapped columns.
+        The structure of the instance must therefore not be changed after the first update.
+
         Parameters
         ----------
         row (astropy.table.row.Row): The new data row.
         ref (str, optional):The reference of the data row, default is None.
         """
+        if ref is not None:
+            if ref != 'null' and 'value' in vars(self):
+                self.value = MivotUtils.cast_type_value(row[ref], getattr(self, 'dmtype'))
+            return
+
+        if self._plan is None:
+            self._plan = self._compile_plan()
+
+        if isinstance(row, Row):
+            # read the values straight from the column arrays
+            index = row.index
+            for (leaf, _, cast), (data, mask) in zip(self._plan, self._get_bound_columns(row.table)):
+                if mask is not None and mask[index]:
+                    leaf.value = cast(numpy.ma.masked)
+                else:
+                    leaf.value = cast(data[index])
+        elif isinstance(row, numpy.ma.mvoid):
+            # field access on masked records is slow: split data and mask once
+            data, mask = row._data, row._mask
+            for leaf, ref, cast in self._plan:
+                leaf.value = cast(numpy.ma.masked if mask[ref] else data[ref])
+        else:
+            for leaf, ref, cast in self._plan:
+                leaf.value = cast(row[ref])
+
+    def _compile_plan(self):
+        """
+        Return the update plan of the instance, i.e. a flat list of
+        (leaf instance, column reference, cast function) tuples for all
+        the leaves bound to a column.
+        As in the former recursive update, leaves directly stored in
+        COLLECTIONs are not updated.
+        """
+        plan = []
         for key, value in vars(self).items():
+            if key.startswith('_'):
+                continue
             if isinstance(value, list):
                 for item in value:
-                    item.update(row=row)
+                    plan.extend(item._compile_plan())
             elif isinstance(value, MivotInstance):
-                if isinstance(vars(value), dict):
-                    if 'value' not in vars(value):
-                        value.update(row=row)
-                    if 'value' in vars(value):
-                        value.update(row=row, ref=getattr(value, 'ref'))
-            else:
-                if key == 'value' and ref is not None and ref != 'null':
-                    setattr(self, self._remove_model_name(key),
-                            MivotUtils.cast_type_value(row[ref], getattr(self, 'dmtype')))
+                if 'value' not in vars(value):
+                    plan.extend(value._compile_plan())
+                else:
+                    ref = getattr(value, 'ref')
+                    if ref is not None and ref != 'null':
+                        plan.append((value, ref, MivotUtils.get_caster(getattr(value, 'dmtype'))))
+        return plan
+
+    def _get_bound_columns(self, table):
+        """
+        Return (data, mask) pairs of plain numpy arrays for the columns of
+        table referenced by the update plan, in the order of the plan;
+        mask is None for columns without masked values.
+        The column lookup is only done again when rows of another table are given.
+        """
+        if self._bound_table is not table:
+            self._bound_columns = []
+            for _, ref, _ in self._plan:
+                column = table.columns[ref]
+                mask = numpy.ma.getmask(column)
+                self._bound_columns.append((
+                    numpy.ma.getdata(column).view(numpy.ndarray),
+                    mask if mask is not numpy.ma.nomask and mask.any() else None))
+            self._bound_table = table
+        return self._bound_columns
 
     def get_SkyCoord(self):
         """
@@ -23,7 +23,10 @@ See `tests/test_user_api.py`to get different examples of the API usage.
 """
 import logging
 from copy import deepcopy
+import numpy
+from astropy import units as u
 from astropy import version
+from astropy.table import Table
 from astropy.io.votable import parse
 from astropy.io.votable.tree import VOTableFile
 from pyvo.dal import DALResults
@@ -36,8 +39,10 @@ from pyvo.mivot.utils.xml_utils import XmlUtils
 from pyvo.mivot.utils.xpath_utils import XPath
 from pyvo.mivot.seekers.annotation_seeker import AnnotationSeeker
 from pyvo.mivot.seekers.resource_seeker import ResourceSeeker
-from pyvo.mivot.seekers.table_iterator import TableIterator
+from pyvo.mivot.seekers.table_iterator import TableIterator, StreamingTableIterator
+from pyvo.mivot.seekers.table_streamer import TableStreamer
 from pyvo.mivot.features.static_reference_resolver import StaticReferenceResolver
+from pyvo.mivot.features.sky_coord_builder import SkyCoordBuilder
 from pyvo.mivot.version_checker import check_astropy_version
 from pyvo.mivot.viewer.mivot_instance import MivotInstance
 from pyvo.utils.prototype import prototype_feature
@@ -56,27 +61,40 @@ class MivotViewer:
     MivotViewer is a PyVO table wrapper aiming at providing
     a model view on VOTable data read with usual tools.
     """
-    def __init__(self, votable_path, tableref=None):
+    def __init__(self, votable_path, tableref=None, *, chunk_size=None):
         """
         Constructor of the MivotViewer class.
 
         Parameters
         ----------
-        votable_path : str, parsed VOTable or DALResults instance
+        votable_path : str, file-like, parsed VOTable or DALResults instance
             VOTable that will be parsed with the parser of Astropy,
             which extracts the annotation block.
         tableref : str, optional
             Used to identify the table to process. If not specified,
             the first table is taken by default.
+        chunk_size : int, optional
+            If given for a path or a binary stream (e.g. the raw stream of an HTTP response),
+            the VOTable is streamed: only the part preceding the table data is parsed
+            up front, and the table rows are then read and parsed by chunks of chunk_size rows
+            as the viewer iterates over them.
+            Only the first table with data (which must be in TABLEDATA serialization) can be
+            streamed, the iteration cannot be rewound once the first chunk has been passed,
+            and ``connected_table``, ``to_columns``, ``to_table`` and ``get_sky_coords``
+            only cover the current chunk.
         """
         if not check_astropy_version():
             raise AstropyVersionException(f"Astropy version {version.version} "
                                           f"is below the required version 6.0 for the use of MIVOT.")
 
+        self._table_streamer = None
         if isinstance(votable_path, DALResults):
             self._parsed_votable = votable_path.votable
         elif isinstance(votable_path, VOTableFile):
             self._parsed_votable = votable_path
+        elif chunk_size is not None:
+            self._table_streamer = TableStreamer(votable_path, chunk_size=chunk_size)
+            self._parsed_votable = self._table_streamer.votable
         else:
             self._parsed_votable = parse(votable_path)
         self._table_iterator = None
@@ -102,6 +120,9 @@ class MivotViewer:
             self._init_instance()
         except MappingError as mnf:
             logging.error(str(mnf))
+        except Exception:
+            self.close()
+            raise
 
     def __enter__(self):
         """ with statement implementation """
@@ -110,9 +131,12 @@ class MivotViewer:
     def __exit__(self, exc_type, exc_value, traceback):
         """ with statement implementation """
         logging.info("MivotViewer closing..")
+        self.close()
 
     def close(self):
         """ with statement implementation """
+        if self._table_streamer is not None:
+            self._table_streamer.close()
         logging.info("MivotViewer is closed")
 
     @property
@@ -208,6 +232,134 @@ class MivotViewer:
         self._dm_instance.update(self._current_data_row)
         return self._dm_instance
 
+    def get_sky_coords(self):
+        """
+        Build a single SkyCoord holding the positions of all the rows of the connected table.
+
+        The ``mango:EpochPosition`` mapping is resolved once, the mapped columns
+        (longitude, latitude, proper motions, parallax, radial velocity, epoch)
+        are taken as whole arrays, and the frame (and equinox) comes from the
+        annotations, usually in GLOBALS.
+        This is much faster than calling ``get_SkyCoord`` on each row, and the
+        result can be used for epoch propagation over the whole table.
+
+        returns
+        -------
+        SkyCoord
+            A SkyCoord with one position per table row
+
+        raises
+        ------
+        MivotError
+            if the viewer is not connected to an annotated table
+        NoMatchingDMTypeError
+            if the mapped instance is not a ``mango:EpochPosition``
+        """
+        return SkyCoordBuilder(self._get_columnar_hk_dict()).build_sky_coord()
+
+    def to_columns(self):
+        """
+        Export the mapped instance for all the rows of the connected table
+        as a dictionary of arrays, without building per-row objects.
+
+        The dictionary keys are the dotted roles of the instance attributes
+        (e.g. ``position.longitude``), with the index of the items for collections
+        (e.g. ``observable[1].measure.coord.cval``).
+        The values are the cast column arrays for attributes mapped on columns,
+        and read-only arrays repeating the value for constant attributes.
+        Use `to_table` to get the units and dmtypes as well.
+
+        returns
+        -------
+        dict
+            arrays with one element per table row, by dotted role
+        """
+        if self._table_iterator is None:
+            raise MivotError("The viewer is not connected to an annotated table")
+        return self._get_columns(self._table_iterator.data_table)
+
+    def _get_columns(self, table):
+        """
+        Return the arrays of the mapped attributes for the rows of table by dotted role
+        (see `to_columns`).
+        """
+        columns = {}
+        for path, leaf in self._iter_leaves(self._get_columnar_hk_dict(table)):
+            value = leaf["value"]
+            if not isinstance(value, numpy.ndarray):
+                value = numpy.broadcast_to(numpy.asarray(value), (len(table),))
+            columns[path] = value
+        return columns
+
+    def to_table(self):
+        """
+        Export the mapped instance for all the rows of the connected table
+        as an astropy Table, without building per-row objects.
+
+        The columns are those of `to_columns`.
+        Their units are taken from the annotations, and their meta dictionaries give the
+        ``dmtype`` of the attribute and, for attributes mapped on columns,
+        the ``ref`` of the VOTable column.
+        The meta dictionary of the table gives the ``dmtype`` of the mapped instance.
+
+        returns
+        -------
+        ~astropy.table.Table
+            a table with one column per attribute of the mapped instance
+        """
+        columns = self.to_columns()
+        table = Table(meta={"dmtype": self._dm_instance.dmtype})
+        for path, leaf in self._iter_leaves(self._dm_instance.to_hk_dict()):
+            table[path] = columns[path]
+            column = table[path]
+            if leaf.get("unit"):
+                # early Vizier annotations use year instead of yr
+                column.unit = u.Unit(leaf["unit"].replace("year", "yr"), parse_strict="silent")
+            column.meta["dmtype"] = leaf.get("dmtype")
+            if leaf.get("ref") not in (None, 'null'):
+                column.meta["ref"] = leaf["ref"]
+        return table
+
+    @staticmethod
+    def _iter_leaves(hk_dict, prefix=""):
+        """
+        Yield (dotted role, attribute dictionary) pairs for all the attributes found
+        in a house-keeping dictionary of a MivotInstance.
+        """
+        for key, value in hk_dict.items():
+            if isinstance(value, list):
+                for index, item in enumerate(value):
+                    yield from MivotViewer._iter_leaves(item, f"{prefix}{key}[{index}].")
+            elif isinstance(value, dict):
+                if "value" in value:
+                    yield f"{prefix}{key}", value
+                else:
+                    yield from MivotViewer._iter_leaves(value, f"{prefix}{key}.")
+
+    def _get_columnar_hk_dict(self, table=None):
+        """
+        Return the house-keeping dictionary of the mapped instance (see
+        `~pyvo.mivot.viewer.mivot_instance.MivotInstance.to_hk_dict`)
+        where the values of the attributes mapped on columns are replaced
+        by the whole column arrays of table (by default, the connected table).
+        """
+        if self._dm_instance is None or self._table_iterator is None:
+            raise MivotError("The viewer is not connected to an annotated table")
+        if table is None:
+            table = self._table_iterator.data_table
+
+        def set_columns(element):
+            if isinstance(element, list):
+                return [set_columns(item) for item in element]
+            if not isinstance(element, dict):
+                return element
+            ref = element.get("ref")
+            if "value" in element and ref is not None and ref != 'null':
+                return dict(element, value=MivotUtils.cast_type_array(table[ref], element["dmtype"]))
+            return {key: set_columns(value) for key, value in element.items()}
+
+        return set_columns(self._dm_instance.to_hk_dict())
+
     def get_table_ids(self):
         """
         Return a list of the table located just below self._resource.
@@ -278,6 +430,40 @@ class MivotViewer:
         self._current_data_row = self._table_iterator.get_next_row()
         return self._current_data_row
 
+    def set_row_filter(self, predicate):
+        """
+        Restrict the iteration (`next`, `next_table_row`) to the rows matching a predicate.
+
+        The predicate is evaluated once over whole columns (once per chunk for streamed
+        VOTables) rather than row by row, and the iteration is rewound.
+
+        Parameters
+        ----------
+        predicate : callable or None
+            Function taking a dictionary of arrays, holding both the columns of the
+            table by name and the mapped attributes by dotted role (see `to_columns`),
+            and returning a boolean array with True for the rows to visit,
+            e.g. ``lambda columns: columns["parallax"] > 5``.
+            None removes the filter.
+
+        raises
+        ------
+        MivotError
+            if the viewer is not connected to an annotated table
+        """
+        if self._table_iterator is None:
+            raise MivotError("The viewer is not connected to an annotated table")
+        if predicate is None:
+            self._table_iterator.set_row_filter(None)
+            return
+
+        def row_filter(table):
+            columns = {name: table[name] for name in table.colnames}
+            columns.update(self._get_columns(table))
+            return predicate(columns)
+
+        self._table_iterator.set_row_filter(row_filter)
+
     def rewind(self):
         """
         Rewind the table iterator on the table the veizer is connected with.
@@ -359,14 +545,25 @@ class MivotViewer:
 
         self._connected_table = self._resource_seeker.get_table(tableref)
         if self.connected_table is None:
+            if self._table_streamer is not None:
+                # the tables following the streamed one are not parsed
+                raise MivotError("Only the first table with data can be streamed, "
+                                 f"cannot find table {stableref} before it")
             raise MivotError(f"Cannot find table {stableref} in VOTable")
         logging.debug("table %s found in VOTable", stableref)
         self._templates = deepcopy(self.annotation_seeker.get_templates_block(tableref))
         if self._templates is None:
             raise MivotError("Cannot find " + Ele.TEMPLATES + f" {stableref} ")
         logging.debug(Ele.TEMPLATES + " %s found ", stableref)
-        self._table_iterator = TableIterator(self._connected_tableref,
-                                             self.connected_table.to_table())
+        if self._table_streamer is None:
+            self._table_iterator = TableIterator(self._connected_tableref,
+                                                 self.connected_table.to_table())
+        elif self.connected_table is self._table_streamer.table:
+            self._table_iterator = StreamingTableIterator(self._connected_tableref,
+                                                          self._table_streamer)
+        else:
+            raise MivotError("Only the first table with data can be streamed, "
+                             f"not {stableref}")
         self._squash_join_and_references()
         self._set_column_indices()
         self._set_column_units()
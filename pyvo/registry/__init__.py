@@ -5,18 +5,32 @@ a package for interacting with registries.
 The regtap module supports access to the IVOA Registries
 """
 
-from .regtap import (search, ivoid2service,
-    get_RegTAP_query,
-    choose_RegTAP_service,
-    RegistryResults, RegistryResource)
+from ..utils.lazy import lazy_namespace
 
-from .rtcons import (Constraint, SubqueriedConstraint,
-                     Freetext, Author, Servicetype, Waveband, Datamodel, Ivoid,
-                     UCD, Spatial, Spectral, Temporal, RegTAPFeatureMissing)
-
-__all__ = ["search", "get_RegTAP_query", "Constraint", "SubqueriedConstraint",
+__all__ = ["search", "iter_search", "get_RegTAP_query", "Constraint", "SubqueriedConstraint",
            "Freetext", "Author",
            "Servicetype", "Waveband", "Datamodel", "Ivoid", "UCD",
            "Spatial", "Spectral", "Temporal",
-           "choose_RegTAP_service", "RegTAPFeatureMissing",
-           "RegistryResults", "RegistryResource",]
+           "choose_RegTAP_service", "use_RegTAP_failover",
+           "get_RegTAP_profile", "use_RegTAP_profile_cache",
+           "RegTAPFeatureMissing",
+           "RegistryResults", "RegistryResource", "RegTAPMirror",
+           "InterfaceCache", "resolve_services", "InterfaceProber",]
+
+# the registry modules (and the parts of astropy they use) are only
+# imported when one of their names is first used
+__getattr__, __dir__ = lazy_namespace(__name__, globals(), {
+    **{name: (".regtap", name) for name in [
+        "search", "iter_search", "ivoid2service", "get_RegTAP_query",
+        "choose_RegTAP_service", "use_RegTAP_failover",
+        "get_RegTAP_profile", "use_RegTAP_profile_cache",
+        "RegistryResults", "RegistryResource"]},
+    "RegTAPMirror": (".mirror", "RegTAPMirror"),
+    "InterfaceProber": (".prober", "InterfaceProber"),
+    "InterfaceCache": (".resolver", "InterfaceCache"),
+    "resolve_services": (".resolver", "resolve_services"),
+    **{name: (".rtcons", name) for name in [
+        "Constraint", "SubqueriedConstraint",
+        "Freetext", "Author", "Servicetype", "Waveband", "Datamodel", "Ivoid",
+        "UCD", "Spatial", "Spectral", "Temporal", "RegTAPFeatureMissing"]},
+}, submodules=["failover", "mirror", "prober", "profile", "regtap", "resolver", "rtcons"])
@@ -0,0 +1,259 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+Routing of registry queries to the fastest of several RegTAP services.
+
+A `RegTAPRouter` keeps a list of RegTAP endpoints and measures their
+latency by timing requests for their VOSI capabilities, optionally in a
+background thread.  Queries go to the fastest endpoint that is not known
+to be failing; when an endpoint fails, the query is retried on the next
+one.  With ``hedge_after``, a query that has not returned after that
+many seconds is additionally sent to the next endpoint, and whichever
+answer comes first is used.
+
+Use `pyvo.registry.use_RegTAP_failover` to route the queries of
+`pyvo.registry.search` through a router.
+"""
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from . import rtcons
+from ..dal import tap, query as dalq
+from ..utils.http import use_session
+
+__all__ = ["RegTAPRouter", "KNOWN_REGTAP_SERVICES"]
+
+
+# The TAP access URLs of the RegTAP services known at the time of
+# writing; the default registry comes first so it is used until
+# latencies have been measured.
+KNOWN_REGTAP_SERVICES = (
+    "http://reg.g-vo.org/tap",
+    "http://dc.zah.uni-heidelberg.de/tap",
+    "http://gavo.aip.de/tap",
+    "http://voparis-rr.obspm.fr/tap",
+    "https://vao.stsci.edu/RegTAP/TapService.aspx",
+)
+
+# errors marking an endpoint as failing; queries are re-tried on another
+# endpoint after them and after rtcons.RegTAPFeatureMissing, which only
+# means the endpoint cannot run that query.  Other DALQueryErrors would
+# most likely recur on the next endpoint.
+_FAILOVER_ERRORS = (dalq.DALServiceError, dalq.DALFormatError)
+
+# the weight of a new measurement in the latency estimate.
+_SMOOTHING = 0.3
+
+
+class RegTAPRouter:
+    """
+    a set of RegTAP endpoints that queries are routed to by measured
+    latency.
+
+    Latencies are ``None`` for endpoints not measured yet and infinite
+    for endpoints that failed their last probe or query.  Endpoints are
+    tried fastest first, then unmeasured ones in the order given, then
+    failing ones, which only come back after a successful probe.
+    """
+
+    def __init__(self, access_urls=KNOWN_REGTAP_SERVICES, *,
+                 hedge_after=None, timeout=10., session=None):
+        """
+        create a router for RegTAP services.
+
+        Parameters
+        ----------
+        access_urls : sequence of str
+            the TAP access URLs of the RegTAP services to use.
+        hedge_after : float
+            if given, a query that has not returned after this many
+            seconds is also sent to the next endpoint.
+        timeout : float
+            the time (in seconds) after which a probe is considered
+            failed.
+        session : object
+            optional session to use for network requests.
+        """
+        if not access_urls:
+            raise ValueError("A RegTAP router needs at least one endpoint.")
+        self._session = use_session(session)
+        self._services = {url.rstrip("/"): tap.TAPService(
+            url.rstrip("/"), session=self._session) for url in access_urls}
+        self._latencies = dict.fromkeys(self._services)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.hedge_after = hedge_after
+        self.timeout = timeout
+
+    @property
+    def access_urls(self):
+        """
+        the access URLs of the endpoints in the order they are tried.
+        """
+        order = list(self._services)
+        with self._lock:
+            latencies = dict(self._latencies)
+
+        def sort_key(url):
+            latency = latencies[url]
+            if latency is None:
+                return (1, 0, order.index(url))
+            return (2 if math.isinf(latency) else 0,
+                    latency, order.index(url))
+
+        return sorted(order, key=sort_key)
+
+    @property
+    def latencies(self):
+        """
+        a dict mapping the access URLs to their current latency
+        estimates in seconds.
+        """
+        with self._lock:
+            return dict(self._latencies)
+
+    def get_service(self):
+        """
+        returns the `~pyvo.dal.TAPService` of the endpoint currently
+        preferred.
+        """
+        return self._services[self.access_urls[0]]
+
+    def _record(self, access_url, latency):
+        """
+        adds a latency measurement (or, for infinity, a failure) for
+        access_url.
+        """
+        with self._lock:
+            previous = self._latencies[access_url]
+            if (previous is None or math.isinf(previous)
+                    or math.isinf(latency)):
+                self._latencies[access_url] = latency
+            else:
+                self._latencies[access_url] = (
+                    _SMOOTHING * latency + (1 - _SMOOTHING) * previous)
+
+    def _record_error(self, access_url, error):
+        """
+        marks access_url as failing after a query raised error there,
+        unless the endpoint merely lacked a feature the query needs.
+        """
+        if not isinstance(error, rtcons.RegTAPFeatureMissing):
+            self._record(access_url, math.inf)
+
+    def _probe_one(self, access_url):
+        start = time.monotonic()
+        try:
+            response = self._session.get(
+                access_url + "/capabilities", timeout=self.timeout)
+            response.raise_for_status()
+        except Exception:
+            self._record(access_url, math.inf)
+        else:
+            self._record(access_url, time.monotonic() - start)
+
+    def probe(self):
+        """
+        measures the latencies of all endpoints in parallel.
+
+        Returns
+        -------
+        dict
+            the updated latency estimates, as in `latencies`.
+        """
+        with ThreadPoolExecutor(max_workers=len(self._services)) as pool:
+            list(pool.map(self._probe_one, self._services))
+        return self.latencies
+
+    def start(self, probe_interval=600.):
+        """
+        starts probing the endpoints in a background thread every
+        probe_interval seconds.
+
+        The first probe is run immediately.  Stop probing with `stop`.
+        """
+        self.stop()
+        self._stopped.clear()
+
+        def run():
+            while True:
+                self.probe()
+                if self._stopped.wait(probe_interval):
+                    break
+
+        self._thread = threading.Thread(
+            target=run, name="RegTAP probe", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        stops background probing.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def run(self, func):
+        """
+        returns func(service) for the `~pyvo.dal.TAPService` of the
+        preferred endpoint, failing over to the other endpoints on
+        service errors.
+
+        Endpoints that fail are marked as failing until they pass a
+        probe.  If all endpoints fail, the last error is raised.
+        """
+        if self.hedge_after is None:
+            last_error = None
+            for access_url in self.access_urls:
+                try:
+                    return func(self._services[access_url])
+                except (*_FAILOVER_ERRORS, rtcons.RegTAPFeatureMissing) as ex:
+                    self._record_error(access_url, ex)
+                    last_error = ex
+            raise last_error
+
+        return self._run_hedged(func)
+
+    def _run_hedged(self, func):
+        """
+        returns func(service) as for run, but starts func on the next
+        endpoint when no result has arrived within hedge_after seconds.
+        """
+        candidates = iter(self.access_urls)
+        pending, last_error = {}, None
+        pool = ThreadPoolExecutor(max_workers=len(self._services))
+
+        def submit_next():
+            access_url = next(candidates, None)
+            if access_url is not None:
+                pending[pool.submit(
+                    func, self._services[access_url])] = access_url
+            return access_url is not None
+
+        try:
+            can_hedge = submit_next()
+            while pending:
+                done, _ = wait(
+                    pending, return_when=FIRST_COMPLETED,
+                    timeout=self.hedge_after if can_hedge else None)
+                if not done:
+                    can_hedge = submit_next()
+                    continue
+
+                for future in done:
+                    access_url = pending.pop(future)
+                    try:
+                        return future.result()
+                    except (*_FAILOVER_ERRORS, rtcons.RegTAPFeatureMissing) as ex:
+                        self._record_error(access_url, ex)
+                        last_error = ex
+                if not pending:
+                    can_hedge = submit_next()
+            raise last_error
+
+        finally:
+            # a slower duplicate is left to finish in the background
+            pool.shutdown(wait=False)
@@ -0,0 +1,373 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+A local mirror of the core RegTAP tables.
+
+A `RegTAPMirror` harvests the tables registry searches need into an
+SQLite file and evaluates the ADQL produced by the registry constraints
+against that file.  Searches against a mirror do not touch the network,
+which makes them fast and lets them work while the Registry is down.
+
+The ADQL user-defined functions RegTAP requires are emulated in
+python; ``ivo_hasword`` matches word prefixes rather than stemming
+words, and, SQLite's LIKE being case-insensitive, patterns always match
+case-insensitively.  Spatial constraints need MOC support and are not
+available on mirrors.
+"""
+import os
+import re
+import sqlite3
+import warnings
+from contextlib import closing, contextmanager
+
+import numpy
+
+from astropy.io.votable import from_table
+from astropy.table import MaskedColumn, Table, vstack
+
+from . import profile, regtap, rtcons
+from ..dal import query as dalq
+
+__all__ = ["RegTAPMirror"]
+
+
+# everything except rr.table_column, which is large and only needed for
+# UCD constraints (pass tables=RegTAPMirror.all_tables to include it),
+# and rr.stc_spatial, which would need MOC support to be useful.
+DEFAULT_TABLES = (
+    "rr.resource", "rr.capability", "rr.interface", "rr.res_subject",
+    "rr.res_detail", "rr.res_role", "rr.res_table", "rr.relationship",
+    "rr.stc_spectral", "rr.stc_temporal")
+
+_FEATURES = {
+    ("ivo://ivoa.net/std/TAPRegExt#features-adql-sets", "UNION")}
+
+_STRING_LITERAL = re.compile(r"('(?:[^']|'')*')")
+
+_WORD = re.compile(r"\w+")
+
+
+def _ivo_hasword(haystack, needle):
+    if haystack is None or needle is None:
+        return 0
+    words = _WORD.findall(haystack.lower())
+    return int(all(any(word.startswith(part) for word in words)
+                   for part in _WORD.findall(needle.lower())))
+
+
+def _ivo_nocasematch(value, pattern):
+    if value is None or pattern is None:
+        return 0
+    regex = "".join(
+        ".*" if char == "%" else "." if char == "_" else re.escape(char)
+        for char in pattern)
+    return int(re.fullmatch(regex, value, re.IGNORECASE | re.DOTALL)
+               is not None)
+
+
+def _ivo_hashlist_has(hashlist, item):
+    if hashlist is None or item is None:
+        return 0
+    return int(item.lower() in hashlist.lower().split("#"))
+
+
+def _ivo_interval_overlaps(low1, high1, low2, high2):
+    if None in (low1, high1, low2, high2):
+        return None
+    return int(high1 >= low2 and high2 >= low1)
+
+
+class _StringAgg:
+    """
+    an SQLite aggregate for ivo_string_agg.
+    """
+    def __init__(self):
+        self.values, self.delimiter = [], ""
+
+    def step(self, value, delimiter):
+        self.delimiter = delimiter
+        if value is not None:
+            self.values.append(value)
+
+    def finalize(self):
+        if not self.values:
+            return None
+        return self.delimiter.join(self.values)
+
+
+def _to_sqlite_dialect(adql):
+    """
+    returns the ADQL produced by rtcons in a form SQLite can execute.
+    """
+    parts = _STRING_LITERAL.split(adql)
+    parts[::2] = [re.sub(r"\bILIKE\b", "LIKE", part, flags=re.IGNORECASE)
+                  for part in parts[::2]]
+    return "".join(parts)
+
+
+def _to_sql_value(value):
+    """
+    returns value from an astropy table as something SQLite can store.
+    """
+    if value is numpy.ma.masked:
+        return None
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    if isinstance(value, numpy.ndarray):
+        return " ".join(str(item) for item in value.tolist())
+    if isinstance(value, numpy.generic):
+        return value.item()
+    return value
+
+
+def _rows_to_table(names, rows):
+    """
+    returns an astropy table with masked columns for the SQLite rows.
+    """
+    columns = []
+    for index, name in enumerate(names):
+        values = [row[index] for row in rows]
+        mask = [value is None for value in values]
+        present = [value for value in values if value is not None]
+
+        if present and all(isinstance(value, (int, float))
+                           for value in present):
+            columns.append(MaskedColumn(
+                [0 if value is None else value for value in values],
+                name=name, mask=mask))
+        else:
+            columns.append(MaskedColumn(
+                ["" if value is None else str(value) for value in values],
+                name=name, mask=mask, dtype=str))
+    return Table(columns)
+
+
+class RegTAPMirror:
+    """
+    a local copy of the core tables of a RegTAP service.
+
+    Call `refresh` to fill or update the mirror, then run registry
+    searches against it using `search`, which takes the same
+    constraints and keywords as `pyvo.registry.search`.
+    """
+
+    all_tables = DEFAULT_TABLES + ("rr.table_column",)
+
+    def __init__(self, path, *, tables=DEFAULT_TABLES):
+        """
+        open (and, if necessary, create) a RegTAP mirror.
+
+        Parameters
+        ----------
+        path : str
+            the SQLite file the mirror is kept in.
+        tables : sequence of str
+            the (qualified) names of the RegTAP tables to mirror.
+        """
+        self._path = os.path.expanduser(path)
+        self._tables = tuple(tables)
+
+    @property
+    def path(self):
+        """
+        the file the mirror is kept in
+        """
+        return self._path
+
+    @contextmanager
+    def _connect(self):
+        """
+        yields a database connection with the mirror attached as the rr
+        schema, committing and closing it on exit.
+        """
+        with closing(sqlite3.connect(":memory:", timeout=30)) as conn:
+            conn.execute("ATTACH DATABASE ? AS rr", (self._path,))
+            conn.create_function("ivo_hasword", 2, _ivo_hasword)
+            conn.create_function("ivo_nocasematch", 2, _ivo_nocasematch)
+            conn.create_function("ivo_hashlist_has", 2, _ivo_hashlist_has)
+            conn.create_function(
+                "ivo_interval_overlaps", 4, _ivo_interval_overlaps)
+            conn.create_aggregate("ivo_string_agg", 2, _StringAgg)
+            with conn:
+                yield conn
+
+    def _get_local_tables(self, conn):
+        return {"rr." + name for name, in conn.execute(
+            "SELECT name FROM rr.sqlite_master WHERE type='table'")}
+
+    @property
+    def last_updated(self):
+        """
+        the newest ``updated`` timestamp in the mirror (an ISO string),
+        or None for an empty mirror.
+        """
+        with self._connect() as conn:
+            if "rr.resource" not in self._get_local_tables(conn):
+                return None
+            return conn.execute(
+                "SELECT MAX(updated) FROM rr.resource").fetchone()[0]
+
+    def _store(self, conn, table_name, result_table):
+        """
+        inserts the rows of an astropy table into table_name, creating
+        it if necessary.
+        """
+        names = result_table.colnames
+        conn.execute("CREATE TABLE IF NOT EXISTS {} ({})".format(
+            table_name, ", ".join('"{}"'.format(name) for name in names)))
+        conn.executemany(
+            "INSERT INTO {} ({}) VALUES ({})".format(
+                table_name,
+                ", ".join('"{}"'.format(name) for name in names),
+                ", ".join("?" * len(names))),
+            ([_to_sql_value(row[name]) for name in names]
+                for row in result_table))
+
+    def refresh(self, service=None, *, page_size=10000):
+        """
+        updates the mirror from a RegTAP service.
+
+        The first call copies the mirrored tables in full.  Later calls
+        only fetch the records updated since the newest record in the
+        mirror and drop records that have disappeared from the service.
+
+        Parameters
+        ----------
+        service : `~pyvo.dal.TAPService`
+            the RegTAP service to harvest; this defaults to the one
+            `pyvo.registry.search` uses.
+        page_size : int
+            the MAXREC of the harvesting queries; tables are retrieved in
+            pages of (at most) this many rows.
+
+        Returns
+        -------
+        int
+            the number of resource records fetched.
+
+        Raises
+        ------
+        DALServiceError
+            if the rows of a single resource in a table do not fit into
+            a page.  The mirror is not changed then.
+        """
+        if service is None:
+            service = regtap.get_RegTAP_service()
+
+        def run(table_name, columns, conditions):
+            # the rows of table_name matching conditions in ivoid order
+            # and whether they are incomplete
+            query = "SELECT {} FROM {}{} ORDER BY ivoid".format(
+                columns, table_name,
+                " WHERE " + " AND ".join(conditions) if conditions else "")
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", dalq.DALOverflowWarning)
+                result = service.run_sync(query, maxrec=page_size)
+            return result.to_table(), result.status[0].lower() == "overflow"
+
+        def fetch(table_name, condition=None, columns="*"):
+            # all rows of table_name matching condition, in pages.  The
+            # rows of the last resource of an overflowing page may be
+            # incomplete; they are fetched again.
+            conditions = [condition] if condition else []
+            pages, start = [], []
+            while True:
+                page, overflow = run(table_name, columns, conditions + start)
+                if not overflow:
+                    pages.append(page)
+                    return vstack(pages) if len(pages) > 1 else page
+
+                last = rtcons.make_sql_literal(page["ivoid"][-1])
+                page = page[page["ivoid"] != page["ivoid"][-1]]
+                if len(page):
+                    pages.append(page)
+                    start = ["ivoid>={}".format(last)]
+                    continue
+
+                # the page only has rows of one resource; see whether
+                # they fit into a page on their own
+                page, overflow = run(
+                    table_name, columns, conditions + ["ivoid={}".format(last)])
+                if overflow:
+                    raise dalq.DALServiceError(
+                        f"{last} has more than {page_size} rows in"
+                        f" {table_name}; retry with a larger page_size.")
+                pages.append(page)
+                start = ["ivoid>{}".format(last)]
+
+        tables = [name for name in self._tables if name in service.tables]
+        since = self.last_updated
+
+        if since is None:
+            condition = None
+        else:
+            condition = ("ivoid IN (SELECT ivoid FROM rr.resource"
+                         " WHERE updated>={})".format(
+                             rtcons.make_sql_literal(since)))
+        fetched = {name: fetch(name, condition) for name in tables}
+        if since is not None:
+            remote_ivoids = set(fetch("rr.resource", columns="ivoid")["ivoid"])
+
+        with self._connect() as conn:
+            local_tables = self._get_local_tables(conn)
+            conn.execute("CREATE TEMP TABLE stale (ivoid TEXT PRIMARY KEY)")
+            if since is not None:
+                known = {ivoid for ivoid, in conn.execute(
+                    "SELECT ivoid FROM rr.resource")}
+                conn.executemany(
+                    "INSERT OR IGNORE INTO stale VALUES (?)",
+                    ((ivoid,) for ivoid in
+                        (known - remote_ivoids)
+                        | set(fetched["rr.resource"]["ivoid"])))
+
+            for name in tables:
+                if name in local_tables:
+                    conn.execute("DELETE FROM {} WHERE ivoid IN"
+                                 " (SELECT ivoid FROM stale)".format(name))
+                self._store(conn, name, fetched[name])
+
+        return len(fetched.get("rr.resource", ()))
+
+    def run_query(self, query, *, maxrec=None):
+        """
+        runs an ADQL query as produced by `pyvo.registry.get_RegTAP_query`
+        against the mirror and returns the result as an astropy table.
+        """
+        query = _to_sqlite_dialect(query)
+        if maxrec is not None:
+            query += "\nLIMIT {:d}".format(maxrec)
+
+        with self._connect() as conn:
+            try:
+                cursor = conn.execute(query)
+            except sqlite3.OperationalError as ex:
+                if "no such table" in str(ex):
+                    raise rtcons.RegTAPFeatureMissing(
+                        f"{ex} (the table is not mirrored)")
+                raise dalq.DALQueryError(str(ex), url=self._path)
+            names = [desc[0] for desc in cursor.description]
+            return _rows_to_table(names, cursor.fetchall())
+
+    def search(self, *constraints, includeaux=False, maxrec=None,
+               **kwargs):
+        """
+        runs a registry search against the mirror.
+
+        This takes the same arguments as `pyvo.registry.search` and
+        returns a `~pyvo.registry.RegistryResults`.
+
+        Raises
+        ------
+        RegTAPFeatureMissing
+            if a constraint needs tables that are not mirrored or
+            features the mirror does not offer.
+        """
+        with self._connect() as conn:
+            service = profile.RegTAPProfile(
+                self._path, features=_FEATURES,
+                tables=self._get_local_tables(conn))
+
+        query = regtap.get_RegTAP_query(
+            *constraints, includeaux=includeaux, service=service, **kwargs)
+        return regtap.RegistryResults(
+            from_table(self.run_query(query, maxrec=maxrec)),
+            url=self._path)
@@ -0,0 +1,203 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+Parallel health and latency checks of service interfaces.
+
+An `InterfaceProber` sends a cheap request to each of many interfaces
+at once (VOSI capabilities for TAP, metadata queries for the simple
+DAL protocols) and records how long the response took.  Pass a prober
+to `~pyvo.registry.RegistryResource.get_service` to pick the fastest
+working interface when a resource has several equivalent ones.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ..utils.http import use_session
+
+__all__ = ["InterfaceProber", "ProbeResult"]
+
+
+# the path to append and the parameters to send when probing
+# interfaces by standard id.  Interfaces with other standard ids (or
+# none, as for web pages) are probed by a plain GET of the access URL.
+_PROBE_REQUESTS = {
+    "ivo://ivoa.net/std/tap": ("/capabilities", {}),
+    "ivo://ivoa.net/std/sia2": ("", {"MAXREC": "0"}),
+    "ivo://ivoa.net/std/sia": ("", {"FORMAT": "METADATA"}),
+    "ivo://ivoa.net/std/ssa": (
+        "", {"REQUEST": "queryData", "FORMAT": "METADATA"}),
+    "ivo://ivoa.net/std/sla": (
+        "", {"REQUEST": "queryData", "FORMAT": "METADATA"}),
+    "ivo://ivoa.net/std/conesearch": ("", {"RA": "0", "DEC": "0", "SR": "0"}),
+}
+
+
+class ProbeResult:
+    """
+    the outcome of probing an interface.
+
+    Attributes
+    ----------
+    access_url : str
+        the access URL probed.
+    latency : float
+        the time (in seconds) until the response came in, or None if the
+        probe failed.
+    error : str
+        a description of why the probe failed, or None if it did not.
+    probed : float
+        the unix time of the probe.
+    """
+
+    def __init__(self, access_url, *, latency=None, error=None):
+        self.access_url = access_url
+        self.latency = latency
+        self.error = error
+        self.probed = time.time()
+
+    def __repr__(self):
+        if self.healthy:
+            return f"<ProbeResult {self.access_url}: {self.latency:.3f} s>"
+        return f"<ProbeResult {self.access_url}: failed ({self.error})>"
+
+    @property
+    def healthy(self):
+        """
+        True if the interface responded without an error.
+        """
+        return self.error is None
+
+
+def _iter_interfaces(items):
+    """
+    yields the interfaces in items, which may be interfaces, registry
+    resources, or sequences of either.
+
+    For resources, this yields the interfaces that are not VOSI.
+    """
+    if hasattr(items, "access_url"):
+        yield items
+    elif hasattr(items, "interfaces"):
+        yield from (intf for intf in items.interfaces if not intf.is_vosi)
+    else:
+        for item in items:
+            yield from _iter_interfaces(item)
+
+
+class InterfaceProber:
+    """
+    a checker of the health and latency of service interfaces.
+
+    Probe results are kept by access URL for ``max_age`` seconds, so
+    that interfaces are only probed once even when they are considered
+    repeatedly.
+    """
+
+    def __init__(self, *, timeout=5., max_workers=16, max_age=600.,
+                 session=None):
+        """
+        create a prober.
+
+        Parameters
+        ----------
+        timeout : float
+            the time (in seconds) after which an interface that has not
+            responded is considered broken.
+        max_workers : int
+            the maximal number of interfaces probed at the same time.
+        max_age : float
+            the time (in seconds) after which interfaces are probed
+            again.
+        session : object
+            optional session to use for network requests.
+        """
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.max_age = max_age
+        self._session = use_session(session)
+        self._results = {}
+        self._lock = threading.Lock()
+
+    @property
+    def results(self):
+        """
+        a dict mapping access URLs to the `ProbeResult` of their last
+        probe.
+        """
+        with self._lock:
+            return dict(self._results)
+
+    def _probe_one(self, interface):
+        path, params = _PROBE_REQUESTS.get(
+            (interface.standard_id or "").split("#")[0], ("", {}))
+
+        start = time.monotonic()
+        try:
+            with self._session.get(
+                    interface.access_url.rstrip("?") + path,
+                    params=params, timeout=self.timeout,
+                    stream=True) as response:
+                response.raise_for_status()
+        except Exception as ex:
+            result = ProbeResult(interface.access_url, error=str(ex))
+        else:
+            result = ProbeResult(
+                interface.access_url, latency=time.monotonic() - start)
+
+        with self._lock:
+            self._results[interface.access_url] = result
+        return result
+
+    def probe(self, items, *, force=False):
+        """
+        probes interfaces in parallel.
+
+        Parameters
+        ----------
+        items : `~pyvo.registry.regtap.Interface`, `~pyvo.registry.RegistryResource`, or a sequence of these
+            what to probe; for resources (including
+            `~pyvo.registry.RegistryResults`), all interfaces except VOSI
+            ones are probed.
+        force : bool
+            probe interfaces even if a recent probe result exists.
+
+        Returns
+        -------
+        dict
+            a mapping from the access URLs of the interfaces to their
+            `ProbeResult`.
+        """
+        oldest = time.time() - self.max_age
+        interfaces, to_probe = {}, {}
+        with self._lock:
+            for interface in _iter_interfaces(items):
+                interfaces[interface.access_url] = interface
+                known = self._results.get(interface.access_url)
+                if force or known is None or known.probed < oldest:
+                    to_probe[interface.access_url] = interface
+
+        if to_probe:
+            with ThreadPoolExecutor(
+                    max_workers=min(self.max_workers, len(to_probe))) as pool:
+                list(pool.map(self._probe_one, to_probe.values()))
+
+        with self._lock:
+            return {access_url: self._results[access_url]
+                    for access_url in interfaces}
+
+    def rank(self, interfaces):
+        """
+        returns interfaces sorted by their health and latency.
+
+        Interfaces not recently probed are probed first.  Healthy
+        interfaces come first, fastest first; failing ones are retained
+        at the end in their original order.
+        """
+        interfaces = list(interfaces)
+        results = self.probe(interfaces)
+
+        def sort_key(interface):
+            result = results[interface.access_url]
+            return (not result.healthy, result.latency or 0)
+
+        return sorted(interfaces, key=sort_key)
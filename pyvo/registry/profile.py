@@ -0,0 +1,205 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+Feature profiles of RegTAP services.
+
+Registry constraints adapt the ADQL they produce to what the RegTAP
+service supports (ADQL features like UNION or MOC, optional tables like
+rr.stc_spatial).  Looking this up on a `~pyvo.dal.TAPService` means
+retrieving its capabilities and tableset.  A `RegTAPProfile` keeps just
+the facts constraints need, and a `RegTAPProfileCache` keeps profiles
+on disk so that later sessions can build registry queries without
+asking the service.
+"""
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+
+__all__ = ["RegTAPProfile", "RegTAPProfileCache"]
+
+
+class RegTAPProfile:
+    """
+    the ADQL features and tables of a RegTAP service.
+
+    Profiles can be passed wherever registry constraints expect a
+    service; they offer ``tables`` and the
+    ``get_tap_capability().get_adql().get_feature(...)`` chain of
+    `~pyvo.dal.TAPService`.
+
+    The tableset of a registry can be large, and most constraints do not
+    need it.  Profiles with a service therefore only retrieve the table
+    names when ``tables`` is first accessed, and then update their cache
+    (if any).
+    """
+
+    def __init__(self, access_url, *, features=(), tables=None,
+                 service=None, cache=None):
+        """
+        create a profile.
+
+        Parameters
+        ----------
+        access_url : str
+            the TAP access URL of the service described.
+        features : sequence of (str, str) pairs
+            the TAPRegExt feature type ivoids and forms the service
+            declares.
+        tables : sequence of str
+            the qualified names of the tables on the service; if None,
+            they are taken from service when needed.
+        service : `~pyvo.dal.TAPService`
+            the service described.
+        cache : `RegTAPProfileCache`
+            a cache to update when the tables become known.
+        """
+        self.access_url = access_url
+        self.features = frozenset(
+            (feature_type.lower(), form) for feature_type, form in features)
+        self._tables = None if tables is None else frozenset(tables)
+        self._service = service
+        self._cache = cache
+
+    @classmethod
+    def from_service(cls, service, *, cache=None):
+        """
+        returns the profile of a `~pyvo.dal.TAPService`.
+
+        This retrieves the service's capabilities if they have not been
+        retrieved before.
+        """
+        adql = service.get_tap_capability().get_adql()
+        return cls(
+            service.baseurl,
+            features=[(feature_list.type, feature.form)
+                      for feature_list in adql.languagefeaturelists
+                      for feature in feature_list],
+            tables=None if service._tables is None else service.tables.keys(),
+            service=service,
+            cache=cache)
+
+    def __repr__(self):
+        return "<RegTAPProfile for {}: {} features, {} tables>".format(
+            self.access_url, len(self.features),
+            "unknown" if self._tables is None else len(self._tables))
+
+    @property
+    def tables_known(self):
+        """
+        True if the table names have been retrieved.
+        """
+        return self._tables is not None
+
+    @property
+    def tables(self):
+        """
+        a frozenset of the qualified names of the tables on the service.
+        """
+        if self._tables is None:
+            if self._service is None:
+                return frozenset()
+            self._tables = frozenset(self._service.tables.keys())
+            if self._cache is not None:
+                self._cache.store(self)
+        return self._tables
+
+    def get_tap_capability(self):
+        return self
+
+    def get_adql(self):
+        return self
+
+    def get_feature(self, feature_type, form):
+        """
+        returns True if the service declares the feature of type
+        feature_type (compared case-insensitively) with form.
+        """
+        return (feature_type.lower(), form) in self.features
+
+
+class RegTAPProfileCache:
+    """
+    an on-disk cache of `RegTAPProfile` instances by access URL.
+
+    Profiles older than ``ttl`` seconds are ignored.  The cache is an
+    SQLite database and can be shared between processes.
+    """
+
+    def __init__(self, path, *, ttl=7 * 86400.):
+        """
+        open (and, if necessary, create) a profile cache.
+
+        Parameters
+        ----------
+        path : str
+            the file the cache is kept in.
+        ttl : float
+            the time (in seconds) after which profiles are re-computed;
+            this defaults to a week.
+        """
+        self._path = os.path.expanduser(path)
+        self.ttl = ttl
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS profiles ("
+                " access_url TEXT PRIMARY KEY,"
+                " features TEXT,"
+                " tables TEXT,"
+                " stored REAL)")
+
+    @property
+    def path(self):
+        """
+        the file the cache is kept in
+        """
+        return self._path
+
+    @contextmanager
+    def _connect(self):
+        """
+        yields a database connection, committing and closing it on exit.
+        """
+        with closing(sqlite3.connect(self._path, timeout=30)) as conn:
+            with conn:
+                yield conn
+
+    def get(self, access_url, *, service=None):
+        """
+        returns the cached profile for access_url, or None if there is
+        no fresh one.
+
+        Pass the service described to let the profile retrieve tables
+        not yet in the cache.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT features, tables FROM profiles"
+                " WHERE access_url=? AND stored>=?",
+                (access_url, time.time() - self.ttl)).fetchone()
+        if row is None:
+            return None
+        return RegTAPProfile(
+            access_url, features=json.loads(row[0]),
+            tables=None if row[1] is None else json.loads(row[1]),
+            service=service, cache=self)
+
+    def store(self, profile):
+        """
+        stores profile, replacing any earlier profile for its access URL.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO profiles VALUES (?, ?, ?, ?)",
+                (profile.access_url,
+                 json.dumps(sorted(profile.features)),
+                 json.dumps(sorted(profile.tables))
+                 if profile.tables_known else None,
+                 time.time()))
+
+    def clear(self):
+        """
+        removes all profiles from the cache.
+        """
+        with self._connect() as conn:
+            conn.execute("DELETE FROM profiles")
@@ -16,11 +16,16 @@ This module provides basic, low-level access to the RegTAP Registries using
 standardized TAP-based services.
 """
 
+import collections
 import functools
 import itertools
 import os
+import queue
 import textwrap
+import threading
+import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 
 from astropy import table
 from astropy.utils.decorators import deprecated
@@ -28,14 +33,16 @@ from astropy.utils.exceptions import AstropyDeprecationWarning
 
 import numpy
 
-from . import rtcons
+from . import failover, profile, rtcons
 from ..dal import scs, sia, sia2, ssa, sla, tap, query as dalq
 from ..io.vosi import vodataservice
 from ..utils.formatting import para_format_desc
 
 
 __all__ = ["search", "get_RegTAP_query", "Interface",
-           "RegistryResource", "RegistryResults", "ivoid2service"]
+           "RegistryResource", "RegistryResults", "ivoid2service",
+           "use_RegTAP_failover", "get_RegTAP_profile",
+           "use_RegTAP_profile_cache", "iter_search"]
 
 REGISTRY_BASEURL = os.environ.get("IVOA_REGISTRY", "http://reg.g-vo.org/tap"
                                   ).rstrip("/")
@@ -49,6 +56,104 @@ REGISTRY_BASEURL = os.environ.get("IVOA_REGISTRY", "http://reg.g-vo.org/tap"
 TOKEN_SEP = ":::py VO sep:::"
 
 
+# Queries for per-resource metadata, to be filled by _run_for_ivoids.
+#
+# Table metadata from rr.res_table joined with rr.table_column.  Tables
+# without columns come back as a single row with NULL column fields.
+_TABLES_QUERY = """SELECT t.ivoid, t.table_index, t.table_name,
+    t.table_description, t.table_title, t.table_utype,
+    c.name, c.ucd, c.unit, c.utype, c.datatype, c.arraysize,
+    c.extended_type, c.column_description
+  FROM rr.res_table AS t
+  {join}
+  LEFT OUTER JOIN rr.table_column AS c
+    ON (t.ivoid=c.ivoid AND t.table_index=c.table_index)
+  WHERE {where}"""
+
+_CONTACTS_QUERY = """SELECT t.ivoid, t.role_name, t.email, t.telephone
+  FROM rr.res_role AS t
+  {join}
+  WHERE t.base_role='contact' AND {where}"""
+
+_ALT_IDENTIFIERS_QUERY = """SELECT t.ivoid, t.alt_identifier
+  FROM rr.alt_identifier AS t
+  {join}
+  WHERE {where}"""
+
+# the MAXREC of the queries above.  Results overflowing it (or a lower
+# limit of the service) are retrieved again for fewer resources.
+_IVOIDS_MAXREC = 100000
+
+# the maximal number of ivoids uploaded with one of the queries above.
+_IVOIDS_BATCH_SIZE = 1000
+
+
+class _TablesCache:
+    """
+    the table metadata retrieved by get_tables, as a list of (table row,
+    column rows) pairs per ivoid.
+
+    At most maxsize ivoids are kept, dropping the least recently used
+    ones first, and entries older than ttl seconds count as missing.  The
+    lists are copied both when storing and when returning them, so
+    callers cannot change the cached metadata.
+    """
+    def __init__(self, maxsize=1000, ttl=3600.):
+        self.maxsize, self.ttl = maxsize, ttl
+        # ivoid -> (time.monotonic() when stored, tables)
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _copy(tables):
+        return [(table_row, list(columns)) for table_row, columns in tables]
+
+    def get(self, ivoid):
+        """
+        returns a copy of the tables of ivoid, or None if there is no
+        fresh entry for it.
+        """
+        with self._lock:
+            stored, tables = self._entries.get(ivoid, (None, None))
+            if stored is None:
+                return None
+            if time.monotonic() - stored >= self.ttl:
+                del self._entries[ivoid]
+                return None
+            self._entries.move_to_end(ivoid)
+            return self._copy(tables)
+
+    def __setitem__(self, ivoid, tables):
+        with self._lock:
+            self._entries[ivoid] = (time.monotonic(), self._copy(tables))
+            self._entries.move_to_end(ivoid)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, ivoid):
+        return self.get(ivoid) is not None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# choose_RegTAP_service clears this.
+_TABLES_CACHE = _TablesCache()
+
+# the failover.RegTAPRouter registry queries go through, if any; see
+# use_RegTAP_failover.
+_ROUTER = None
+
+# profile.RegTAPProfile-s by access URL, and the profile.RegTAPProfileCache
+# they are persisted in, if any; see get_RegTAP_profile.
+_PROFILES = {}
+_PROFILE_CACHE = None
+
+
 def shorten_stdid(s):
     """removes leading ivo://ivoa.net/std/ from s if present.
 
@@ -62,6 +167,17 @@ def shorten_stdid(s):
     return s
 
 
+def _get_access_modes(standard_ids, intf_types):
+    """returns the access modes (see RegistryResource.access_modes) for
+    interfaces given as parallel sequences of standard ids and types.
+    """
+    return set(shorten_stdid(standard_id) or "web"
+               for standard_id, intf_type
+               in itertools.zip_longest(standard_ids, intf_types)
+               if (standard_id or intf_type == "vr:webbrowser")
+               and not (standard_id or "").startswith("ivo://ivoa.net/std/vosi"))
+
+
 def expand_stdid(s):
     """returns s if it already looks like a URI, and it prepends
     ivo://ivoa.net/std otherwise.
@@ -97,6 +213,10 @@ def regularize_SIA2_id(standard_id):
 
 
 @functools.lru_cache(1)
+def _get_pinned_RegTAP_service():
+    return tap.TAPService(REGISTRY_BASEURL)
+
+
 def get_RegTAP_service():
     """
     a lazily created TAP service offering the RegTAP services.
@@ -106,9 +226,13 @@ def get_RegTAP_service():
     tables, etc.
 
     To switch to a different RegTAP service, use
-    :py:func:`choose_RegTAP_service`.
+    :py:func:`choose_RegTAP_service`.  After
+    :py:func:`use_RegTAP_failover`, this returns the service of the
+    endpoint currently preferred.
     """
-    return tap.TAPService(REGISTRY_BASEURL)
+    if _ROUTER is not None:
+        return _ROUTER.get_service()
+    return _get_pinned_RegTAP_service()
 
 
 def choose_RegTAP_service(access_url):
@@ -128,11 +252,306 @@ def choose_RegTAP_service(access_url):
         To find alternate endpoints, try ``regsearch(datamodel='regtap')``
         and look at ``.get_interface("tap").access_url`` of the results.
     """
-    global REGISTRY_BASEURL
-    get_RegTAP_service.cache_clear()
+    global REGISTRY_BASEURL, _ROUTER
+    if _ROUTER is not None:
+        _ROUTER.stop()
+        _ROUTER = None
+    _get_pinned_RegTAP_service.cache_clear()
+    _TABLES_CACHE.clear()
     REGISTRY_BASEURL = access_url
 
 
+def use_RegTAP_failover(access_urls=None, *, hedge_after=None,
+                        probe_interval=600., timeout=10.):
+    """
+    routes registry queries to the fastest of several RegTAP services.
+
+    The latencies of the services are measured in a background thread,
+    and queries go to the fastest service that works, failing over to the
+    other services on errors.  Use :py:func:`choose_RegTAP_service` to
+    go back to a single service.
+
+    Parameters
+    ----------
+    access_urls : sequence of str
+        the TAP access URLs of the RegTAP services to use.  This defaults
+        to the services in ``pyvo.registry.failover.KNOWN_REGTAP_SERVICES``,
+        with ``IVOA_REGISTRY`` (if set) first.
+    hedge_after : float
+        if given, queries that have not returned after this many seconds
+        are also sent to the next service, and the first result is used.
+    probe_interval : float
+        the time (in seconds) between latency measurements.  Pass None to
+        not probe in the background; the services are then tried in the
+        order given until you call the router's ``probe`` method.
+    timeout : float
+        the time (in seconds) after which a probe counts as failed.
+
+    Returns
+    -------
+    `~pyvo.registry.failover.RegTAPRouter`
+        the router now in use; its ``latencies`` attribute shows the
+        current measurements.
+    """
+    global _ROUTER
+    if access_urls is None:
+        access_urls = [REGISTRY_BASEURL] + [url
+            for url in failover.KNOWN_REGTAP_SERVICES
+            if url != REGISTRY_BASEURL]
+
+    router = failover.RegTAPRouter(
+        access_urls, hedge_after=hedge_after, timeout=timeout)
+    if _ROUTER is not None:
+        _ROUTER.stop()
+    _TABLES_CACHE.clear()
+    _ROUTER = router
+    if probe_interval is not None:
+        router.start(probe_interval)
+    return router
+
+
+def use_RegTAP_profile_cache(path, *, ttl=7 * 86400.):
+    """
+    keeps the feature profiles of RegTAP services in a file.
+
+    Registry constraints depend on the features of the RegTAP service
+    (see :py:func:`get_RegTAP_profile`).  With a profile cache, these
+    are only retrieved from the service once per ``ttl``, even across
+    sessions, which saves two requests before the first registry query
+    of a session.
+
+    Parameters
+    ----------
+    path : str
+        the SQLite file to keep the profiles in; pass None to stop
+        persisting profiles.
+    ttl : float
+        the time (in seconds) after which profiles are retrieved again;
+        this defaults to a week.
+    """
+    global _PROFILE_CACHE
+    _PROFILES.clear()
+    if path is None:
+        _PROFILE_CACHE = None
+    else:
+        _PROFILE_CACHE = profile.RegTAPProfileCache(path, ttl=ttl)
+
+
+def get_RegTAP_profile(service=None):
+    """
+    returns the `~pyvo.registry.profile.RegTAPProfile` of a RegTAP
+    service.
+
+    Profiles are computed once per service and session and, after
+    :py:func:`use_RegTAP_profile_cache`, taken from and saved to disk.
+
+    Parameters
+    ----------
+    service : `~pyvo.dal.TAPService`
+        the RegTAP service to profile; this defaults to the one
+        :py:func:`search` uses.
+    """
+    if service is None:
+        service = get_RegTAP_service()
+
+    cached = _PROFILES.get(service.baseurl)
+    if cached is None and _PROFILE_CACHE is not None:
+        cached = _PROFILE_CACHE.get(service.baseurl, service=service)
+
+    if cached is None:
+        cached = profile.RegTAPProfile.from_service(
+            service, cache=_PROFILE_CACHE)
+        if _PROFILE_CACHE is not None:
+            _PROFILE_CACHE.store(cached)
+
+    _PROFILES[service.baseurl] = cached
+    return cached
+
+
+def _run_on_registry(func):
+    """
+    returns func(service) for the RegTAP service, with failover if
+    use_RegTAP_failover is in effect.
+    """
+    if _ROUTER is not None:
+        return _ROUTER.run(func)
+    return func(get_RegTAP_service())
+
+
+def _query_ivoids(query, ivoids, service):
+    """
+    returns the result of one of the per-resource queries above for the
+    resources with ivoids on service, which may have overflowed.
+
+    The queries call the table constrained by ivoid t and have {join}
+    and {where} placeholders.  For a single ivoid, the query gets a
+    plain condition; otherwise, the ivoids are uploaded and joined
+    against.
+    """
+    with warnings.catch_warnings():
+        # overflows are dealt with by _run_for_ivoids
+        warnings.simplefilter("ignore", dalq.DALOverflowWarning)
+        if len(ivoids) == 1:
+            return service.run_sync(
+                query.format(join="", where="t.ivoid={}".format(
+                    rtcons.make_sql_literal(ivoids[0]))),
+                maxrec=_IVOIDS_MAXREC)
+
+        return service.run_sync(
+            query.format(
+                join="JOIN TAP_UPLOAD.ivoids AS u ON (t.ivoid=u.ivoid)",
+                where="1=1"),
+            uploads={"ivoids": table.Table([list(ivoids)], names=["ivoid"])},
+            maxrec=_IVOIDS_MAXREC)
+
+
+def _run_batched(run_batch, ivoids):
+    """
+    returns a list of the results of run_batch for batches of ivoids.
+
+    The ivoids are passed in batches of _IVOIDS_BATCH_SIZE.  The results
+    are complete: when one overflows, run_batch is called again for each
+    half of its batch.  If the result for a single ivoid overflows, a
+    DALServiceError is raised.
+    """
+    ivoids = list(ivoids)
+    pending = [ivoids[start:start + _IVOIDS_BATCH_SIZE]
+               for start in range(0, len(ivoids), _IVOIDS_BATCH_SIZE)]
+    results = []
+    while pending:
+        batch = pending.pop(0)
+        result = run_batch(batch)
+
+        if result.status[0].lower() != "overflow":
+            results.append(result)
+        elif len(batch) == 1:
+            raise dalq.DALServiceError(
+                f"The registry returned an incomplete result for {batch[0]}"
+                f" with MAXREC={_IVOIDS_MAXREC}.")
+        else:
+            half = len(batch) // 2
+            pending[:0] = [batch[:half], batch[half:]]
+    return results
+
+
+def _run_for_ivoids(query, ivoids):
+    """
+    returns a list of the rows of one of the per-resource queries above
+    for the resources with ivoids.
+
+    The ivoids are uploaded in batches as described for _run_batched,
+    so the rows are complete.
+    """
+    return [row
+            for result in _run_batched(
+                lambda batch: _run_on_registry(
+                    functools.partial(_query_ivoids, query, batch)),
+                ivoids)
+            for row in result]
+
+
+class _UploadedIvoids(rtcons.Constraint):
+    """
+    a constraint restricting ivoids to those in the uploaded table ivoids.
+    """
+    def get_search_condition(self, service):
+        return "ivoid IN (SELECT ivoid FROM TAP_UPLOAD.ivoids)"
+
+
+def _search_ivoids(ivoids):
+    """
+    returns a list of RegistryResults with the records of the resources
+    with ivoids.
+
+    As with _run_for_ivoids, the ivoids are uploaded in batches, and the
+    records are complete.
+    """
+    def run_batch(batch):
+        if len(batch) == 1:
+            constraint, uploads = rtcons.Ivoid(batch[0]), None
+        else:
+            constraint, uploads = _UploadedIvoids(), {
+                "ivoids": table.Table(
+                    [[ivoid.lower() for ivoid in batch]], names=["ivoid"])}
+
+        def run(service):
+            with warnings.catch_warnings():
+                # overflows are dealt with by _run_batched
+                warnings.simplefilter("ignore", dalq.DALOverflowWarning)
+                return RegistryQuery(
+                    service.baseurl,
+                    get_RegTAP_query(constraint, service=service),
+                    maxrec=_IVOIDS_MAXREC, uploads=uploads).execute()
+
+        return _run_on_registry(run)
+
+    return _run_batched(run_batch, ivoids)
+
+
+def _format_contact(row):
+    """
+    returns a human-readable contact from a _CONTACTS_QUERY row.
+    """
+    contact = row["role_name"]
+    if row["telephone"]:
+        contact += f" ({row['telephone']})"
+    if row["email"]:
+        contact += f" <{row['email']}>"
+    return contact
+
+
+def _get_contacts(ivoids):
+    """
+    returns a dict mapping each of ivoids to its contact information
+    as returned by RegistryResource.get_contact.
+    """
+    contacts = {ivoid: [] for ivoid in ivoids}
+    for row in _run_for_ivoids(_CONTACTS_QUERY, ivoids):
+        if row["ivoid"] in contacts:
+            contacts[row["ivoid"]].append(_format_contact(row))
+    return {ivoid: "\n".join(items) for ivoid, items in contacts.items()}
+
+
+def _get_alt_identifiers(ivoids):
+    """
+    returns a dict mapping each of ivoids to the list of its alternative
+    identifiers.
+    """
+    alt_identifiers = {ivoid: [] for ivoid in ivoids}
+    for row in _run_for_ivoids(_ALT_IDENTIFIERS_QUERY, ivoids):
+        if row["ivoid"] in alt_identifiers:
+            alt_identifiers[row["ivoid"]].append(row["alt_identifier"])
+    return alt_identifiers
+
+
+def _get_table_metadata(ivoids):
+    """
+    returns a dict mapping each of ivoids to a list of (table row,
+    column rows) pairs from RegTAP.
+
+    Metadata not yet in _TABLES_CACHE is fetched in as few queries as
+    the registry's limits allow.
+    """
+    found = {ivoid: _TABLES_CACHE.get(ivoid) for ivoid in set(ivoids)}
+    missing = sorted(ivoid for ivoid, tables in found.items()
+                     if tables is None)
+    rows = _run_for_ivoids(_TABLES_QUERY, missing) if missing else []
+
+    grouped = {ivoid: {} for ivoid in missing}
+    for row in rows:
+        table_key = row["table_index"]
+        table_row, columns = grouped[row["ivoid"]].setdefault(
+            table_key, (row, []))
+        if row["name"]:
+            columns.append(row)
+
+    for ivoid, tables in grouped.items():
+        found[ivoid] = [tables[table_key] for table_key in sorted(tables)]
+        _TABLES_CACHE[ivoid] = found[ivoid]
+
+    return {ivoid: found[ivoid] for ivoid in ivoids}
+
+
 def get_RegTAP_query(*constraints: rtcons.Constraint,
                      includeaux=False,
                      service=None,
@@ -148,6 +567,8 @@ def get_RegTAP_query(*constraints: rtcons.Constraint,
     # sensing into the API.
     if service is None:
         service = get_RegTAP_service()
+    if isinstance(service, tap.TAPService):
+        service = get_RegTAP_profile(service)
 
     constraints = list(constraints) + rtcons.keywords_to_constraints(kwargs)
 
@@ -242,15 +663,179 @@ def search(*constraints: rtcons.Constraint,
     --------
     RegistryResults
     """
-    service = get_RegTAP_service()
-    query = RegistryQuery(
-        service.baseurl,
-        get_RegTAP_query(*constraints,
-            includeaux=includeaux,
-            service=service,
-            **kwargs),
-        maxrec=maxrec)
-    return query.execute()
+    def run(service):
+        query = RegistryQuery(
+            service.baseurl,
+            get_RegTAP_query(*constraints,
+                includeaux=includeaux,
+                service=service,
+                **kwargs),
+            maxrec=maxrec)
+        return query.execute()
+
+    return _run_on_registry(run)
+
+
+class _IvoidRange(rtcons.Constraint):
+    """
+    a constraint restricting ivoids to the half-open range [lower, upper)
+    and to ivoids after ``after``; None-s mean "unbounded".
+    """
+    def __init__(self, lower=None, upper=None, after=None):
+        self.lower, self.upper, self.after = lower, upper, after
+
+    def get_search_condition(self, service):
+        conditions = ["1=1"]
+        if self.lower is not None:
+            conditions.append(
+                "ivoid>={}".format(rtcons.make_sql_literal(self.lower)))
+        if self.upper is not None:
+            conditions.append(
+                "ivoid<{}".format(rtcons.make_sql_literal(self.upper)))
+        if self.after is not None:
+            conditions.append(
+                "ivoid>{}".format(rtcons.make_sql_literal(self.after)))
+        return " AND ".join(conditions)
+
+
+# the maximal number of pages iter_search retrieves ahead per ivoid range
+# while the pages of an earlier range are consumed.
+_PAGES_AHEAD = 2
+
+# the characters ivoids are split on for concurrent paging.  Ivoids in
+# RegTAP are lowercase, and other characters fall into the outer ranges.
+_IVOID_PARTITION_CHARS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def _get_ivoid_ranges(count):
+    """
+    returns count (lower, upper) pairs partitioning the space of ivoids.
+    """
+    bounds = [None] + [
+        "ivo://" + _IVOID_PARTITION_CHARS[
+            index * len(_IVOID_PARTITION_CHARS) // count]
+        for index in range(1, count)] + [None]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _iter_pages(constraints, ivoid_range, page_size, includeaux, kwargs):
+    """
+    yields RegistryResults with up to page_size records in ivoid_range,
+    ordered by ivoid.
+    """
+    after = None
+    while True:
+        def run(service):
+            query = get_RegTAP_query(
+                *constraints, _IvoidRange(*ivoid_range, after=after),
+                includeaux=includeaux, service=service, **kwargs)
+            # build_regtap_query returns a query starting with a bare
+            # SELECT.  Requesting one more record than TOP lets us see
+            # overflows caused by server limits below page_size, which
+            # we deal with by just continuing with the next page.
+            query = "SELECT TOP {:d}{}\nORDER BY ivoid".format(
+                page_size, query[len("SELECT"):])
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", dalq.DALOverflowWarning)
+                return RegistryQuery(
+                    service.baseurl, query, maxrec=page_size + 1).execute()
+
+        page = _run_on_registry(run)
+        if len(page) == 0:
+            return
+        yield page
+
+        truncated = page.status[0].lower() == "overflow"
+        if len(page) < page_size and not truncated:
+            return
+        after = page.getrecord(len(page) - 1).ivoid
+
+
+def iter_search(*constraints: rtcons.Constraint,
+                page_size: int = 1000,
+                workers: int = 1,
+                includeaux: bool = False,
+                **kwargs):
+    """
+    execute a RegTAP query in pages.
+
+    This takes the same constraints as :py:func:`search` but, rather
+    than returning a single result set bounded by ``maxrec``, yields
+    `RegistryResults` of up to ``page_size`` records each, until all
+    matching records are retrieved.  Pages are ordered by ivoid and each
+    continues after the last ivoid of the one before, so the result is
+    complete and reproducible.
+
+    Parameters
+    ----------
+    *constraints : `~pyvo.registry.Constraint` instances
+        The constraints the returned records need to satisfy; see
+        :py:func:`search`.
+    page_size : int
+        the maximal number of records per page.
+    workers : int
+        the number of pages to retrieve concurrently.  With more than
+        one worker, the ivoids are split into ranges that are paged
+        through in parallel; the pages are still yielded in ivoid order.
+        Each worker only retrieves a few pages ahead of the consumer.
+    includeaux : bool
+        Flag for whether to include auxiliary capabilities in results.
+    **kwargs : strings, mostly
+        shorthands for ``constraints``, as for :py:func:`search`.
+
+    Yields
+    ------
+    `RegistryResults`
+        the records of one page.
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be positive")
+
+    if workers <= 1:
+        yield from _iter_pages(
+            constraints, (None, None), page_size, includeaux, kwargs)
+        return
+
+    stopped = threading.Event()
+
+    def put(pages, item):
+        # the queues are bounded, so wait for room unless the consumer
+        # has gone away.
+        while not stopped.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def fill(ivoid_range, pages):
+        try:
+            range_pages = _iter_pages(
+                constraints, ivoid_range, page_size, includeaux, kwargs)
+            while not stopped.is_set():
+                page = next(range_pages, None)
+                if page is None:
+                    break
+                put(pages, page)
+        except Exception as ex:
+            put(pages, ex)
+        finally:
+            put(pages, None)
+
+    queues = [(ivoid_range, queue.Queue(maxsize=_PAGES_AHEAD))
+              for ivoid_range in _get_ivoid_ranges(workers)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for ivoid_range, pages in queues:
+            pool.submit(fill, ivoid_range, pages)
+
+        try:
+            for _, pages in queues:
+                for page in iter(pages.get, None):
+                    if isinstance(page, Exception):
+                        raise page
+                    yield page
+        finally:
+            stopped.set()
 
 
 class RegistryQuery(tap.TAPQuery):
@@ -285,6 +870,9 @@ class RegistryResults(dalq.DALResults):
 
     """
 
+    # metadata retrieved by prefetch, as dicts keyed by ivoid
+    _prefetched = None
+
     def getrecord(self, index):
         """
         return all the attributes of a resource record with the given index
@@ -297,6 +885,29 @@ class RegistryResults(dalq.DALResults):
         """
         return RegistryResource(self, index)
 
+    def _get_column(self, name):
+        """
+        returns the values of the column name as a list, with bytes
+        decoded and NULLs as whatever the VOTable parser put in.
+        """
+        return [value.decode("ascii") if isinstance(value, bytes) else value
+                for value in self.resultstable.array.data[name]]
+
+    @functools.lru_cache(maxsize=None)
+    def _get_pseudo_arrays(self):
+        """
+        returns a dict mapping the names of the aggregate columns to
+        lists of the parsed pseudo-arrays for each record.
+        """
+        arrays = {
+            name: [RegistryResource._parse_pseudo_array(literal)
+                   for literal in self._get_column(name)]
+            for name in RegistryResource.pseudo_array_columns}
+        arrays["standard_ids"] = [
+            [regularize_SIA2_id(id) for id in ids]
+            for ids in arrays["standard_ids"]]
+        return arrays
+
     def get_summary(self):
         """
         returns a brief overview of the matched results as an astropy table.
@@ -304,12 +915,14 @@ class RegistryResults(dalq.DALResults):
         This is mainly intended for interactive use, where people would
         like to inspect the matches in, perhaps, notebooks.
         """
+        arrays = self._get_pseudo_arrays()
         return table.Table([
             list(range(len(self))),
-            [r.short_name for r in self],
-            [r.res_title for r in self],
-            [r.res_description for r in self],
-            [", ".join(sorted(r.access_modes())) for r in self]],
+            self._get_column("short_name"),
+            self._get_column("res_title"),
+            self._get_column("res_description"),
+            [", ".join(sorted(_get_access_modes(*modes)))
+                for modes in zip(arrays["standard_ids"], arrays["intf_types"])]],
             names=("index", "short_name", "title", "description", "interfaces"),
             descriptions=(
                 "Index to access the resource within self",
@@ -320,13 +933,14 @@ class RegistryResults(dalq.DALResults):
 
     @functools.lru_cache(maxsize=None)
     def _get_ivo_index(self):
-        return dict((r.ivoid, index)
-                    for index, r in enumerate(self))
+        return dict((ivoid, index)
+                    for index, ivoid in enumerate(self._get_column("ivoid")))
 
     @functools.lru_cache(maxsize=None)
     def _get_short_name_index(self):
-        return dict((r.short_name, index)
-                    for index, r in enumerate(self))
+        return dict((short_name, index)
+                    for index, short_name
+                    in enumerate(self._get_column("short_name")))
 
     def __getitem__(self, item):
         """
@@ -347,6 +961,52 @@ class RegistryResults(dalq.DALResults):
         else:
             raise IndexError(f"No resource matching {item}")
 
+    def get_tables(self):
+        """
+        returns the structure of the tables of all resources in self.
+
+        This returns a dict mapping the ivoids of the resources to what
+        `RegistryResource.get_tables` returns for them.  The table
+        metadata for all resources is retrieved in a single query.
+        """
+        _get_table_metadata(self._get_column("ivoid"))
+        return {r.ivoid: r.get_tables() for r in self}
+
+    def prefetch(self, *, contacts=True, alt_identifiers=True,
+                 tables=False):
+        """
+        retrieves additional metadata for all resources in self.
+
+        For each kind of metadata requested, this runs one registry
+        query for all resources.  Afterwards, the corresponding methods
+        of the records (`RegistryResource.get_contact`,
+        `RegistryResource.get_alt_identifiers`, and hence
+        ``describe(verbose=True)``, and `RegistryResource.get_tables`) no
+        longer query the registry.
+
+        Parameters
+        ----------
+        contacts : bool
+            fetch the contact information.
+        alt_identifiers : bool
+            fetch the alternative identifiers (e.g., DOIs).
+        tables : bool
+            fetch the table metadata.
+        """
+        ivoids = self._get_column("ivoid")
+        if not ivoids:
+            return
+
+        if self._prefetched is None:
+            self._prefetched = {}
+        if contacts:
+            self._prefetched["contacts"] = _get_contacts(ivoids)
+        if alt_identifiers:
+            self._prefetched["alt_identifiers"] = _get_alt_identifiers(
+                ivoids)
+        if tables:
+            _get_table_metadata(ivoids)
+
 
 class _BrowserService:
     """A pseudo-service class just opening a web browser for browser-based
@@ -517,29 +1177,41 @@ class RegistryResource(dalq.Record):
         (f"\n  ivo_string_agg(COALESCE(cap_description, ''), '{TOKEN_SEP}')",
             "cap_descriptions")]
 
+    # the ivo_string_agg-ed columns from expected_columns, in the order
+    # of Interface's constructor arguments.
+    pseudo_array_columns = ("access_urls", "standard_ids", "intf_types",
+                            "intf_roles", "cap_descriptions")
+
+    _interfaces = None
+
     def __init__(self, results, index, *, session=None):
         dalq.Record.__init__(self, results, index, session=session)
 
-        self._mapping["access_urls"
-                      ] = self._parse_pseudo_array(self._mapping["access_urls"])
-        self._mapping["standard_ids"] = [
-            regularize_SIA2_id(id) for id in
-            self._parse_pseudo_array(self._mapping["standard_ids"])]
-        self._mapping["intf_types"
-                      ] = self._parse_pseudo_array(self._mapping["intf_types"])
-        self._mapping["intf_roles"
-                      ] = self._parse_pseudo_array(self._mapping["intf_roles"])
-        self._mapping["cap_descriptions"
-                      ] = self._parse_pseudo_array(self._mapping["cap_descriptions"])
-
-        self.interfaces = [Interface(props[0], standard_id=props[1], intf_type=props[2],
-                                     intf_role=props[3], capability_description=props[4])
-                           for props in itertools.zip_longest(
-            self["access_urls"],
-            self["standard_ids"],
-            self["intf_types"],
-            self["intf_roles"],
-            self["cap_descriptions"])]
+        if isinstance(results, RegistryResults):
+            # parsed once for the whole result set
+            arrays = results._get_pseudo_arrays()
+            for name in self.pseudo_array_columns:
+                self._mapping[name] = arrays[name][index]
+
+        else:
+            for name in self.pseudo_array_columns:
+                self._mapping[name] = self._parse_pseudo_array(
+                    self._mapping[name])
+            self._mapping["standard_ids"] = [
+                regularize_SIA2_id(id) for id in self._mapping["standard_ids"]]
+
+    @property
+    def interfaces(self):
+        """
+        a list of the `Interface`-s of this resource.
+        """
+        if self._interfaces is None:
+            self._interfaces = [
+                Interface(props[0], standard_id=props[1], intf_type=props[2],
+                          intf_role=props[3], capability_description=props[4])
+                for props in itertools.zip_longest(
+                    *(self[name] for name in self.pseudo_array_columns))]
+        return self._interfaces
 
     @staticmethod
     def _parse_pseudo_array(literal):
@@ -728,16 +1400,14 @@ class RegistryResource(dalq.Record):
 
         This will ignore VOSI (infrastructure) services.
         """
-        return set(shorten_stdid(intf.standard_id) or "web"
-                   for intf in self.interfaces
-                   if (intf.standard_id or intf.type == "vr:webbrowser")
-                   and not intf.is_vosi)
+        return _get_access_modes(self["standard_ids"], self["intf_types"])
 
     def get_interface(self, *,
                       service_type: str,
                       lax: bool = False,
                       std_only: bool = False,
-                      keyword: str = None):
+                      keyword: str = None,
+                      prober: object = None):
         """returns a regtap.Interface class for service_type.
 
         The meaning of the parameters is as for get_service.  This
@@ -770,6 +1440,10 @@ class RegistryResource(dalq.Record):
             want when you want to construct pyVO service objects later.
             This parameter is ignored for the "web" service type.
 
+        prober : `~pyvo.registry.InterfaceProber`
+            If given and there are multiple matching interfaces, return
+            the fastest healthy one rather than the first one.
+
 
         Returns
         -------
@@ -807,12 +1481,15 @@ class RegistryResource(dalq.Record):
                              " You might also want to see all the available services"
                              " with `pyvo.registry.regtap.RegistryResource.list_interfaces()`.")
 
+        if prober is not None and len(candidates) > 1:
+            candidates = prober.rank(candidates)
         return candidates[0]
 
     def get_service(self, service_type: str = None, *,
                     lax: bool = False,
                     keyword: str = None,
-                    session: object = None):
+                    session: object = None,
+                    prober: object = None):
         """
         return an appropriate DALService subclass for this resource that
         can be used to search the resource using service_type.
@@ -861,6 +1538,10 @@ class RegistryResource(dalq.Record):
             optional requests session to use to communicate with the service
             constructed.
 
+        prober : `~pyvo.registry.InterfaceProber`
+            If given and there are multiple matching interfaces (which
+            requires lax=True), use the fastest healthy one.
+
         Returns
         -------
         `pyvo.dal.DALService`
@@ -875,7 +1556,8 @@ class RegistryResource(dalq.Record):
         list_interfaces : return a list with all the available services.
         """
         return self.get_interface(service_type=service_type, lax=lax, std_only=True,
-                                  keyword=keyword).to_service(session=session)
+                                  keyword=keyword, prober=prober
+                                  ).to_service(session=session)
 
     @property
     def service(self):
@@ -1043,35 +1725,28 @@ class RegistryResource(dalq.Record):
 
         Use this to report bugs or unexpected downtime.
         """
-        res = get_RegTAP_service().run_sync("""
-            SELECT role_name, email, telephone
-            FROM rr.res_role
-            WHERE
-                base_role='contact'
-                AND ivoid={}""".format(
-            rtcons.make_sql_literal(self.ivoid)))
-
-        contacts = []
-        for row in res:
-            contact = row["role_name"]
-            if row["telephone"]:
-                contact += f" ({row['telephone']})"
-            if row["email"]:
-                contact += f" <{row['email']}>"
-            contacts.append(contact)
-
-        return "\n".join(contacts)
+        contact = self._get_prefetched("contacts")
+        if contact is None:
+            contact = _get_contacts([self.ivoid])[self.ivoid]
+        return contact
 
     def get_alt_identifiers(self):
         """return a sequence of non-ivoid identifiers for the resource.
 
         This is typically used to provide a DOI for the resource.
         """
-        res = get_RegTAP_service().run_sync("""
-            SELECT alt_identifier
-            FROM rr.alt_identifier
-            WHERE ivoid={}""".format(rtcons.make_sql_literal(self.ivoid)))
-        return [r["alt_identifier"] for r in res]
+        alt_identifiers = self._get_prefetched("alt_identifiers")
+        if alt_identifiers is None:
+            alt_identifiers = _get_alt_identifiers([self.ivoid])[self.ivoid]
+        return alt_identifiers
+
+    def _get_prefetched(self, kind):
+        """
+        returns the metadata of kind for this resource retrieved by
+        RegistryResults.prefetch, or None if there is none.
+        """
+        prefetched = getattr(self._results, "_prefetched", None) or {}
+        return prefetched.get(kind, {}).get(self.ivoid)
 
     def _build_vosi_column(self, column_row):
         """
@@ -1110,7 +1785,7 @@ class RegistryResource(dalq.Record):
 
         return res
 
-    def get_tables(self, *, table_limit=20):
+    def get_tables(self, *, table_limit=None):
         """
         return the structure of the tables underlying the service.
 
@@ -1125,35 +1800,27 @@ class RegistryResource(dalq.Record):
 
         Also note that resources do not need to define tables at all.
         You will receive an empty dictionary if they don't.
-        """
-        svc = get_RegTAP_service()
 
-        tables = svc.run_sync(
-            """SELECT table_name, table_description, table_index, table_title,
-                table_utype
-            FROM rr.res_table
-            WHERE ivoid={}""".format(
-                rtcons.make_sql_literal(self.ivoid)))
-        if len(tables) > table_limit:
+        Tables and columns are retrieved in a single query, and the
+        result is cached until the RegTAP service is changed.  To fetch the tables of many
+        resources at once, use `RegistryResults.get_tables`.
+
+        Parameters
+        ----------
+        table_limit : int
+            if given, raise a DALQueryError if the resource has more
+            tables than this.
+        """
+        tables = _get_table_metadata([self.ivoid])[self.ivoid]
+        if table_limit is not None and len(tables) > table_limit:
             raise dalq.DALQueryError(f"Resource {self.ivoid} reports"
                                      f" {len(tables)} tables.  Pass a higher table_limit"
                                      " to see them all.")
 
-        res = {}
-        for table_row in tables:
-            columns = svc.run_sync(
-                """
-                SELECT name, ucd, unit, utype, datatype, arraysize,
-                    extended_type, column_description
-                FROM rr.table_column
-                WHERE ivoid={}
-                    AND table_index={}""".format(
-                    rtcons.make_sql_literal(self.ivoid),
-                    rtcons.make_sql_literal(table_row["table_index"])))
-            res[table_row["table_name"]] = self._build_vosi_table(
-                table_row, columns)
-
-        return res
+        return dict(
+            (table_row["table_name"],
+                self._build_vosi_table(table_row, columns))
+            for table_row, columns in tables)
 
 
 @deprecated("1.5", "ivoid2service does not work in the presence of"
@@ -0,0 +1,207 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+Resolution of many IVOA identifiers to services at once.
+
+`resolve_services` looks up the identifiers in as few RegTAP queries as
+the registry's limits allow; an optional `InterfaceCache` keeps the interfaces found on disk so that
+later resolutions of the same identifiers do not need the Registry at
+all.
+"""
+import os
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+
+from . import regtap
+
+__all__ = ["InterfaceCache", "resolve_services"]
+
+# the maximal number of ivoids looked up in one statement by
+# InterfaceCache.get_many; old SQLite versions allow at most 999
+# parameters per statement.
+_GET_BATCH_SIZE = 900
+
+
+class InterfaceCache:
+    """
+    an on-disk cache of the interfaces `resolve_services` found for
+    pairs of ivoid and service type.
+
+    Entries older than ``ttl`` seconds are ignored and eventually
+    removed.  The cache is an SQLite database and can be shared between
+    processes.
+    """
+
+    def __init__(self, path, *, ttl=86400.):
+        """
+        open (and, if necessary, create) an interface cache.
+
+        Parameters
+        ----------
+        path : str
+            the file the cache is kept in.
+        ttl : float
+            the time (in seconds) after which entries are considered
+            stale; this defaults to a day.
+        """
+        self._path = os.path.expanduser(path)
+        self.ttl = ttl
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS interfaces ("
+                " ivoid TEXT,"
+                " service_type TEXT,"
+                " access_url TEXT,"
+                " standard_id TEXT,"
+                " intf_type TEXT,"
+                " intf_role TEXT,"
+                " cap_description TEXT,"
+                " stored REAL,"
+                " PRIMARY KEY (ivoid, service_type))")
+
+    @property
+    def path(self):
+        """
+        the file the cache is kept in
+        """
+        return self._path
+
+    @contextmanager
+    def _connect(self):
+        """
+        yields a database connection, committing and closing it on exit.
+        """
+        with closing(sqlite3.connect(self._path, timeout=30)) as conn:
+            with conn:
+                yield conn
+
+    def get(self, ivoid, service_type):
+        """
+        returns the cached `~pyvo.registry.regtap.Interface` for ivoid and
+        service_type, or None if there is no fresh entry.
+        """
+        return self.get_many([ivoid], service_type).get(ivoid.lower())
+
+    def get_many(self, ivoids, service_type):
+        """
+        returns a dict mapping the (lowercased) ivoids with fresh entries
+        for service_type to their cached interfaces.
+        """
+        ivoids = sorted({ivoid.lower() for ivoid in ivoids})
+        oldest = time.time() - self.ttl
+        rows = []
+        with self._connect() as conn:
+            for start in range(0, len(ivoids), _GET_BATCH_SIZE):
+                batch = ivoids[start:start + _GET_BATCH_SIZE]
+                rows.extend(conn.execute(
+                    "SELECT ivoid, access_url, standard_id, intf_type,"
+                    " intf_role, cap_description FROM interfaces"
+                    " WHERE ivoid IN ({}) AND service_type=? AND stored>=?"
+                    .format(", ".join("?" * len(batch))),
+                    (*batch, service_type, oldest)))
+
+        return {row[0]: regtap.Interface(
+                row[1], standard_id=row[2], intf_type=row[3],
+                intf_role=row[4], capability_description=row[5])
+                for row in rows}
+
+    def store(self, ivoid, service_type, interface):
+        """
+        stores interface as the interface for ivoid and service_type.
+        """
+        self.store_many(service_type, [(ivoid, interface)])
+
+    def store_many(self, service_type, items):
+        """
+        stores the interfaces for service_type from a sequence of
+        (ivoid, interface) pairs in one transaction.
+        """
+        stored = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO interfaces VALUES"
+                " (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((ivoid.lower(), service_type, interface.access_url,
+                  interface.standard_id, interface.type, interface.role,
+                  interface.capability_description, stored)
+                 for ivoid, interface in items))
+
+    def collect_garbage(self):
+        """
+        removes all stale entries.
+        """
+        with self._connect() as conn:
+            conn.execute("DELETE FROM interfaces WHERE stored<?",
+                         (time.time() - self.ttl,))
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM interfaces WHERE stored>=?",
+                (time.time() - self.ttl,)).fetchone()[0]
+
+
+def resolve_services(ivoids, *, service_type, lax=True, cache=None,
+                     session=None):
+    """
+    returns service objects for many IVOA identifiers at once.
+
+    All identifiers not in cache are looked up in as few registry
+    queries as the registry's limits allow.
+
+    Parameters
+    ----------
+    ivoids : sequence of str
+        the IVOA identifiers of the resources to resolve.
+    service_type : str
+        the kind of service wanted, as for
+        `~pyvo.registry.RegistryResource.get_service`.
+    lax : bool
+        if a resource has multiple interfaces of service_type, use the
+        first one.  Pass lax=False to consider such resources unresolved
+        instead.
+    cache : `~pyvo.registry.InterfaceCache`
+        an optional cache to take interfaces from and add interfaces to.
+    session : object
+        optional session to use for the services' network requests.
+
+    Returns
+    -------
+    tuple of a dict and a list
+        the dict maps the resolved ivoids (as passed in) to their service
+        objects; the list contains the ivoids that are not in the
+        registry or have no (unique, if not lax) interface of service_type.
+    """
+    services, unresolved, missing, found = {}, [], [], []
+    cached = {}
+    if cache is not None:
+        cached = cache.get_many(ivoids, service_type)
+
+    for ivoid in ivoids:
+        interface = cached.get(ivoid.lower())
+        if interface is not None:
+            services[ivoid] = interface.to_service(session=session)
+        else:
+            missing.append(ivoid)
+
+    if missing:
+        resources = {
+            resource.ivoid.lower(): resource
+            for result in regtap._search_ivoids(
+                sorted({ivoid.lower() for ivoid in missing}))
+            for resource in result}
+
+        for ivoid in missing:
+            try:
+                interface = resources[ivoid.lower()].get_interface(
+                    service_type=service_type, lax=lax, std_only=True)
+                services[ivoid] = interface.to_service(session=session)
+            except (KeyError, ValueError):
+                unresolved.append(ivoid)
+            else:
+                found.append((ivoid, interface))
+
+    if cache is not None and found:
+        cache.store_many(service_type, found)
+
+    return services, unresolved
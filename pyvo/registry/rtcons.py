@@ -21,7 +21,6 @@ import numpy
 
 from ..dal import query as dalq
 from ..utils import vocabularies
-from .import regtap
 
 
 # Classes from this module are exposed at the higher level namespace, not listing them here
@@ -1043,6 +1042,9 @@ def build_regtap_query(constraints, service):
     joined_tables = ["rr.resource", "rr.capability", "rr.interface"
                      ] + list(sorted(extra_tables))
 
+    # regtap imports this module, so it cannot be imported at the top
+    from . import regtap
+
     # see comment in regtap.RegistryResource for the following
     # oddity
     select_clause, plain_columns = [], []
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+Tests for pyvo.registry.failover
+"""
+import math
+import threading
+from contextlib import ExitStack
+from functools import partial
+
+import pytest
+
+from pyvo.dal import query as dalq
+from pyvo.registry import regtap, rtcons
+from pyvo.registry.failover import RegTAPRouter
+
+from astropy.utils.data import get_pkg_data_contents
+
+get_pkg_data_contents = partial(
+    get_pkg_data_contents, package=__package__, encoding='binary')
+
+FAST, SLOW, BROKEN = (
+    "http://fast.example.com/tap", "http://slow.example.com/tap",
+    "http://broken.example.com/tap")
+
+
+@pytest.fixture(name='endpoints')
+def _endpoints(mocker):
+    """mocks a working and a broken RegTAP service at FAST and BROKEN;
+    yields the list of access URLs queries were sent to.
+    """
+    queried = []
+
+    def sync_callback(request, context):
+        queried.append(request.url.rsplit("/", 1)[0])
+        if request.url.startswith(BROKEN):
+            context.status_code = 500
+            return b"Internal error"
+        return get_pkg_data_contents('data/regtap.xml')
+
+    with ExitStack() as stack:
+        for url in [FAST, BROKEN]:
+            stack.enter_context(mocker.register_uri(
+                'GET', url + '/capabilities',
+                content=get_pkg_data_contents('data/capabilities.xml'),
+                status_code=500 if url == BROKEN else 200))
+            stack.enter_context(mocker.register_uri(
+                'POST', url + '/sync', content=sync_callback))
+        # the VOSI fallback location for BROKEN's capabilities
+        stack.enter_context(mocker.register_uri(
+            'GET', "http://broken.example.com/capabilities",
+            status_code=500))
+        yield queried
+
+
+@pytest.fixture
+def failover():
+    previous_url = regtap.REGISTRY_BASEURL
+    yield regtap.use_RegTAP_failover
+    regtap.choose_RegTAP_service(previous_url)
+
+
+class TestRouter:
+    def test_unprobed_order(self):
+        router = RegTAPRouter([SLOW, FAST])
+        assert router.access_urls == [SLOW, FAST]
+        assert router.get_service().baseurl == SLOW
+
+    def test_probe(self, endpoints):
+        router = RegTAPRouter([BROKEN, FAST])
+        latencies = router.probe()
+        assert math.isinf(latencies[BROKEN])
+        assert latencies[FAST] < 10
+        assert router.access_urls == [FAST, BROKEN]
+
+    def test_ranking(self):
+        router = RegTAPRouter([BROKEN, SLOW, FAST])
+        router._record(SLOW, 2)
+        router._record(FAST, 0.5)
+        assert router.access_urls == [FAST, SLOW, BROKEN]
+
+        router._record(FAST, 6)
+        assert router.latencies[FAST] == pytest.approx(2.15)
+        assert router.access_urls == [SLOW, FAST, BROKEN]
+
+    def test_background_probing(self, endpoints):
+        router = RegTAPRouter([BROKEN, FAST])
+        router.start(probe_interval=3600)
+        router.stop()
+        assert router.access_urls == [FAST, BROKEN]
+
+    def test_failover(self):
+        router = RegTAPRouter([BROKEN, FAST])
+
+        def func(service):
+            if service.baseurl == BROKEN:
+                raise dalq.DALServiceError("down", url=BROKEN)
+            return service.baseurl
+
+        assert router.run(func) == FAST
+        assert math.isinf(router.latencies[BROKEN])
+        assert router.access_urls == [FAST, BROKEN]
+
+    def test_feature_missing_fails_over(self):
+        router = RegTAPRouter([SLOW, FAST])
+
+        def func(service):
+            if service.baseurl == SLOW:
+                raise rtcons.RegTAPFeatureMissing("no MOCs")
+            return service.baseurl
+
+        assert router.run(func) == FAST
+        # the endpoint is not failing; it just cannot run this query
+        assert router.latencies[SLOW] is None
+        assert router.access_urls == [SLOW, FAST]
+
+    def test_query_error_propagates(self):
+        router = RegTAPRouter([SLOW, FAST])
+        calls = []
+
+        def func(service):
+            calls.append(service.baseurl)
+            raise dalq.DALQueryError("bad ADQL")
+
+        with pytest.raises(dalq.DALQueryError):
+            router.run(func)
+        assert calls == [SLOW]
+
+    def test_all_failing(self):
+        router = RegTAPRouter([SLOW, BROKEN])
+
+        def func(service):
+            raise dalq.DALServiceError("down", url=service.baseurl)
+
+        with pytest.raises(dalq.DALServiceError):
+            router.run(func)
+        assert all(math.isinf(v) for v in router.latencies.values())
+
+
+class TestHedging:
+    def test_hedged_query(self):
+        router = RegTAPRouter([SLOW, FAST], hedge_after=0.01)
+        release = threading.Event()
+
+        def func(service):
+            if service.baseurl == SLOW:
+                release.wait(5)
+            return service.baseurl
+
+        try:
+            assert router.run(func) == FAST
+        finally:
+            release.set()
+
+    def test_no_hedge_for_fast_answers(self):
+        router = RegTAPRouter([SLOW, FAST], hedge_after=5)
+        calls = []
+
+        def func(service):
+            calls.append(service.baseurl)
+            return service.baseurl
+
+        assert router.run(func) == SLOW
+        assert calls == [SLOW]
+
+    def test_hedged_failover(self):
+        router = RegTAPRouter([BROKEN, FAST], hedge_after=5)
+
+        def func(service):
+            if service.baseurl == BROKEN:
+                raise dalq.DALServiceError("down", url=BROKEN)
+            return service.baseurl
+
+        assert router.run(func) == FAST
+
+
+class TestSearch:
+    def test_search_fails_over(self, endpoints, failover):
+        router = failover([BROKEN, FAST], probe_interval=None)
+        res = regtap.search(keywords="pulsar")
+        assert len(res) > 0
+        # BROKEN already failed when its capabilities were inspected
+        assert endpoints == [FAST]
+        assert math.isinf(router.latencies[BROKEN])
+        assert regtap.get_RegTAP_service() is router.get_service()
+        assert regtap.get_RegTAP_service().baseurl == FAST
+
+    def test_default_endpoints(self, failover):
+        router = failover(probe_interval=None)
+        assert router.access_urls[0] == regtap.REGISTRY_BASEURL
+        assert len(set(router.access_urls)) == len(router.access_urls)
+
+    def test_choose_disables(self, failover):
+        failover([FAST], probe_interval=None)
+        regtap.choose_RegTAP_service(SLOW)
+        assert regtap._ROUTER is None
+        assert regtap.get_RegTAP_service().baseurl == SLOW
@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+Tests for pyvo.registry.mirror
+"""
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from pyvo.dal import query as dalq
+from pyvo.registry import RegTAPMirror, rtcons
+from pyvo.registry.mirror import _to_sqlite_dialect
+
+from .commonfixtures import messenger_vocabulary  # noqa: F401
+
+
+_SCHEMA = {
+    "resource": ["ivoid", "res_type", "short_name", "res_title",
+                 "content_level", "res_description", "reference_url",
+                 "creator_seq", "created", "updated", "rights",
+                 "content_type", "source_format", "source_value",
+                 "region_of_regard", "waveband"],
+    "capability": ["ivoid", "cap_index", "cap_type", "cap_description",
+                   "standard_id"],
+    "interface": ["ivoid", "cap_index", "intf_index", "intf_type",
+                  "intf_role", "access_url"],
+    "res_subject": ["ivoid", "res_subject"],
+    "res_detail": ["ivoid", "cap_index", "detail_xpath", "detail_value"],
+}
+
+
+def _resource(ivoid, title, updated, waveband="optical"):
+    return ("resource", (
+        ivoid, "vs:catalogservice", ivoid.split("/")[-1], title, "research",
+        f"The {title} description", None, "Doe, J.", "2020-01-01T00:00:00",
+        updated, None, "catalog", None, None, None, waveband))
+
+
+def _tap_service(ivoid, url):
+    return [
+        ("capability", (ivoid, 1, "vs:tableaccess", "TAP access",
+                        "ivo://ivoa.net/std/tap")),
+        ("interface", (ivoid, 1, 1, "vs:paramhttp", "std", url))]
+
+
+class _FakeRegTAP:
+    """a RegTAP service answering queries from an SQLite file.
+    """
+    hardlimit = None
+
+    def __init__(self, path):
+        self.path = path
+        self.queries = []
+        with closing(sqlite3.connect(path)) as conn:
+            with conn:
+                for name, columns in _SCHEMA.items():
+                    conn.execute("CREATE TABLE {} ({})".format(
+                        name, ", ".join(columns)))
+
+    @property
+    def tables(self):
+        return {"rr." + name for name in _SCHEMA}
+
+    def add(self, *rows):
+        with closing(sqlite3.connect(self.path)) as conn:
+            with conn:
+                for table, row in rows:
+                    conn.execute("INSERT INTO {} VALUES ({})".format(
+                        table, ", ".join("?" * len(row))), row)
+
+    def remove(self, ivoid):
+        with closing(sqlite3.connect(self.path)) as conn:
+            with conn:
+                for table in _SCHEMA:
+                    conn.execute(
+                        f"DELETE FROM {table} WHERE ivoid=?", (ivoid,))
+
+    def run_sync(self, query, maxrec=None):
+        self.queries.append(query)
+        limits = [limit for limit in (maxrec, self.hardlimit)
+                  if limit is not None]
+        limit = min(limits) if limits else None
+        table = RegTAPMirror(self.path).run_query(
+            query, maxrec=None if limit is None else limit + 1)
+        overflow = limit is not None and len(table) > limit
+
+        class _Result:
+            status = ("OVERFLOW" if overflow else "OK", "")
+
+            def to_table(self):
+                return table[:limit]
+        return _Result()
+
+
+@pytest.fixture
+def remote(tmp_path):
+    remote = _FakeRegTAP(str(tmp_path / "remote.sqlite"))
+    remote.add(
+        _resource("ivo://test/cat", "Pulsar catalog", "2024-01-01T00:00:00",
+                  "radio"),
+        ("res_subject", ("ivo://test/cat", "Pulsars")),
+        _resource("ivo://test/tap", "Optical archive", "2024-02-01T00:00:00"),
+        *_tap_service("ivo://test/tap", "http://example.com/tap"),
+        ("res_detail", ("ivo://test/tap", 1, "/capability/dataModel/@ivo-id",
+                        "ivo://ivoa.net/std/RegTAP#1.1")))
+    return remote
+
+
+@pytest.fixture
+def mirror(tmp_path, remote):
+    mirror = RegTAPMirror(str(tmp_path / "mirror.sqlite"))
+    mirror.refresh(remote)
+    return mirror
+
+
+class TestHarvest:
+    def test_full_harvest(self, tmp_path, remote):
+        mirror = RegTAPMirror(str(tmp_path / "mirror.sqlite"))
+        assert mirror.last_updated is None
+
+        assert mirror.refresh(remote) == 2
+        assert mirror.last_updated == "2024-02-01T00:00:00"
+        # tables the service does not have are skipped
+        assert not any("res_role" in query for query in remote.queries)
+
+    def test_incremental_harvest(self, mirror, remote):
+        remote.add(
+            _resource("ivo://test/new", "New archive", "2024-03-01T00:00:00"),
+            *_tap_service("ivo://test/new", "http://example.com/new"))
+        remote.remove("ivo://test/cat")
+        remote.queries.clear()
+
+        assert mirror.refresh(remote) == 2
+        assert "updated>='2024-02-01T00:00:00'" in remote.queries[0]
+        assert mirror.last_updated == "2024-03-01T00:00:00"
+
+        ivoids = {r.ivoid for r in mirror.search(servicetype="tap")}
+        assert ivoids == {"ivo://test/tap", "ivo://test/new"}
+        assert len(mirror.search(keywords="pulsar")) == 0
+        # the re-harvested record is not duplicated
+        assert len(mirror.search(ivoid="ivo://test/tap")[0]["access_urls"]) == 1
+
+    def test_paged_harvest(self, tmp_path, remote):
+        remote.hardlimit = 1
+        remote.add(("res_subject", ("ivo://test/tap", "Archives")))
+        mirror = RegTAPMirror(str(tmp_path / "mirror.sqlite"))
+
+        assert mirror.refresh(remote, page_size=2) == 2
+        assert len(mirror.search(keywords="pulsar")) == 1
+        assert len(mirror.search(servicetype="tap")) == 1
+        assert len(mirror.run_query("SELECT * FROM rr.res_subject")) == 2
+
+    def test_paged_incremental_harvest(self, mirror, remote):
+        # with one resource per page, the remote ivoids come in pages,
+        # and none of the mirrored records must be dropped for that
+        remote.add(
+            _resource("ivo://test/new", "New archive", "2024-03-01T00:00:00"))
+        assert mirror.refresh(remote, page_size=1) == 2
+        assert set(mirror.run_query("SELECT ivoid FROM rr.resource")["ivoid"]) == {
+            "ivo://test/cat", "ivo://test/tap", "ivo://test/new"}
+
+    def test_page_too_small(self, tmp_path, remote):
+        remote.add(("res_subject", ("ivo://test/cat", "Neutron stars")))
+        mirror = RegTAPMirror(str(tmp_path / "mirror.sqlite"))
+
+        with pytest.raises(dalq.DALServiceError, match="ivo://test/cat"):
+            mirror.refresh(remote, page_size=1)
+        assert mirror.last_updated is None
+
+
+class TestSearch:
+    def test_servicetype(self, mirror):
+        res = mirror.search(servicetype="tap")
+        assert len(res) == 1
+        rec = res[0]
+        assert rec.ivoid == "ivo://test/tap"
+        assert rec["access_urls"] == ["http://example.com/tap"]
+        assert rec.standard_id == "ivo://ivoa.net/std/tap"
+        assert rec.get_service("tap").baseurl == "http://example.com/tap"
+
+    def test_keywords(self, mirror):
+        assert [r.ivoid for r in mirror.search(keywords="pulsars")] == [
+            "ivo://test/cat"]
+        assert [r.ivoid for r in mirror.search("archive")] == [
+            "ivo://test/tap"]
+
+    @pytest.mark.usefixtures('messenger_vocabulary')
+    def test_waveband(self, mirror):
+        assert [r.ivoid for r in mirror.search(waveband="radio")] == [
+            "ivo://test/cat"]
+
+    def test_datamodel(self, mirror):
+        assert [r.ivoid for r in mirror.search(datamodel="regtap")] == [
+            "ivo://test/tap"]
+
+    def test_maxrec(self, mirror):
+        assert len(mirror.search(keywords="description")) == 2
+        assert len(mirror.search(keywords="description", maxrec=1)) == 1
+
+    def test_missing_table(self, mirror):
+        with pytest.raises(rtcons.RegTAPFeatureMissing):
+            mirror.search(temporal=(50000, 60000))
+        with pytest.raises(rtcons.RegTAPFeatureMissing):
+            mirror.search(rtcons.Author("Doe%"))
+
+    def test_spatial_unsupported(self, mirror):
+        with pytest.raises(rtcons.RegTAPFeatureMissing):
+            mirror.search(spatial=(10, 20))
+
+
+def test_sqlite_dialect():
+    assert (_to_sqlite_dialect("a ILIKE 'b ILIKE c' OR d ilike 'e'")
+            == "a LIKE 'b ILIKE c' OR d LIKE 'e'")
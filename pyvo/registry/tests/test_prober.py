@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+Tests for pyvo.registry.prober
+"""
+import io
+import time
+from contextlib import ExitStack
+
+import pytest
+import requests
+
+from pyvo.registry import InterfaceProber
+from pyvo.registry.regtap import Interface
+
+
+def _tap(access_url):
+    return Interface(access_url, standard_id="ivo://ivoa.net/std/tap",
+                     intf_type="vs:paramhttp", intf_role="std")
+
+
+@pytest.fixture(name='probed')
+def _probed(mocker):
+    """mocks a slow, a fast, and a broken TAP service and an SSA service;
+    yields the list of URLs requested.
+    """
+    requested = []
+
+    def respond(delay, status_code=200):
+        def callback(request, context):
+            requested.append(request.url)
+            time.sleep(delay)
+            context.status_code = status_code
+            return b""
+        return callback
+
+    with ExitStack() as stack:
+        for url, callback in [
+                ("http://slow/tap/capabilities", respond(0.2)),
+                ("http://fast/tap/capabilities", respond(0)),
+                ("http://broken/tap/capabilities", respond(0, 500)),
+                ("http://ssa/ssa", respond(0))]:
+            stack.enter_context(
+                mocker.register_uri('GET', url, content=callback))
+        yield requested
+
+
+class TestProber:
+    def test_probe(self, probed):
+        prober = InterfaceProber()
+        results = prober.probe([
+            _tap("http://slow/tap"), _tap("http://broken/tap"),
+            Interface("http://ssa/ssa", standard_id="ivo://ivoa.net/std/ssa",
+                      intf_role="std")])
+
+        assert results["http://slow/tap"].latency >= 0.2
+        assert results["http://slow/tap"].healthy
+        assert not results["http://broken/tap"].healthy
+        assert results["http://broken/tap"].latency is None
+        assert ("http://ssa/ssa?REQUEST=queryData&FORMAT=METADATA"
+                in probed)
+
+    def test_parallel(self):
+        # requests_mock serialises requests, so we use a session
+        # that just waits.
+        class _WaitingSession:
+            def get(self, url, **kwargs):
+                time.sleep(0.2)
+                response = requests.Response()
+                response.status_code, response.raw = 200, io.BytesIO()
+                return response
+
+        prober = InterfaceProber(session=_WaitingSession())
+        start = time.monotonic()
+        results = prober.probe(
+            [_tap(f"http://slow{index}/tap") for index in range(5)])
+        assert time.monotonic() - start < 0.8
+        assert all(result.healthy for result in results.values())
+
+    def test_results_reused(self, probed):
+        prober = InterfaceProber()
+        prober.probe(_tap("http://fast/tap"))
+        prober.probe([_tap("http://fast/tap")])
+        assert len(probed) == 1
+
+        prober.probe(_tap("http://fast/tap"), force=True)
+        assert len(probed) == 2
+
+        prober.max_age = -1
+        prober.probe(_tap("http://fast/tap"))
+        assert len(probed) == 3
+
+    def test_rank(self, probed):
+        ranked = InterfaceProber().rank([
+            _tap("http://broken/tap"), _tap("http://slow/tap"),
+            _tap("http://fast/tap")])
+        assert [intf.access_url for intf in ranked] == [
+            "http://fast/tap", "http://slow/tap", "http://broken/tap"]
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+Tests for pyvo.registry.profile
+"""
+from functools import partial
+
+import pytest
+
+from pyvo.dal import tap
+from pyvo.registry import regtap, rtcons
+from pyvo.registry.profile import RegTAPProfile, RegTAPProfileCache
+
+from astropy.utils.data import get_pkg_data_contents
+
+get_pkg_data_contents = partial(
+    get_pkg_data_contents, package=__package__, encoding='binary')
+
+ACCESS_URL = "http://profiled.example.com/tap"
+
+TABLESET = b"""<?xml version="1.0" encoding="utf-8"?>
+<vosi:tableset xmlns:vosi="http://www.ivoa.net/xml/VOSITables/v1.0"
+    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+    xmlns:vs="http://www.ivoa.net/xml/VODataService/v1.1">
+  <schema>
+    <name>rr</name>
+    <table><name>rr.resource</name></table>
+    <table><name>rr.stc_spatial</name></table>
+  </schema>
+</vosi:tableset>"""
+
+
+@pytest.fixture(name='profiled_service')
+def _profiled_service(mocker):
+    """mocks a RegTAP service at ACCESS_URL and yields a dict counting
+    the requests for its capabilities and tables.
+    """
+    counts = {"capabilities": 0, "tables": 0}
+
+    def capabilities_callback(request, context):
+        counts["capabilities"] += 1
+        return get_pkg_data_contents('data/capabilities.xml')
+
+    def tables_callback(request, context):
+        counts["tables"] += 1
+        return TABLESET
+
+    with mocker.register_uri(
+            'GET', ACCESS_URL + '/capabilities',
+            content=capabilities_callback):
+        with mocker.register_uri(
+                'GET', ACCESS_URL + '/tables', content=tables_callback):
+            yield counts
+
+
+@pytest.fixture
+def profile_cache(tmp_path):
+    regtap.use_RegTAP_profile_cache(str(tmp_path / "profiles.sqlite"))
+    yield regtap._PROFILE_CACHE
+    regtap.use_RegTAP_profile_cache(None)
+
+
+class TestProfile:
+    def test_from_service(self, profiled_service):
+        profile = RegTAPProfile.from_service(tap.TAPService(ACCESS_URL))
+        assert profile.get_tap_capability().get_adql().get_feature(
+            "ivo://ivoa.net/std/TAPRegExt#features-adql-sets", "UNION")
+        assert profile.get_feature(
+            "IVO://IVOA.NET/STD/TAPREGEXT#FEATURES-ADQL-SETS", "UNION")
+        assert not profile.get_feature(
+            "ivo://ivoa.net/std/TAPRegExt#features-adql-sets", "INTERSECT2")
+        assert profiled_service == {"capabilities": 1, "tables": 0}
+
+        assert not profile.tables_known
+        assert "rr.stc_spatial" in profile.tables
+        assert profiled_service["tables"] == 1
+
+    def test_plain(self):
+        profile = RegTAPProfile("http://x", features=[("A#b", "X")])
+        assert profile.get_feature("a#B", "X")
+        assert profile.tables == frozenset()
+
+    def test_constraints(self):
+        profile = RegTAPProfile(
+            "http://x", features=[
+                ("ivo://org.gavo.dc/std/exts#extra-adql-keywords", "MOC")],
+            tables=["rr.stc_spatial"])
+        assert "INTERSECTS" in rtcons.Spatial(
+            (10, 20), intersect="overlaps").get_search_condition(profile)
+        with pytest.raises(rtcons.RegTAPFeatureMissing):
+            rtcons.Temporal((50000, 60000)).get_search_condition(profile)
+        assert "UNION" not in rtcons.Freetext(
+            "star").get_search_condition(profile)
+
+
+class TestProfileCache:
+    def test_roundtrip(self, tmp_path):
+        cache = RegTAPProfileCache(str(tmp_path / "profiles.sqlite"))
+        assert cache.get("http://x") is None
+
+        cache.store(RegTAPProfile(
+            "http://x", features=[("a#b", "X")], tables=["rr.resource"]))
+        profile = cache.get("http://x")
+        assert profile.get_feature("a#b", "X")
+        assert profile.tables == {"rr.resource"}
+
+        cache.ttl = -1
+        assert cache.get("http://x") is None
+
+    def test_tables_filled_later(self, tmp_path, profiled_service):
+        cache = RegTAPProfileCache(str(tmp_path / "profiles.sqlite"))
+        cache.store(RegTAPProfile.from_service(tap.TAPService(ACCESS_URL)))
+        assert not cache.get(ACCESS_URL).tables_known
+
+        profile = cache.get(ACCESS_URL, service=tap.TAPService(ACCESS_URL))
+        assert "rr.resource" in profile.tables
+        assert cache.get(ACCESS_URL).tables_known
+
+
+class TestGetRegTAPProfile:
+    def test_persisted(self, profiled_service, profile_cache):
+        service = tap.TAPService(ACCESS_URL)
+        regtap.get_RegTAP_query(keywords="star", service=service)
+        regtap.get_RegTAP_query(spatial=(10, 20), service=service)
+        assert profiled_service == {"capabilities": 1, "tables": 1}
+
+        # a new session only needs the cache
+        regtap._PROFILES.clear()
+        query = regtap.get_RegTAP_query(
+            keywords="star", spatial=(10, 20),
+            service=tap.TAPService(ACCESS_URL))
+        assert "UNION" in query
+        assert profiled_service == {"capabilities": 1, "tables": 1}
+        assert profile_cache.get(ACCESS_URL).tables_known
+
+    def test_unpersisted(self, profiled_service):
+        regtap._PROFILES.pop(ACCESS_URL, None)
+        profile = regtap.get_RegTAP_profile(tap.TAPService(ACCESS_URL))
+        assert regtap.get_RegTAP_profile(tap.TAPService(ACCESS_URL)) is profile
+        assert profiled_service["capabilities"] == 1
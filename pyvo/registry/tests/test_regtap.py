@@ -7,14 +7,18 @@ Tests for pyvo.registry.regtap
 import io
 import re
 from functools import partial
+from time import sleep
 from urllib.parse import parse_qsl
 
 import pytest
 
 from astropy import time
+from astropy.io import votable
+from astropy.table import Table
 
 from pyvo.registry import regtap
 from pyvo.registry import rtcons
+from pyvo.registry import InterfaceProber
 from pyvo.registry.regtap import REGISTRY_BASEURL
 from pyvo.registry import search as regsearch
 from pyvo.dal import DALOverflowWarning
@@ -402,6 +406,25 @@ def test_record_fields(rt_pulsar_distance):
     # access URL, standard_id and friends exercised in TestInterfaceSelection
 
 
+def test_summary_matches_records(rt_pulsar_distance):
+    summary = rt_pulsar_distance.get_summary()
+    assert list(summary["short_name"]) == [
+        r.short_name for r in rt_pulsar_distance]
+    assert list(summary["interfaces"]) == [
+        ", ".join(sorted(r.access_modes())) for r in rt_pulsar_distance]
+
+
+def test_pseudo_arrays_parsed_once(rt_pulsar_distance):
+    arrays = rt_pulsar_distance._get_pseudo_arrays()
+    assert rt_pulsar_distance._get_pseudo_arrays() is arrays
+
+    rec = rt_pulsar_distance["VII/156"]
+    index = rt_pulsar_distance._get_ivo_index()[rec.ivoid]
+    assert rec["access_urls"] == arrays["access_urls"][index]
+    assert ([intf.access_url for intf in rec.interfaces]
+            == rec["access_urls"])
+
+
 class TestResultIndexing:
     def test_get_with_index(self, rt_pulsar_distance):
         # this is expecte to break when the fixture is updated
@@ -674,6 +697,22 @@ class TestInterfaceRejection:
         assert (rsc.get_service(service_type="tap", lax=True)._baseurl
                 == "http://a")
 
+    def test_nonunique_prober(self, mocker):
+        rsc = _makeRegistryRecord(
+            access_urls=["http://a", "http://b"],
+            standard_ids=["ivo://ivoa.net/std/tap"] * 2,
+            intf_types=["vs:paramhttp"] * 2,
+            intf_roles=["std"] * 2)
+
+        with mocker.register_uri('GET', 'http://a/capabilities',
+                                 status_code=503):
+            with mocker.register_uri('GET', 'http://b/capabilities'):
+                prober = InterfaceProber()
+                assert rsc.get_service(
+                    service_type="tap", lax=True,
+                    prober=prober)._baseurl == "http://b"
+        assert not prober.results["http://a"].healthy
+
     def test_nonstd_ignored(self):
         rsc = _makeRegistryRecord(
             access_urls=["http://a", "http://b"],
@@ -864,7 +903,7 @@ class TestGetTables:
         rsc = _makeRegistryRecord(
             ivoid="ivo://org.gavo.dc/tap")
         with pytest.raises(dalq.DALQueryError) as excinfo:
-            rsc.get_tables()
+            rsc.get_tables(table_limit=20)
 
         assert re.match(r"Resource ivo://org.gavo.dc/tap reports \d+ tables."
                         "  Pass a higher table_limit to see them all.", str(excinfo.value))
@@ -915,6 +954,352 @@ class TestGetTables:
                 == "ivo://ivoa.net/std/obscore#table-1.1")
 
 
+def _limit_response(output, rows, hardlimit):
+    """returns the serialisation of the VOTableFile output for rows
+    result rows, marking it as overflowed if there are more than
+    hardlimit rows (which output should then have been cut to).
+    """
+    if hardlimit is not None and rows > hardlimit:
+        output.resources[0].infos.append(votable.tree.Info(
+            name="QUERY_STATUS", value="OVERFLOW"))
+    out = io.BytesIO()
+    output.to_xml(out)
+    return out.getvalue()
+
+
+def _make_tables_response(ivoids, hardlimit=None):
+    """returns a VOTable as the table metadata query of get_tables
+    would return it for ivoids from a service returning at most
+    hardlimit rows.
+
+    Every resource has a table with two columns and a table without
+    any columns.
+    """
+    rows = []
+    for ivoid in ivoids:
+        for colname in ["ra", "dec"]:
+            rows.append((ivoid, 1, "main", "The main table", "Main",
+                         "", colname, "pos.eq", "deg", "", "double", "",
+                         "", f"Column {colname}", False))
+        rows.append((ivoid, 0, "empty", "No columns", "Empty",
+                     "", "", "", "", "", "", "", "", "", True))
+
+    names = ["ivoid", "table_index", "table_name", "table_description",
+             "table_title", "table_utype", "name", "ucd", "unit", "utype",
+             "datatype", "arraysize", "extended_type", "column_description"]
+    tab = Table(rows=[row[:-1] for row in rows], names=names, masked=True)
+    for col in names[6:]:
+        tab[col].mask = [row[-1] for row in rows]
+
+    return _limit_response(
+        votable.from_table(tab[:hardlimit]), len(tab), hardlimit)
+
+
+@pytest.fixture()
+def registry_hardlimit():
+    """the maximal number of rows the mocked per-resource queries return;
+    parametrize this to change it.
+    """
+    return None
+
+
+@pytest.fixture(name='tables_queries')
+def _tables_queries(mocker, capabilities, registry_hardlimit):
+    """mocks the table metadata queries made by get_tables and yields
+    the list of the request bodies.
+    """
+    regtap._TABLES_CACHE.clear()
+    requests = []
+
+    def callback(request, context):
+        body = request.body
+        if isinstance(body, bytes):
+            body = body.decode("utf-8")
+        requests.append(body)
+
+        if "TAP_UPLOAD" in body:
+            ivoids = re.findall(r"<TD>(ivo://[^<]*)</TD>", body)
+        else:
+            ivoids = re.findall(
+                r"ivoid='([^']*)'", dict(parse_qsl(body))["QUERY"])
+        return _make_tables_response(ivoids, registry_hardlimit)
+
+    with mocker.register_uri(
+            'POST', REGISTRY_BASEURL + '/sync', content=callback):
+        yield requests
+    regtap._TABLES_CACHE.clear()
+
+
+class TestGetTablesMocked:
+    def test_single_query(self, tables_queries):
+        rsc = _makeRegistryRecord(ivoid="ivo://pyvo/tables")
+        tables = rsc.get_tables()
+
+        assert len(tables_queries) == 1
+        assert list(tables) == ["empty", "main"]
+        assert tables["empty"].columns == []
+        assert [col.name for col in tables["main"].columns] == ["ra", "dec"]
+        assert tables["main"].columns[0].unit == "deg"
+        assert tables["main"].origin is rsc
+
+    def test_cached(self, tables_queries):
+        _makeRegistryRecord(ivoid="ivo://pyvo/tables").get_tables()
+        tables = _makeRegistryRecord(ivoid="ivo://pyvo/tables").get_tables()
+        assert len(tables_queries) == 1
+        assert len(tables) == 2
+
+    def test_table_limit(self, tables_queries):
+        rsc = _makeRegistryRecord(ivoid="ivo://pyvo/tables")
+        with pytest.raises(dalq.DALQueryError):
+            rsc.get_tables(table_limit=1)
+
+    def test_results_get_tables(self, rt_pulsar_distance, tables_queries):
+        tables = rt_pulsar_distance.get_tables()
+
+        assert len(tables_queries) == 1
+        assert "TAP_UPLOAD" in tables_queries[0]
+        assert set(tables) == {r.ivoid for r in rt_pulsar_distance}
+        assert list(tables["ivo://cds.vizier/vii/156"]) == ["empty", "main"]
+
+        rt_pulsar_distance["VII/156"].get_tables()
+        assert len(tables_queries) == 1
+
+    def test_maxrec(self, tables_queries):
+        _makeRegistryRecord(ivoid="ivo://pyvo/tables").get_tables()
+        assert "MAXREC={}".format(regtap._IVOIDS_MAXREC) in tables_queries[0]
+
+    @pytest.mark.parametrize("registry_hardlimit", [7])
+    def test_overflow_split(self, rt_pulsar_distance, tables_queries):
+        # every resource has three rows, so at most two fit into a result
+        tables = rt_pulsar_distance.get_tables()
+
+        assert len(tables_queries) > 1
+        assert set(tables) == {r.ivoid for r in rt_pulsar_distance}
+        for resource_tables in tables.values():
+            assert list(resource_tables) == ["empty", "main"]
+            assert len(resource_tables["main"].columns) == 2
+
+    @pytest.mark.parametrize("registry_hardlimit", [2])
+    def test_overflow_single(self, tables_queries):
+        rsc = _makeRegistryRecord(ivoid="ivo://pyvo/tables")
+        with pytest.raises(dalq.DALServiceError, match="incomplete result"):
+            rsc.get_tables()
+        assert "ivo://pyvo/tables" not in regtap._TABLES_CACHE
+
+    def test_cache_copies(self, tables_queries):
+        metadata = regtap._get_table_metadata(["ivo://pyvo/tables"])
+        metadata["ivo://pyvo/tables"][1][1].clear()
+        metadata["ivo://pyvo/tables"].clear()
+
+        tables = _makeRegistryRecord(ivoid="ivo://pyvo/tables").get_tables()
+        assert len(tables_queries) == 1
+        assert [col.name for col in tables["main"].columns] == ["ra", "dec"]
+
+    def test_cache_lru(self, tables_queries, monkeypatch):
+        monkeypatch.setattr(regtap._TABLES_CACHE, "maxsize", 2)
+        for ivoid in ["ivo://pyvo/a", "ivo://pyvo/b", "ivo://pyvo/a",
+                      "ivo://pyvo/c"]:
+            _makeRegistryRecord(ivoid=ivoid).get_tables()
+
+        assert len(tables_queries) == 3
+        assert len(regtap._TABLES_CACHE) == 2
+        assert "ivo://pyvo/a" in regtap._TABLES_CACHE
+        assert "ivo://pyvo/b" not in regtap._TABLES_CACHE
+
+    def test_cache_ttl(self, tables_queries, monkeypatch):
+        _makeRegistryRecord(ivoid="ivo://pyvo/tables").get_tables()
+        monkeypatch.setattr(regtap._TABLES_CACHE, "ttl", 0)
+        _makeRegistryRecord(ivoid="ivo://pyvo/tables").get_tables()
+        assert len(tables_queries) == 2
+
+
+def _make_votable_response(names, rows, hardlimit=None):
+    """returns a VOTable serialisation of rows from a service returning
+    at most hardlimit rows.
+    """
+    return _limit_response(
+        votable.from_table(Table(rows=rows[:hardlimit], names=names)),
+        len(rows), hardlimit)
+
+
+@pytest.fixture(name='prefetch_queries')
+def _prefetch_queries(mocker, registry_hardlimit):
+    """mocks the contact and alternative identifier queries, giving each
+    resource a contact and a DOI, and yields the list of the queries.
+    """
+    queries = []
+
+    def callback(request, context):
+        body = request.body
+        if isinstance(body, bytes):
+            body = body.decode("utf-8")
+        queries.append(body)
+        if "TAP_UPLOAD" in body:
+            ivoids = re.findall(r"<TD>(ivo://[^<]*)</TD>", body)
+        else:
+            ivoids = re.findall(
+                r"t.ivoid='([^']*)'", dict(parse_qsl(body))["QUERY"])
+
+        if "rr.res_role" in body:
+            return _make_votable_response(
+                ["ivoid", "role_name", "email", "telephone"],
+                [(ivoid, "Contact of " + ivoid, "c@example.org", "")
+                 for ivoid in ivoids], registry_hardlimit)
+        return _make_votable_response(
+            ["ivoid", "alt_identifier"],
+            [(ivoid, "doi:10.0/" + ivoid[6:]) for ivoid in ivoids],
+            registry_hardlimit)
+
+    with mocker.register_uri(
+            'POST', REGISTRY_BASEURL + '/sync', content=callback):
+        yield queries
+
+
+class TestPrefetch:
+    def test_prefetch(self, rt_pulsar_distance, prefetch_queries):
+        rt_pulsar_distance.prefetch()
+        assert len(prefetch_queries) == 2
+        assert all("TAP_UPLOAD" in query for query in prefetch_queries)
+
+        rec = rt_pulsar_distance["VII/156"]
+        assert rec.get_contact() == (
+            "Contact of ivo://cds.vizier/vii/156 <c@example.org>")
+        assert rec.get_alt_identifiers() == ["doi:10.0/cds.vizier/vii/156"]
+
+        out = io.StringIO()
+        rec.describe(verbose=True, file=out)
+        assert ("Alternative identifier(s): doi:10.0/cds.vizier/vii/156"
+                in out.getvalue())
+        assert len(prefetch_queries) == 2
+
+    def test_partial_prefetch(self, rt_pulsar_distance, prefetch_queries):
+        rt_pulsar_distance.prefetch(alt_identifiers=False)
+        assert len(prefetch_queries) == 1
+
+        for rec in rt_pulsar_distance:
+            rec.get_contact()
+        assert len(prefetch_queries) == 1
+
+        rt_pulsar_distance["VII/156"].get_alt_identifiers()
+        assert len(prefetch_queries) == 2
+
+    def _assert_complete(self, results):
+        for rec in results:
+            assert rec.get_contact() == (
+                f"Contact of {rec.ivoid} <c@example.org>")
+            assert rec.get_alt_identifiers() == ["doi:10.0/" + rec.ivoid[6:]]
+
+    def test_batches(self, rt_pulsar_distance, prefetch_queries, monkeypatch):
+        monkeypatch.setattr(regtap, "_IVOIDS_BATCH_SIZE", 10)
+        rt_pulsar_distance.prefetch()
+
+        batches = -(-len(rt_pulsar_distance) // 10)
+        assert len(prefetch_queries) == 2 * batches
+        self._assert_complete(rt_pulsar_distance)
+        assert len(prefetch_queries) == 2 * batches
+
+    @pytest.mark.parametrize("registry_hardlimit", [7])
+    def test_overflow(self, rt_pulsar_distance, prefetch_queries):
+        rt_pulsar_distance.prefetch()
+        query_count = len(prefetch_queries)
+
+        assert query_count > 2
+        self._assert_complete(rt_pulsar_distance)
+        assert len(prefetch_queries) == query_count
+
+
+@pytest.fixture(name='paged_registry')
+def _paged_registry(mocker):
+    """mocks a registry evaluating the TOP and ivoid conditions of
+    iter_search against the records in regtap.xml; it returns at most
+    hardlimit rows (with an overflow status when that cuts a result).
+
+    This yields a dict with the list of queries and the hardlimit.
+    """
+    records = votable.parse(io.BytesIO(
+        get_pkg_data_contents('data/regtap.xml'))).get_first_table().to_table()
+    records.sort("ivoid")
+    state = {"queries": [], "hardlimit": None}
+
+    def callback(request, context):
+        query = dict(parse_qsl(request.body))["QUERY"]
+        state["queries"].append(query)
+        selected = records
+        for operator, ivoid in re.findall(r"ivoid(>=|<|>)'([^']*)'", query):
+            selected = selected[{
+                ">=": selected["ivoid"] >= ivoid,
+                "<": selected["ivoid"] < ivoid,
+                ">": selected["ivoid"] > ivoid}[operator]]
+        selected = selected[:int(re.search(r"TOP (\d+)", query).group(1))]
+
+        output = votable.from_table(selected[:state["hardlimit"]])
+        if state["hardlimit"] and len(selected) > state["hardlimit"]:
+            output.resources[0].infos.append(votable.tree.Info(
+                name="QUERY_STATUS", value="OVERFLOW"))
+        out = io.BytesIO()
+        output.to_xml(out)
+        return out.getvalue()
+
+    with mocker.register_uri(
+            'POST', REGISTRY_BASEURL + '/sync', content=callback):
+        yield state
+
+
+@pytest.mark.usefixtures('capabilities')
+class TestIterSearch:
+    def test_pages(self, paged_registry):
+        pages = list(regtap.iter_search(keywords="pulsar", page_size=8))
+        assert [len(page) for page in pages] == [8, 8, 8, 6]
+        ivoids = [rec.ivoid for page in pages for rec in page]
+        assert ivoids == sorted(ivoids)
+        assert len(set(ivoids)) == 30
+
+        queries = paged_registry["queries"]
+        assert len(queries) == 4
+        assert queries[0].startswith("SELECT TOP 8")
+        assert queries[0].endswith("ORDER BY ivoid")
+        assert "ivoid>'{}'".format(ivoids[7]) in queries[1]
+
+    def test_exact_pages(self, paged_registry):
+        pages = list(regtap.iter_search(keywords="pulsar", page_size=10))
+        assert [len(page) for page in pages] == [10, 10, 10]
+        assert len(paged_registry["queries"]) == 4
+
+    def test_hardlimit(self, paged_registry):
+        paged_registry["hardlimit"] = 7
+        pages = list(regtap.iter_search(keywords="pulsar", page_size=10))
+        assert [len(page) for page in pages] == [7, 7, 7, 7, 2]
+
+    def test_workers(self, paged_registry):
+        sequential = [rec.ivoid for page in regtap.iter_search(
+            keywords="pulsar", page_size=8) for rec in page]
+        paged_registry["queries"].clear()
+
+        parallel = [rec.ivoid for page in regtap.iter_search(
+            keywords="pulsar", page_size=8, workers=4) for rec in page]
+        assert parallel == sequential
+        assert any("ivoid>='ivo://i' AND ivoid<'ivo://r'" in query
+                   for query in paged_registry["queries"])
+
+    def test_early_stop(self, paged_registry):
+        pages = regtap.iter_search(keywords="pulsar", page_size=5, workers=2)
+        assert len(next(pages)) == 5
+        pages.close()
+
+    def test_bounded_read_ahead(self, paged_registry):
+        pages = regtap.iter_search(keywords="pulsar", page_size=1, workers=2)
+        assert len(next(pages)) == 1
+        # give the workers time to run ahead; per range, they can only
+        # have fetched the pages in the queue and the one they try to add
+        sleep(0.2)
+        assert len(paged_registry["queries"]) <= 2 * (regtap._PAGES_AHEAD + 2)
+        pages.close()
+
+    def test_bad_page_size(self):
+        with pytest.raises(ValueError):
+            next(regtap.iter_search(keywords="pulsar", page_size=0))
+
+
 @pytest.mark.remote_data
 def test_sia2_service_operation():
     svcs = regsearch(
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+Tests for pyvo.registry.resolver
+"""
+from functools import partial
+
+import pytest
+
+from pyvo.dal import DALServiceError, ssa, tap
+from pyvo.registry import InterfaceCache, regtap, resolve_services, resolver
+from pyvo.registry.regtap import REGISTRY_BASEURL
+
+from astropy.utils.data import get_pkg_data_contents
+
+get_pkg_data_contents = partial(
+    get_pkg_data_contents, package=__package__, encoding='binary')
+
+FLASH_IVOID = "ivo://org.gavo.dc/flashheros/q/ssa"
+
+
+@pytest.fixture()
+def registry_status():
+    """the QUERY_STATUS of the mocked registry responses; parametrize this
+    to change it.
+    """
+    return "OK"
+
+
+@pytest.fixture(name='registry_queries')
+def _registry_queries(mocker, registry_status):
+    """mocks the registry, returning the record for the flash/heros
+    service for every query, and yields the list of the request bodies.
+    """
+    queries = []
+
+    def callback(request, context):
+        body = request.body
+        if isinstance(body, bytes):
+            body = body.decode("utf-8")
+        queries.append(body)
+        return get_pkg_data_contents('data/multi-interface.xml').replace(
+            b'name="QUERY_STATUS" value="OK"',
+            'name="QUERY_STATUS" value="{}"'.format(registry_status).encode())
+
+    with mocker.register_uri(
+            'GET', REGISTRY_BASEURL + '/capabilities',
+            content=get_pkg_data_contents('data/capabilities.xml')):
+        with mocker.register_uri(
+                'POST', REGISTRY_BASEURL + '/sync', content=callback):
+            yield queries
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return InterfaceCache(str(tmp_path / "interfaces.sqlite"))
+
+
+class TestResolveServices:
+    def test_single_query(self, registry_queries):
+        services, unresolved = resolve_services(
+            [FLASH_IVOID, "ivo://x-unregistred/nothing"], service_type="ssa")
+
+        assert len(registry_queries) == 1
+        assert "TAP_UPLOAD" in registry_queries[0]
+        assert "ivo://x-unregistred/nothing" in registry_queries[0]
+        assert isinstance(services[FLASH_IVOID], ssa.SSAService)
+        assert unresolved == ["ivo://x-unregistred/nothing"]
+
+    def test_batches(self, registry_queries, monkeypatch):
+        monkeypatch.setattr(regtap, "_IVOIDS_BATCH_SIZE", 2)
+        ivoids = [FLASH_IVOID] + [f"ivo://x-unregistred/{i}" for i in range(4)]
+        services, unresolved = resolve_services(ivoids, service_type="ssa")
+
+        assert len(registry_queries) == 3
+        assert list(services) == [FLASH_IVOID]
+        assert unresolved == ivoids[1:]
+
+    @pytest.mark.parametrize("registry_status", ["OVERFLOW"])
+    def test_overflow(self, registry_queries):
+        with pytest.raises(DALServiceError, match="incomplete result"):
+            resolve_services(
+                [FLASH_IVOID, "ivo://x-unregistred/nothing"],
+                service_type="ssa")
+        # the batch was split down to single ivoids
+        assert len(registry_queries) == 2
+
+    def test_case_preserved(self, registry_queries):
+        services, unresolved = resolve_services(
+            [FLASH_IVOID.upper()], service_type="tap")
+        assert isinstance(services[FLASH_IVOID.upper()], tap.TAPService)
+        assert unresolved == []
+
+    def test_no_such_interface(self, registry_queries):
+        services, unresolved = resolve_services(
+            [FLASH_IVOID], service_type="scs")
+        assert services == {}
+        assert unresolved == [FLASH_IVOID]
+
+    def test_cached(self, registry_queries, cache):
+        services, _ = resolve_services(
+            [FLASH_IVOID], service_type="ssa", cache=cache)
+        assert len(cache) == 1
+
+        cached_services, unresolved = resolve_services(
+            [FLASH_IVOID], service_type="ssa", cache=cache)
+        assert len(registry_queries) == 1
+        assert unresolved == []
+        assert (cached_services[FLASH_IVOID].baseurl
+                == services[FLASH_IVOID].baseurl)
+
+        # other service types are cached separately
+        resolve_services([FLASH_IVOID], service_type="tap", cache=cache)
+        assert len(registry_queries) == 2
+
+
+class TestInterfaceCache:
+    def test_ttl(self, registry_queries, tmp_path):
+        cache = InterfaceCache(str(tmp_path / "interfaces.sqlite"), ttl=-1)
+        resolve_services([FLASH_IVOID], service_type="ssa", cache=cache)
+        assert cache.get(FLASH_IVOID, "ssa") is None
+        assert len(cache) == 0
+
+        cache.collect_garbage()
+        cache.ttl = 3600
+        assert len(cache) == 0
+
+    def test_roundtrip(self, registry_queries, cache):
+        resolve_services([FLASH_IVOID], service_type="ssa", cache=cache)
+        interface = cache.get(FLASH_IVOID.upper(), "ssa")
+        assert interface.standard_id == "ivo://ivoa.net/std/ssa"
+        assert interface.is_standard
+
+    def test_get_many(self, cache, monkeypatch):
+        monkeypatch.setattr(resolver, "_GET_BATCH_SIZE", 2)
+        ivoids = [f"ivo://pyvo/{i}" for i in range(5)]
+        cache.store_many("tap", [
+            (ivoid, regtap.Interface(f"http://{i}/tap"))
+            for i, ivoid in enumerate(ivoids[:4])])
+
+        found = cache.get_many([ivoid.upper() for ivoid in ivoids], "tap")
+        assert sorted(found) == ivoids[:4]
+        assert found["ivo://pyvo/3"].access_url == "http://3/tap"
+        assert cache.get_many(ivoids, "ssa") == {}
@@ -6,9 +6,6 @@ import contextlib
 import os
 import tempfile
 
-from astropy.samp import SAMPIntegratedClient
-
-
 __all__ = [
     'find_client_id', 'send_table_to', 'send_product_to', 'send_spectrum_to',
     'send_image_to', 'accessible_table', 'connection']
@@ -111,6 +108,8 @@ def connection(
     a context manager to give the controlled block a SAMP connection.
     The program will disconnect as the controlled block is exited.
     """
+    from astropy.samp import SAMPIntegratedClient
+
     client = SAMPIntegratedClient(
         name=client_name, description=description, **kwargs)
     client.connect()
@@ -1,2 +1,8 @@
 from .compat import *
-from .prototype import prototype_feature, activate_features
+from .lazy import lazy_namespace
+
+__getattr__, __dir__ = lazy_namespace(__name__, globals(), {
+    "prototype_feature": (".prototype", "prototype_feature"),
+    "activate_features": (".prototype", "activate_features"),
+}, submodules=["concurrency", "decorators", "formatting", "http", "instrumentation",
+               "protofeature", "prototype", "testing", "url", "vocabularies", "xml"])
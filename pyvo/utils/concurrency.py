@@ -0,0 +1,73 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+Helpers for running pyVO code from several threads.
+"""
+import threading
+from concurrent.futures import Future
+
+__all__ = ["SingleFlight"]
+
+
+class SingleFlight:
+    """
+    runs calls under the same key at most once at a time.
+
+    If a call comes in while another call with the same key is still
+    running, it does not run its function but waits for the running call
+    and returns its result (or raises its exception).  Once a call has
+    finished, the next call with its key runs its function again; no
+    results are cached.
+
+    Parameters
+    ----------
+    on_join : callable
+        if given, this is called with the key whenever a call joins a
+        call in flight (and will thus share its result).  This is mainly
+        useful for tests.
+    """
+
+    def __init__(self, on_join=None):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._on_join = on_join
+
+    def do(self, key, func):
+        """
+        returns func(), or the result of a concurrent call with key.
+
+        Parameters
+        ----------
+        key : hashable
+            identifies calls that may share their result
+        func : callable
+            the function to run if no call with key is in flight
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self._in_flight[key] = Future()
+
+        if not is_leader:
+            if self._on_join is not None:
+                self._on_join(key)
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as ex:
+            future.set_exception(ex)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def __len__(self):
+        """
+        returns the number of calls currently in flight
+        """
+        with self._lock:
+            return len(self._in_flight)
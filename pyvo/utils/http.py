@@ -20,11 +20,22 @@ def use_session(session):
         return create_session()
 
 
-def create_session():
+def create_session(*, pool_maxsize=None):
     """
     Create a new empty requests session with a pyvo
     user agent.
+
+    Parameters
+    ----------
+    pool_maxsize : int
+        the number of connections to keep open per host; by default,
+        this is requests' default of 10.  Raise this if you share the
+        session between more threads.
     """
     session = requests.Session()
     session.headers['User-Agent'] = DEFAULT_USER_AGENT
+    if pool_maxsize is not None:
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_maxsize)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
     return session
@@ -0,0 +1,330 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+Instrumentation of the network I/O of pyVO.
+
+pyVO reports the requests it makes and the results it parses as `Event`
+instances to the listeners registered with `add_listener`.  Listeners
+are plain callables, so events can be logged, aggregated (e.g., into
+per-service latency histograms by a `LatencyRecorder`) or turned into
+spans of a tracing system such as OpenTelemetry.  Without listeners,
+nothing is measured.
+"""
+import threading
+import time
+import warnings
+from bisect import bisect_left
+from contextlib import contextmanager
+
+__all__ = [
+    "Event", "add_listener", "remove_listener", "listening", "measure",
+    "Histogram", "LatencyRecorder"]
+
+# a tuple, replaced (under _lock) rather than changed, so that emitting
+# needs no lock
+_listeners = ()
+_lock = threading.Lock()
+
+
+class Event:
+    """
+    an I/O operation of pyVO.
+
+    Attributes
+    ----------
+    name : str
+        what was done, e.g. ``dal.submit`` or ``uws.wait``.
+    url : str
+        the URL the operation concerned.
+    service : str
+        the access URL of the service, or url if it is not known.
+    start_time : float
+        the unix time the operation started at.
+    duration : float
+        the time (in seconds) the operation took.
+    error : str
+        the name of the exception the operation raised, or None.
+    attributes : dict
+        further facts depending on the operation, like the HTTP status
+        (``status``), the time until the response headers came in
+        (``ttfb``), the number of bytes received (``bytes``) or the
+        number of rows parsed (``rows``).
+    """
+    def __init__(self, name, url, *, service=None, **attributes):
+        self.name = name
+        self.url = url
+        self.service = service or url
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration = None
+        self.error = None
+        self.attributes = {
+            key: value for key, value in attributes.items() if value is not None}
+        # True if the event is measured and will be emitted
+        self.active = False
+
+    def __repr__(self):
+        return "<Event {} {} ({})>".format(
+            self.name, self.url,
+            "running" if self.duration is None else f"{self.duration:.3f} s")
+
+    @property
+    def end_time(self):
+        """
+        the unix time the operation ended at, or None if it is still
+        running.
+        """
+        if self.duration is None:
+            return None
+        return self.start_time + self.duration
+
+    def set(self, **attributes):
+        """
+        sets attributes of the event; None values are ignored.
+        """
+        self.attributes.update(
+            (key, value) for key, value in attributes.items() if value is not None)
+
+    def mark(self, name):
+        """
+        sets the attribute name to the time (in seconds) since the
+        operation started.
+        """
+        if self.active:
+            self.attributes[name] = time.perf_counter() - self._start
+
+    def set_response(self, response):
+        """
+        sets the attributes of the event describing a requests response.
+        """
+        if self.active:
+            content_length = response.headers.get("Content-Length")
+            self.set(
+                status=response.status_code,
+                ttfb=response.elapsed.total_seconds(),
+                content_length=int(content_length) if content_length else None)
+
+    def track_reads(self, raw):
+        """
+        returns the read function of the file-like raw, adding the bytes
+        read (``decoded_bytes``), the bytes received (``bytes``, if raw is
+        a urllib3 response) and the time spent reading
+        (``read_duration``, including the transfer and decompression of
+        the response) to the attributes of the event.
+        """
+        if not self.active:
+            return raw.read
+        self.set(decoded_bytes=0, read_duration=0.)
+        read, tell = raw.read, getattr(raw, "tell", None)
+
+        def counting_read(*args, **kwargs):
+            start = time.perf_counter()
+            data = read(*args, **kwargs)
+            self.attributes["read_duration"] += time.perf_counter() - start
+            self.attributes["decoded_bytes"] += len(data)
+            if tell is not None:
+                self.attributes["bytes"] = tell()
+            return data
+
+        return counting_read
+
+    def set_rows(self, votable):
+        """
+        sets the number of rows in the tables of an astropy VOTable.
+        """
+        if self.active:
+            self.set(rows=sum(
+                len(table.array) for table in votable.iter_tables()))
+
+
+def add_listener(listener):
+    """
+    registers listener to be called with every `Event` emitted.
+
+    Listeners are called in the thread that did the operation; they
+    should be quick and must be thread-safe.
+    """
+    global _listeners
+    with _lock:
+        _listeners = _listeners + (listener,)
+
+
+def remove_listener(listener):
+    """
+    unregisters a listener registered with `add_listener`.
+    """
+    global _listeners
+    with _lock:
+        _listeners = tuple(item for item in _listeners if item is not listener)
+
+
+@contextmanager
+def listening(listener):
+    """
+    a context manager registering listener while the controlled block
+    runs.
+    """
+    add_listener(listener)
+    try:
+        yield listener
+    finally:
+        remove_listener(listener)
+
+
+def emit(event):
+    """
+    passes event to all listeners.  Failing listeners are reported as
+    warnings.
+    """
+    from pyvo.dal.exceptions import PyvoUserWarning
+
+    for listener in _listeners:
+        try:
+            listener(event)
+        except Exception as ex:
+            warnings.warn(
+                f"Instrumentation listener {listener!r} failed: {ex}",
+                PyvoUserWarning)
+
+
+@contextmanager
+def measure(name, url, *, service=None, **attributes):
+    """
+    a context manager timing the controlled block and emitting an
+    `Event` for it.
+
+    The block gets the event to add attributes.  If there are no
+    listeners when the block starts, nothing is measured or emitted.
+    """
+    event = Event(name, url, service=service, **attributes)
+    if not _listeners:
+        yield event
+        return
+
+    event.active = True
+    try:
+        yield event
+    except BaseException as ex:
+        event.error = type(ex).__name__
+        raise
+    finally:
+        event.duration = time.perf_counter() - event._start
+        emit(event)
+
+
+class Histogram:
+    """
+    a histogram of durations.
+
+    Attributes
+    ----------
+    bounds : tuple of float
+        the upper bounds (in seconds) of the buckets but the last.
+    counts : list of int
+        the number of values in each bucket; the last bucket has the
+        values above the last bound.
+    count : int
+        the number of values.
+    sum : float
+        the sum of the values.
+    """
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.
+        self.min = None
+        self.max = None
+
+    def __repr__(self):
+        return f"<Histogram of {self.count} values, mean {self.mean}>"
+
+    def add(self, value):
+        """
+        adds a value to the histogram.
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def mean(self):
+        """
+        the mean of the values, or None if there are none.
+        """
+        return self.sum / self.count if self.count else None
+
+    def quantile(self, q):
+        """
+        returns an estimate of the q-quantile (0 <= q <= 1) of the values,
+        interpolating linearly within buckets, or None if there are no
+        values.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.min if index == 0 else max(self.bounds[index - 1], self.min)
+                upper = self.max if index == len(self.bounds) else min(self.bounds[index], self.max)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.max
+
+
+class LatencyRecorder:
+    """
+    a listener keeping histograms of event durations by event name and
+    service.
+
+    Register it with `add_listener` and look at `histograms`, e.g., to
+    tune the number of concurrent requests per service.
+    """
+    # the default bucket bounds of OpenTelemetry histograms, in seconds
+    default_bounds = (
+        0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75,
+        1., 2.5, 5., 7.5, 10.)
+
+    def __init__(self, *, bounds=None, names=None):
+        """
+        create a recorder.
+
+        Parameters
+        ----------
+        bounds : sequence of float
+            the upper bounds (in seconds) of the histogram buckets.
+        names : sequence of str
+            the names of the events to record; by default, all events are
+            recorded.
+        """
+        self.bounds = tuple(bounds or self.default_bounds)
+        self.names = None if names is None else frozenset(names)
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        if self.names is not None and event.name not in self.names:
+            return
+        key = (event.name, event.service)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.bounds)
+            histogram.add(event.duration)
+
+    @property
+    def histograms(self):
+        """
+        a dict mapping (event name, service) pairs to their `Histogram`.
+        """
+        with self._lock:
+            return dict(self._histograms)
+
+    def clear(self):
+        """
+        forgets all values recorded.
+        """
+        with self._lock:
+            self._histograms.clear()
@@ -0,0 +1,51 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+Lazy loading of the attributes of package namespaces.
+
+Importing the modules behind a package namespace (and the parts of
+astropy they use) is costly, and many programs only need a few of them.
+Packages therefore declare which module each of their public names comes
+from and only import it when the name is first accessed (PEP 562).
+"""
+import importlib
+
+__all__ = ["lazy_namespace"]
+
+
+def lazy_namespace(package_name, package_globals, attributes, submodules=()):
+    """
+    returns the ``__getattr__`` and ``__dir__`` functions of a package
+    whose attributes are imported on first access.
+
+    Parameters
+    ----------
+    package_name : str
+        the ``__name__`` of the package.
+    package_globals : dict
+        the ``globals()`` of the package; attributes are stored there once
+        imported, so that ``__getattr__`` is only called once per name.
+    attributes : dict
+        a mapping from attribute names to (module, name) pairs, where module
+        is a module name relative to the package; if name is None, the
+        attribute is the module itself.
+    submodules : sequence of str
+        the names of the submodules that are available as attributes.
+    """
+    def __getattr__(name):
+        if name in attributes:
+            module_name, attribute_name = attributes[name]
+            value = importlib.import_module(module_name, package_name)
+            if attribute_name is not None:
+                value = getattr(value, attribute_name)
+        elif name in submodules:
+            value = importlib.import_module("." + name, package_name)
+        else:
+            raise AttributeError(
+                f"module {package_name!r} has no attribute {name!r}")
+        package_globals[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(package_globals) | set(attributes) | set(submodules))
+
+    return __getattr__, __dir__
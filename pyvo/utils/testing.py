@@ -1,6 +1,7 @@
 """
 Miscellenaneous utilities for writing tests.
 """
+import threading
 
 from astropy.io.votable import tree
 from pyvo.dal import query as dalquery
@@ -45,3 +46,26 @@ def create_dalresults(
     return resultsClass(
         create_votable(field_descs, records),
         url="http://testing.pyvo/test-url")
+
+
+class FollowerGate:
+    """lets tests hold the running call of a
+    `~pyvo.utils.concurrency.SingleFlight` until other callers have
+    joined it.
+
+    Pass ``joined`` as the ``on_join`` callback of the SingleFlight.  The
+    running call should then call ``wait()``, which returns once
+    ``followers`` callers have joined it.
+    """
+    def __init__(self, followers=0):
+        self.followers = followers
+        self._joined = threading.Semaphore(0)
+
+    def joined(self, key):
+        self._joined.release()
+
+    def wait(self, timeout=10):
+        for _ in range(self.followers):
+            if not self._joined.acquire(timeout=timeout):
+                raise AssertionError(
+                    f"Fewer than {self.followers} callers joined the call")
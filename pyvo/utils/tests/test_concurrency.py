@@ -0,0 +1,77 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+Tests for pyvo.utils.concurrency
+"""
+import threading
+
+import pytest
+
+from pyvo.utils.concurrency import SingleFlight
+from pyvo.utils.testing import FollowerGate
+
+
+def _run_concurrently(flight, key, func, n_threads=5):
+    """
+    runs flight.do(key, func) in n_threads threads, returning what they
+    returned or raised.
+    """
+    outcomes = []
+
+    def call():
+        try:
+            outcomes.append(flight.do(key, func))
+        except Exception as ex:
+            outcomes.append(ex)
+
+    threads = [threading.Thread(target=call) for _ in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def _recording(result, calls, gate=None):
+    def func():
+        calls.append(1)
+        if gate is not None:
+            # hold the call until the other threads have joined it
+            gate.wait()
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return func
+
+
+def test_shares_result():
+    gate, calls = FollowerGate(followers=4), []
+    flight = SingleFlight(on_join=gate.joined)
+    result = object()
+    outcomes = _run_concurrently(flight, "key", _recording(result, calls, gate))
+    assert len(calls) == 1
+    assert outcomes == [result] * 5
+    assert len(flight) == 0
+
+
+def test_shares_exception():
+    gate, calls = FollowerGate(followers=4), []
+    flight = SingleFlight(on_join=gate.joined)
+    error = ValueError("broken")
+    outcomes = _run_concurrently(flight, "key", _recording(error, calls, gate))
+    assert len(calls) == 1
+    assert outcomes == [error] * 5
+    assert len(flight) == 0
+
+
+def test_no_caching():
+    flight, calls = SingleFlight(), []
+    assert flight.do("key", _recording(1, calls)) == 1
+    assert flight.do("key", _recording(2, calls)) == 2
+    assert len(calls) == 2
+
+
+def test_exception_sequential():
+    flight = SingleFlight()
+    with pytest.raises(ValueError):
+        flight.do("key", _recording(ValueError(), []))
+    assert flight.do("key", lambda: 3) == 3
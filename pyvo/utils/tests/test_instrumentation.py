@@ -0,0 +1,143 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+Tests for pyvo.utils.instrumentation
+"""
+import pytest
+
+from astropy.utils.data import get_pkg_data_contents
+
+from pyvo.dal import DALQuery, DALServiceError
+from pyvo.dal.exceptions import PyvoUserWarning
+from pyvo.dal.tap import AsyncTAPJob
+from pyvo.utils.instrumentation import (
+    Event, Histogram, LatencyRecorder, listening, measure)
+
+JOB_URL = "http://example.com/tap/async/job1"
+RESULT_URL = JOB_URL + "/results/result"
+
+JOB = """<?xml version="1.0" encoding="UTF-8"?>
+<uws:job xmlns:uws="http://www.ivoa.net/xml/UWS/v1.0"
+    xmlns:xlink="http://www.w3.org/1999/xlink" version="1.1">
+    <uws:jobId>job1</uws:jobId>
+    <uws:phase>COMPLETED</uws:phase>
+    <uws:results>
+        <uws:result id="result" xlink:href="{}"/>
+    </uws:results>
+</uws:job>""".format(RESULT_URL).encode("utf-8")
+
+
+@pytest.fixture()
+def basic():
+    return get_pkg_data_contents(
+        "data/query/basic.xml", package="pyvo.dal.tests", encoding="binary")
+
+
+@pytest.fixture()
+def events():
+    recorded = []
+    with listening(recorded.append):
+        yield recorded
+
+
+def test_measure_without_listeners():
+    with measure("test", "http://example.com") as event:
+        event.set(rows=1)
+    assert not event.active
+    assert event.duration is None
+
+
+def test_measure(events):
+    with pytest.raises(KeyError):
+        with measure("test", "http://example.com/a", service="http://example.com",
+                     method="GET", nothing=None) as event:
+            event.mark("ttfb")
+            raise KeyError("x")
+
+    assert events == [event]
+    assert event.service == "http://example.com"
+    assert event.error == "KeyError"
+    assert event.attributes["method"] == "GET"
+    assert "nothing" not in event.attributes
+    assert 0 <= event.attributes["ttfb"] <= event.duration
+    assert event.end_time == event.start_time + event.duration
+
+
+def test_failing_listener():
+    def listener(event):
+        raise ValueError("broken")
+
+    with listening(listener):
+        with pytest.warns(PyvoUserWarning, match="broken"):
+            with measure("test", "http://example.com"):
+                pass
+
+
+def test_execute_votable(requests_mock, events, basic):
+    requests_mock.register_uri("GET", "http://example.com/query/basic", content=basic)
+
+    votable = DALQuery("http://example.com/query/basic").execute_votable()
+    rows = len(votable.get_first_table().array)
+
+    assert [event.name for event in events] == ["dal.submit", "dal.execute_votable"]
+    submit, execute = events
+    assert submit.attributes["status"] == 200
+    assert submit.attributes["method"] == "GET"
+    assert execute.service == "http://example.com/query/basic"
+    assert execute.attributes["rows"] == rows
+    assert execute.attributes["decoded_bytes"] == len(basic)
+    assert execute.attributes["ttfb"] + execute.attributes["read_duration"] <= execute.duration
+
+
+def test_failed_request(requests_mock, events):
+    requests_mock.register_uri("GET", "http://example.com/missing", status_code=404)
+
+    with pytest.raises(DALServiceError):
+        DALQuery("http://example.com/missing").execute_votable()
+
+    assert events[0].attributes["status"] == 404
+    assert events[-1].error == "DALServiceError"
+
+
+def test_async_job(requests_mock, events, basic):
+    requests_mock.register_uri("GET", JOB_URL, content=JOB)
+    requests_mock.register_uri("GET", RESULT_URL, content=basic)
+
+    AsyncTAPJob(JOB_URL).wait().fetch_result()
+
+    assert [event.name for event in events] == [
+        "uws.update", "uws.update", "uws.wait", "uws.fetch_result"]
+    assert {event.service for event in events} == {"http://example.com/tap"}
+    assert events[1].attributes["wait"] is True
+    assert events[2].attributes == {"polls": 1, "phase": "COMPLETED"}
+    assert events[3].attributes["rows"] > 0
+
+
+def test_histogram():
+    histogram = Histogram([1., 2., 3.])
+    for value in [0.5, 1.5, 1.5, 2.5]:
+        histogram.add(value)
+
+    assert histogram.counts == [1, 2, 1, 0]
+    assert histogram.mean == 1.5
+    assert histogram.quantile(0) == 0.5
+    assert histogram.quantile(0.5) == 1.5
+    assert histogram.quantile(1) == 2.5
+    assert Histogram([1.]).quantile(0.5) is None
+
+
+def test_latency_recorder():
+    recorder = LatencyRecorder(bounds=[0.1, 1.], names=["dal.submit"])
+    for name, service, duration in [
+            ("dal.submit", "a", 0.05), ("dal.submit", "a", 0.5),
+            ("dal.submit", "b", 2.), ("uws.wait", "a", 1.)]:
+        event = Event(name, service)
+        event.duration = duration
+        recorder(event)
+
+    histograms = recorder.histograms
+    assert set(histograms) == {("dal.submit", "a"), ("dal.submit", "b")}
+    assert histograms["dal.submit", "a"].counts == [1, 1, 0]
+    assert histograms["dal.submit", "b"].counts == [0, 0, 1]
+
+    recorder.clear()
+    assert not recorder.histograms
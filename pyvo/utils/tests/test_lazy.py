@@ -0,0 +1,61 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+"""
+Tests for pyvo.utils.lazy
+"""
+import subprocess
+import sys
+
+import pytest
+
+import pyvo
+from pyvo import dal, registry
+
+
+def _imported_modules(statement):
+    """
+    returns the names of the modules imported after statement in a fresh
+    interpreter.
+    """
+    return set(subprocess.run(
+        [sys.executable, "-c",
+         f"import sys; {statement}; print(' '.join(sys.modules))"],
+        check=True, capture_output=True, text=True).stdout.split())
+
+
+def test_import_pyvo_is_light():
+    modules = _imported_modules("import pyvo")
+    assert "pyvo.dal.query" not in modules
+    assert "pyvo.registry.regtap" not in modules
+    assert "astropy.table" not in modules
+
+
+def test_import_scs_skips_other_services():
+    modules = _imported_modules("import pyvo.dal.scs")
+    assert "pyvo.dal.tap" not in modules
+    assert "pyvo.registry.regtap" not in modules
+    assert "astropy.coordinates" not in modules
+    assert "astropy.samp" not in modules
+
+
+@pytest.mark.parametrize("module", ["rtcons", "failover", "mirror", "profile"])
+def test_import_registry_module_first(module):
+    # the registry modules import each other; each must work as the
+    # first one imported
+    assert f"pyvo.registry.{module}" in _imported_modules(
+        f"import pyvo.registry.{module}")
+
+
+def test_attributes():
+    assert pyvo.conesearch is dal.scs.search
+    assert pyvo.scs is dal.scs
+    assert pyvo.regsearch is registry.regtap.search
+    assert dal.TAPService is dal.tap.TAPService
+    assert registry.Spatial is registry.rtcons.Spatial
+    assert "TAPService" in dir(dal)
+    assert "tap" in dir(pyvo)
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError, match="has no attribute 'TAPServise'"):
+        dal.TAPServise
+    assert not hasattr(pyvo, "nonexisting")